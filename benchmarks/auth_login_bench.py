@@ -0,0 +1,127 @@
+"""
+Login throughput of the auth service vs. AUTH_WORKER_PROCESSES.
+
+For each worker count, starts grpc_auth_server.py on :50051 with that many
+processes, registers a benchmark user and hammers Login for --duration
+seconds from --clients client processes (each with its own connection, so
+SO_REUSEPORT can spread them across server processes):
+    python benchmarks/auth_login_bench.py --workers 1,2,4 --clients 8
+
+Stop any auth server already on port 50051 first. Logins/sec should scale
+with worker processes up to the number of cores (client processes run on
+the same machine and compete for them).
+"""
+import argparse
+import multiprocessing
+import os
+import signal
+import subprocess
+import sys
+import threading
+import time
+import uuid
+
+SERVICES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'services')
+sys.path.insert(0, os.path.join(SERVICES_DIR, 'generated'))
+
+import grpc
+
+import auth_pb2
+import auth_pb2_grpc
+
+AUTH_TARGET = 'localhost:50051'
+PASSWORD = 'bench-password'
+
+
+def start_server(workers):
+    # One user from one address would otherwise be throttled after a few logins
+    env = dict(os.environ, AUTH_WORKER_PROCESSES=str(workers), LOGIN_RATE_LIMIT_ENABLED='false')
+    server = subprocess.Popen([sys.executable, 'grpc_auth_server.py'], cwd=SERVICES_DIR, env=env,
+                              stdout=subprocess.DEVNULL, start_new_session=True)
+    channel = grpc.insecure_channel(AUTH_TARGET)
+    try:
+        grpc.channel_ready_future(channel).result(timeout=15)
+    finally:
+        channel.close()
+    time.sleep(0.5 * workers)  # let every worker process bind before load starts
+    return server
+
+
+def stop_server(server):
+    os.killpg(server.pid, signal.SIGTERM)
+    server.wait()
+
+
+def client(username, threads, deadline, counts):
+    """Log in repeatedly from `threads` threads sharing one connection"""
+    stub = auth_pb2_grpc.AuthServiceStub(grpc.insecure_channel(AUTH_TARGET))
+    request = auth_pb2.LoginRequest(username=username, password=PASSWORD)
+    ok = [0]
+    errors = [0]
+    lock = threading.Lock()
+
+    def worker():
+        while time.time() < deadline:
+            try:
+                success = stub.Login(request, timeout=30).status == 'success'
+            except grpc.RpcError:
+                success = False
+            with lock:
+                if success:
+                    ok[0] += 1
+                else:
+                    errors[0] += 1
+
+    pool = [threading.Thread(target=worker) for _ in range(threads)]
+    for t in pool:
+        t.start()
+    for t in pool:
+        t.join()
+    counts.put((ok[0], errors[0]))
+
+
+def measure(workers, clients, threads, duration):
+    server = start_server(workers)
+    try:
+        stub = auth_pb2_grpc.AuthServiceStub(grpc.insecure_channel(AUTH_TARGET))
+        username = f'bench_{uuid.uuid4().hex[:8]}'
+        stub.Register(auth_pb2.RegisterRequest(username=username, password=PASSWORD, role='student'))
+
+        ctx = multiprocessing.get_context('spawn')
+        counts = ctx.Queue()
+        deadline = time.time() + duration
+        procs = [ctx.Process(target=client, args=(username, threads, deadline, counts)) for _ in range(clients)]
+        start = time.perf_counter()
+        for p in procs:
+            p.start()
+        results = [counts.get() for _ in procs]
+        for p in procs:
+            p.join()
+        elapsed = time.perf_counter() - start
+    finally:
+        stop_server(server)
+
+    ok = sum(r[0] for r in results)
+    errors = sum(r[1] for r in results)
+    return ok / elapsed, errors
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--workers', default='1,2,4', help='comma-separated AUTH_WORKER_PROCESSES values')
+    parser.add_argument('--clients', type=int, default=8, help='client processes')
+    parser.add_argument('--threads', type=int, default=4, help='concurrent logins per client process')
+    parser.add_argument('--duration', type=float, default=10.0, help='seconds per worker count')
+    args = parser.parse_args()
+
+    print(f"{os.cpu_count()} CPUs, {args.clients} client processes x {args.threads} threads, "
+          f"{args.duration:.0f}s per run")
+    baseline = None
+    for workers in (int(w) for w in args.workers.split(',')):
+        rate, errors = measure(workers, args.clients, args.threads, args.duration)
+        baseline = baseline or rate
+        print(f"  workers={workers:<3} logins/s={rate:8.1f}  speedup={rate / baseline:4.2f}x  errors={errors}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,110 @@
+"""
+Memory and time of a course grade listing: GetCourseGrades vs the streaming export.
+
+Seeds a course with synthetic grades, runs the sync grades servicer on an
+in-process gRPC server and drives the Flask gateway's test client against it,
+so gateway and service share one process and tracemalloc sees both sides:
+    POSTGRES_HOST=/tmp/pgdata python benchmarks/course_export_bench.py --rows 10000 50000 200000
+
+GET /api/v1/grades/course/<id>          one CourseGradesResponse, one JSON body
+GET /api/v1/grades/course/<id>/export   StreamCourseGrades batches, NDJSON or CSV
+The seeded grades are deleted on exit.
+"""
+import argparse
+import contextlib
+import io
+import os
+import sys
+import time
+import tracemalloc
+import uuid
+from concurrent import futures
+from datetime import datetime, timedelta, timezone
+
+SERVICES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'services')
+sys.path.insert(0, SERVICES_DIR)
+sys.path.insert(0, os.path.join(SERVICES_DIR, 'generated'))
+
+import grpc
+import jwt
+
+import grades_pb2_grpc
+
+import rest_gateway
+from common_auth import JWT_ALGORITHM, JWT_SECRET_KEY
+from grpc_grades_server import GradesServiceServicer, db_pool
+
+COURSE_ID = 'EXPORTBENCH'
+
+
+def make_token(role):
+    exp = datetime.now(timezone.utc) + timedelta(hours=1)
+    payload = {'public_id': str(uuid.uuid4()), 'username': f'bench_{role}', 'role': role, 'exp': exp}
+    return jwt.encode(payload, JWT_SECRET_KEY, algorithm=JWT_ALGORITHM)
+
+
+def set_rows(count):
+    """Make the benchmark course hold exactly count grades"""
+    conn = db_pool.getconn()
+    try:
+        with conn.cursor() as cur:
+            cur.execute("DELETE FROM grades WHERE course_id = %s;", (COURSE_ID,))
+            cur.execute("""
+                INSERT INTO grades (grade_id, student_public_id, course_id, grade, semester, remarks,
+                                    uploaded_by_faculty_id)
+                SELECT gen_random_uuid(), gen_random_uuid(), %s, '1.50', 'Bench', '', gen_random_uuid()
+                FROM generate_series(1, %s);
+            """, (COURSE_ID, count))
+        conn.commit()
+    finally:
+        db_pool.putconn(conn)
+
+
+def fetch(client, url, token, traced):
+    """(status, body bytes, seconds, peak traced MB) of one streamed GET"""
+    if traced:
+        tracemalloc.start()
+    start = time.perf_counter()
+    response = client.get(url, headers={'Authorization': f'Bearer {token}'}, buffered=False)
+    size = sum(len(chunk) for chunk in response.response)
+    response.close()
+    elapsed = time.perf_counter() - start
+    peak = 0.0
+    if traced:
+        peak = tracemalloc.get_traced_memory()[1] / 2**20
+        tracemalloc.stop()
+    return response.status_code, size, elapsed, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, nargs='+', default=[10000, 50000, 200000])
+    args = parser.parse_args()
+
+    server = grpc.server(futures.ThreadPoolExecutor(max_workers=4))
+    grades_pb2_grpc.add_GradesServiceServicer_to_server(GradesServiceServicer(), server)
+    port = server.add_insecure_port('127.0.0.1:0')
+    server.start()
+    rest_gateway.grades_stub = grades_pb2_grpc.GradesServiceStub(grpc.insecure_channel(f'127.0.0.1:{port}'))
+    client = rest_gateway.app.test_client()
+    token = make_token('faculty')
+
+    urls = [('GetCourseGrades JSON', f'/api/v1/grades/course/{COURSE_ID}'),
+            ('export NDJSON', f'/api/v1/grades/course/{COURSE_ID}/export'),
+            ('export CSV', f'/api/v1/grades/course/{COURSE_ID}/export?format=csv')]
+    print(f"{'rows':>8} {'endpoint':<22} {'status':>6} {'body':>9} {'time':>8} {'peak mem':>9}")
+    try:
+        for rows in args.rows:
+            set_rows(rows)
+            for name, url in urls:
+                with contextlib.redirect_stdout(io.StringIO()):
+                    status, size, elapsed, _ = fetch(client, url, token, traced=False)
+                    _, _, _, peak = fetch(client, url, token, traced=True)
+                print(f"{rows:>8} {name:<22} {status:>6} {size / 2**20:>7.1f}MB {elapsed:>7.2f}s {peak:>7.1f}MB")
+    finally:
+        set_rows(0)
+        server.stop(None)
+
+
+if __name__ == '__main__':
+    main()
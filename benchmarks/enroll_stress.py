@@ -0,0 +1,147 @@
+"""
+Concurrency stress check for EnrollInCourse.
+
+Creates a throwaway course with a small capacity, fires many concurrent
+enrollments at it (each student enrolls more than once to exercise the
+duplicate path) and verifies the course never exceeds its capacity.
+Exits non-zero if it does.
+
+Runs the servicer in-process by default; pass --target to go through a
+running enrollment server instead:
+    cd services
+    python ../benchmarks/enroll_stress.py --students 300 --capacity 30
+    python ../benchmarks/enroll_stress.py --target localhost:50053
+"""
+import argparse
+import os
+import sys
+import time
+import uuid
+from concurrent import futures
+from datetime import datetime, timedelta, timezone
+
+SERVICES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'services')
+sys.path.insert(0, SERVICES_DIR)
+sys.path.insert(0, os.path.join(SERVICES_DIR, 'generated'))
+
+import grpc
+import jwt
+
+import enrollment_pb2
+import enrollment_pb2_grpc
+from common_auth import JWT_SECRET_KEY, JWT_ALGORITHM
+import grpc_enrollment_server as enrollment_server
+
+STRESS_COURSE_ID = 'STRESS01'
+
+
+def make_token(public_id):
+    payload = {
+        'public_id': public_id,
+        'username': f'stress_{public_id[:8]}',
+        'role': 'student',
+        'exp': datetime.now(timezone.utc) + timedelta(minutes=10),
+        'iat': datetime.now(timezone.utc)
+    }
+    return jwt.encode(payload, JWT_SECRET_KEY, algorithm=JWT_ALGORITHM)
+
+
+def reset_course(capacity):
+    conn = enrollment_server.get_db_connection()
+    try:
+        with conn.cursor() as cur:
+            cur.execute("DELETE FROM enrollments WHERE course_id = %s;", (STRESS_COURSE_ID,))
+            cur.execute("DELETE FROM courses WHERE course_id = %s;", (STRESS_COURSE_ID,))
+            cur.execute(
+                "INSERT INTO courses (course_id, name, capacity, enrolled, is_open) VALUES (%s, %s, %s, 0, TRUE);",
+                (STRESS_COURSE_ID, 'Enrollment Stress Test', capacity)
+            )
+        conn.commit()
+    finally:
+        enrollment_server.release_db_connection(conn)
+
+
+def read_course():
+    conn = enrollment_server.get_db_connection()
+    try:
+        with conn.cursor() as cur:
+            cur.execute("SELECT capacity, enrolled FROM courses WHERE course_id = %s;", (STRESS_COURSE_ID,))
+            capacity, enrolled = cur.fetchone()
+            cur.execute("SELECT COUNT(*), COUNT(DISTINCT student_public_id) FROM enrollments WHERE course_id = %s;",
+                        (STRESS_COURSE_ID,))
+            rows, students = cur.fetchone()
+        return capacity, enrolled, rows, students
+    finally:
+        enrollment_server.release_db_connection(conn)
+
+
+def cleanup():
+    conn = enrollment_server.get_db_connection()
+    try:
+        with conn.cursor() as cur:
+            cur.execute("DELETE FROM enrollments WHERE course_id = %s;", (STRESS_COURSE_ID,))
+            cur.execute("DELETE FROM courses WHERE course_id = %s;", (STRESS_COURSE_ID,))
+        conn.commit()
+    finally:
+        enrollment_server.release_db_connection(conn)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--students', type=int, default=300)
+    parser.add_argument('--capacity', type=int, default=30)
+    parser.add_argument('--attempts', type=int, default=2, help='enroll attempts per student')
+    parser.add_argument('--concurrency', type=int, default=100)
+    parser.add_argument('--target', default=None, help='enrollment server address; in-process if omitted')
+    parser.add_argument('--keep', action='store_true', help='leave the stress course in the database')
+    args = parser.parse_args()
+
+    if args.target:
+        call = enrollment_pb2_grpc.EnrollmentServiceStub(grpc.insecure_channel(args.target)).EnrollInCourse
+    else:
+        servicer = enrollment_server.EnrollmentServiceServicer()
+        call = lambda request: servicer.EnrollInCourse(request, None)
+
+    reset_course(args.capacity)
+    tokens = [make_token(str(uuid.uuid4())) for _ in range(args.students)]
+    requests = [enrollment_pb2.EnrollRequest(token=t, course_id=STRESS_COURSE_ID)
+                for t in tokens for _ in range(args.attempts)]
+
+    start = time.perf_counter()
+    with futures.ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+        responses = list(pool.map(call, requests))
+    elapsed = time.perf_counter() - start
+
+    statuses = {}
+    for response in responses:
+        if response.status == 'success':
+            key = 'success'
+        elif 'already enrolled' in response.message:
+            key = 'already_enrolled'
+        elif 'is full' in response.message:
+            key = 'full'
+        else:
+            key = response.message
+        statuses[key] = statuses.get(key, 0) + 1
+    successes = sum(1 for r in responses if r.status == 'success')
+
+    capacity, enrolled, rows, students = read_course()
+    print(f"{len(requests)} enroll attempts from {args.students} students in {elapsed:.2f}s "
+          f"({len(requests) / elapsed:.1f} req/s)")
+    print(f"  responses: {statuses}")
+    print(f"  capacity={capacity} enrolled={enrolled} enrollment_rows={rows} "
+          f"distinct_students={students} successes={successes}")
+
+    expected = min(capacity, args.students)
+    ok = (enrolled == rows == students == successes == expected)
+    if not args.keep:
+        cleanup()
+
+    if not ok:
+        print("✗ FAILED: seat count does not match enrollments or exceeds capacity")
+        sys.exit(1)
+    print("✓ Capacity respected under contention")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,145 @@
+"""
+High-concurrency load test for the REST gateways (rest_gateway.py vs
+rest_gateway_aio.py).
+
+Opens --concurrency client connections from a single asyncio loop, so
+thousands of in-flight requests are cheap on the client side. With
+--slow-course MS it also serves a fake CourseService on :50052 whose
+GetCourses takes MS milliseconds, to model a backend that is slow to
+answer (the gateway must hold each request open meanwhile):
+
+    python benchmarks/gateway_load.py http://localhost:5001/api/v1/courses \\
+        -c 1000 -n 20000 --slow-course 100
+
+Run it once against each gateway on port 5001 and compare throughput and
+the latency percentiles.
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+from urllib.parse import urlsplit
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, BENCH_DIR)
+sys.path.insert(0, os.path.join(BENCH_DIR, '..', 'services', 'generated'))
+
+from http_load import percentile
+
+
+async def start_slow_course_service(delay, port=50052):
+    import grpc
+    import course_pb2
+    import course_pb2_grpc
+
+    catalog = course_pb2.GetCoursesResponse(status="success", message="ok", courses=[
+        course_pb2.CourseInfo(course_id=f"BENCH{i:03d}", name=f"Benchmark Course {i}",
+                              capacity=40, enrolled=i % 40, is_open=True)
+        for i in range(20)
+    ])
+
+    class SlowCourseService(course_pb2_grpc.CourseServiceServicer):
+        async def GetCourses(self, request, context):
+            await asyncio.sleep(delay)
+            return catalog
+
+    server = grpc.aio.server(options=[('grpc.max_concurrent_streams', 100000)])
+    course_pb2_grpc.add_CourseServiceServicer_to_server(SlowCourseService(), server)
+    server.add_insecure_port(f'[::]:{port}')
+    await server.start()
+    return server
+
+
+async def fetch(conn, host, path, headers):
+    """One GET over a keep-alive connection; reconnects when the server closes it"""
+    request = (f"GET {path} HTTP/1.1\r\nHost: {host}\r\n{headers}\r\n").encode()
+    for attempt in range(2):
+        if conn[0] is None:
+            conn[0] = await asyncio.open_connection(*conn[1])
+        reader, writer = conn[0]
+        try:
+            writer.write(request)
+            head = await reader.readuntil(b"\r\n\r\n")
+            lines = head.decode('latin-1').split("\r\n")
+            status = int(lines[0].split()[1])
+            fields = {k.strip().lower(): v.strip() for k, v in
+                      (line.split(':', 1) for line in lines[1:] if ':' in line)}
+            length = int(fields.get('content-length', 0))
+            if length:
+                await reader.readexactly(length)
+            if fields.get('connection', '').lower() == 'close' or lines[0].startswith('HTTP/1.0'):
+                writer.close()
+                conn[0] = None
+            return status
+        except (ConnectionError, asyncio.IncompleteReadError):
+            writer.close()
+            conn[0] = None
+            if attempt:
+                raise
+
+
+async def run(url, concurrency, total, headers):
+    parts = urlsplit(url)
+    address = (parts.hostname, parts.port or 80)
+    path = parts.path + (f"?{parts.query}" if parts.query else "")
+    header_lines = "".join(f"{h}\r\n" for h in headers)
+    latencies = []
+    errors = 0
+    remaining = total
+
+    async def client():
+        nonlocal remaining, errors
+        conn = [None, address]
+        while remaining > 0:
+            remaining -= 1
+            start = time.perf_counter()
+            try:
+                status = await fetch(conn, parts.hostname, path, header_lines)
+                if status >= 500:
+                    errors += 1
+            except (OSError, asyncio.IncompleteReadError, ValueError):
+                errors += 1
+            latencies.append(time.perf_counter() - start)
+        if conn[0] is not None:
+            conn[0][1].close()
+
+    start = time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    latencies.sort()
+    return latencies, errors, elapsed
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('url')
+    parser.add_argument('-c', '--concurrency', type=int, default=500)
+    parser.add_argument('-n', '--requests', type=int, default=10000)
+    parser.add_argument('-H', '--header', action='append', default=[], help="'Name: value', repeatable")
+    parser.add_argument('--slow-course', type=float, default=None, metavar='MS',
+                        help='serve a fake CourseService on :50052 answering after MS milliseconds')
+    parser.add_argument('--label', default='', help='tag printed with the results')
+    args = parser.parse_args()
+
+    server = None
+    if args.slow_course is not None:
+        server = await start_slow_course_service(args.slow_course / 1000)
+
+    try:
+        await run(args.url, min(args.concurrency, 10), min(args.requests, 50), args.header)  # warm up
+        latencies, errors, elapsed = await run(args.url, args.concurrency, args.requests, args.header)
+    finally:
+        if server is not None:
+            await server.stop(None)
+
+    label = f"[{args.label}] " if args.label else ""
+    print(f"{label}GET {args.url}  concurrency={args.concurrency}")
+    print(f"  requests={len(latencies)} errors={errors} elapsed={elapsed:.2f}s "
+          f"throughput={len(latencies) / elapsed:.1f} req/s")
+    print(f"  p50={percentile(latencies, 50) * 1000:.1f}ms p90={percentile(latencies, 90) * 1000:.1f}ms "
+          f"p99={percentile(latencies, 99) * 1000:.1f}ms max={latencies[-1] * 1000:.1f}ms")
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
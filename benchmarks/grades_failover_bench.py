@@ -0,0 +1,297 @@
+"""
+Grades read availability while the primary database is lost.
+
+Runs the grades servicer in-process with a replica configured and the primary
+behind a local TCP proxy, so the primary can be cut without touching the
+database server. Client threads call GetStudentGrades for the whole run while
+a writer uploads grades; the primary is cut at 1/3 of the run and restored at
+2/3:
+    POSTGRES_HOST=/tmp/pgdata python benchmarks/grades_failover_bench.py --mode down
+    POSTGRES_HOST=/tmp/pgdata python benchmarks/grades_failover_bench.py --mode slow
+
+--mode down  the proxy drops every primary connection and refuses new ones
+--mode slow  the primary stays up, but a session holds an ACCESS EXCLUSIVE
+             lock on grades, so reads hang until the statement timeout
+
+The replica is the database GRADES_REPLICA_DB (default
+student_portal_grades_replica) on the real server; it is created if missing.
+Benchmark grades are deleted from both databases on exit.
+"""
+import argparse
+import contextlib
+import io
+import os
+import select
+import socket
+import statistics
+import sys
+import threading
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+
+SERVICES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'services')
+sys.path.insert(0, SERVICES_DIR)
+sys.path.insert(0, os.path.join(SERVICES_DIR, 'generated'))
+
+import jwt
+import psycopg2
+
+import grades_pb2
+from common_auth import JWT_ALGORITHM, JWT_SECRET_KEY
+
+REAL_HOST = os.getenv('POSTGRES_HOST', 'localhost')
+REAL_PORT = os.getenv('POSTGRES_PORT', '5432')
+REPLICA_DB = os.getenv('GRADES_REPLICA_DB', 'student_portal_grades_replica')
+CONNECT_ARGS = dict(user=os.getenv('POSTGRES_USER', 'postgres'),
+                    password=os.getenv('POSTGRES_PASSWORD', '1234'),
+                    host=REAL_HOST, port=REAL_PORT)
+
+
+class PrimaryProxy:
+    """TCP proxy in front of the primary that can drop and refuse connections"""
+
+    def __init__(self):
+        self.listener = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self.listener.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self.listener.bind(('127.0.0.1', 0))
+        self.listener.listen(64)
+        self.port = self.listener.getsockname()[1]
+        self.down = False
+        self._sockets = set()
+        self._lock = threading.Lock()
+        threading.Thread(target=self._accept, daemon=True).start()
+
+    def _upstream(self):
+        if REAL_HOST.startswith('/'):
+            sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            sock.connect(os.path.join(REAL_HOST, f'.s.PGSQL.{REAL_PORT}'))
+        else:
+            sock = socket.create_connection((REAL_HOST, int(REAL_PORT)))
+        return sock
+
+    def _accept(self):
+        while True:
+            client, _ = self.listener.accept()
+            if self.down:
+                client.close()
+                continue
+            upstream = self._upstream()
+            with self._lock:
+                self._sockets.update((client, upstream))
+            threading.Thread(target=self._pump, args=(client, upstream), daemon=True).start()
+
+    def _pump(self, client, upstream):
+        peers = {client: upstream, upstream: client}
+        try:
+            while True:
+                readable, _, _ = select.select(list(peers), [], [])
+                for sock in readable:
+                    data = sock.recv(65536)
+                    if not data:
+                        return
+                    peers[sock].sendall(data)
+        except OSError:
+            pass
+        finally:
+            for sock in peers:
+                sock.close()
+            with self._lock:
+                self._sockets.difference_update(peers)
+
+    def cut(self):
+        self.down = True
+        with self._lock:
+            sockets = list(self._sockets)
+        for sock in sockets:
+            with contextlib.suppress(OSError):
+                sock.shutdown(socket.SHUT_RDWR)
+
+    def restore(self):
+        self.down = False
+
+
+class PrimaryLock:
+    """Hold an ACCESS EXCLUSIVE lock on the primary's grades table"""
+
+    def __init__(self):
+        self.conn = None
+
+    def cut(self):
+        self.conn = psycopg2.connect(dbname='student_portal_grades', **CONNECT_ARGS)
+        with self.conn.cursor() as cur:
+            cur.execute("LOCK TABLE grades IN ACCESS EXCLUSIVE MODE;")
+
+    def restore(self):
+        self.conn.rollback()
+        self.conn.close()
+
+
+def make_token(role, public_id):
+    exp = datetime.now(timezone.utc) + timedelta(hours=1)
+    payload = {'public_id': public_id, 'username': f'bench_{role}', 'role': role, 'exp': exp}
+    return jwt.encode(payload, JWT_SECRET_KEY, algorithm=JWT_ALGORITHM)
+
+
+def ensure_replica_database():
+    conn = psycopg2.connect(dbname='postgres', **CONNECT_ARGS)
+    conn.autocommit = True
+    try:
+        with conn.cursor() as cur:
+            cur.execute("SELECT 1 FROM pg_database WHERE datname = %s;", (REPLICA_DB,))
+            if cur.fetchone() is None:
+                cur.execute(f'CREATE DATABASE "{REPLICA_DB}";')
+    finally:
+        conn.close()
+
+
+def delete_grades(student_ids):
+    for dbname in ('student_portal_grades', REPLICA_DB):
+        conn = psycopg2.connect(dbname=dbname, **CONNECT_ARGS)
+        try:
+            with conn.cursor() as cur:
+                cur.execute("DELETE FROM grades WHERE student_public_id = ANY(%s::uuid[]);", (student_ids,))
+            conn.commit()
+        finally:
+            conn.close()
+
+
+def replica_courses(student_id):
+    conn = psycopg2.connect(dbname=REPLICA_DB, **CONNECT_ARGS)
+    try:
+        with conn.cursor() as cur:
+            cur.execute("SELECT course_id FROM grades WHERE student_public_id = %s;", (student_id,))
+            return {row[0] for row in cur.fetchall()}
+    finally:
+        conn.close()
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--mode', choices=('down', 'slow'), default='down')
+    parser.add_argument('--duration', type=float, default=30.0, help='seconds; the primary is lost for the middle third')
+    parser.add_argument('--clients', type=int, default=4, help='concurrent reader threads')
+    parser.add_argument('--courses', type=int, default=8, help='grades per reader student')
+    args = parser.parse_args()
+
+    proxy = PrimaryProxy()
+    os.environ.update({
+        'POSTGRES_HOST': '127.0.0.1',
+        'POSTGRES_PORT': str(proxy.port),
+        'GRADES_REPLICA_DB': REPLICA_DB,
+        'GRADES_REPLICA_HOST': REAL_HOST,
+        'GRADES_REPLICA_PORT': REAL_PORT,
+    })
+    os.environ.setdefault('GRADES_PRIMARY_READ_TIMEOUT_MS', '500')
+    os.environ.setdefault('GRADES_PRIMARY_RETRY_INTERVAL', '2')
+    os.environ.setdefault('DB_CONNECT_TIMEOUT', '2')
+    ensure_replica_database()
+
+    import grpc_grades_server
+    from grpc_grades_server import GradesServiceServicer
+
+    fault = proxy if args.mode == 'down' else PrimaryLock()
+    servicer = GradesServiceServicer()
+    reader_id, writer_id, faculty_id = (str(uuid.uuid4()) for _ in range(3))
+    student = make_token('student', reader_id)
+    faculty = make_token('faculty', faculty_id)
+
+    samples = []          # (started, latency, ok, from_replica)
+    writes = []           # (acknowledged_at, course_id)
+    stop = threading.Event()
+    cut_at = restore_at = None
+
+    def reader():
+        while not stop.is_set():
+            started = time.monotonic()
+            response = servicer.GetStudentGrades(grades_pb2.GradesRequest(token=student), None)
+            ok = response.status == 'success'
+            samples.append((started, time.monotonic() - started, ok, ok and 'replica' in response.message))
+
+    def writer():
+        n = 0
+        while not stop.is_set() and (cut_at is None or time.monotonic() < cut_at):
+            course_id = f'BENCHW{n}'
+            response = servicer.UploadGrade(grades_pb2.UploadGradeRequest(
+                token=faculty, student_id=writer_id, course_id=course_id, grade='1.00',
+                semester='Bench', remarks=''), None)
+            if response.status == 'success':
+                writes.append((time.monotonic(), course_id))
+            n += 1
+            time.sleep(0.05)
+
+    replicator = None
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            grpc_grades_server.init_db()
+            for i in range(args.courses):
+                servicer.UploadGrade(grades_pb2.UploadGradeRequest(
+                    token=faculty, student_id=reader_id, course_id=f'BENCH{i}', grade='1.50',
+                    semester='Bench', remarks=''), None)
+            replicator = grpc_grades_server.start_replicator()
+            while replicator.passes < 2:
+                time.sleep(0.05)
+
+            start = time.monotonic()
+            cut_at = start + args.duration / 3
+            restore_at = start + 2 * args.duration / 3
+            threads = [threading.Thread(target=reader) for _ in range(args.clients)]
+            threads.append(threading.Thread(target=writer))
+            for thread in threads:
+                thread.start()
+
+            time.sleep(max(0.0, cut_at - time.monotonic()))
+            fault.cut()
+            time.sleep(max(0.0, restore_at - time.monotonic()))
+            visible = replica_courses(writer_id)
+            fault.restore()
+            time.sleep(max(0.0, start + args.duration - time.monotonic()))
+            stop.set()
+            for thread in threads:
+                thread.join()
+    finally:
+        stop.set()
+        if replicator is not None:
+            replicator.stop()
+        delete_grades([reader_id, writer_id])
+
+    print(f"Mode '{args.mode}': {args.clients} readers for {args.duration:.0f}s, "
+          f"primary lost from {args.duration / 3:.0f}s to {2 * args.duration / 3:.0f}s")
+    print(f"{'phase':<16} {'reads/s':>8} {'errors':>7} {'replica':>8} {'p50':>9} {'p99':>9}")
+    phases = [('primary up', start, cut_at), ('primary lost', cut_at, restore_at),
+              ('primary back', restore_at, start + args.duration)]
+    for name, begin, end in phases:
+        phase = [s for s in samples if begin <= s[0] < end]
+        ok = [s for s in phase if s[2]]
+        latencies = [s[1] for s in ok] or [0.0]
+        print(f"{name:<16} {len(ok) / (end - begin):>8.1f} {len(phase) - len(ok):>7} "
+              f"{sum(1 for s in ok if s[3]):>8} {statistics.median(latencies) * 1000:>7.2f}ms "
+              f"{percentile(latencies, 0.99) * 1000:>7.2f}ms")
+
+    first_replica = min((s[0] + s[1] for s in samples if s[3] and s[0] >= cut_at), default=None)
+    first_primary = min((s[0] + s[1] for s in samples if s[2] and not s[3] and s[0] >= restore_at), default=None)
+    if first_replica is not None:
+        print(f"Failover: first replica read {(first_replica - cut_at) * 1000:.0f}ms after the cut")
+    else:
+        print("✗ Failover: no read was served by the replica")
+    if first_primary is not None:
+        print(f"Recovery: first primary read {(first_primary - restore_at) * 1000:.0f}ms after the restore")
+    else:
+        print("✗ Recovery: no read returned to the primary")
+
+    acknowledged = [course_id for _, course_id in writes]
+    missing = [(at, course_id) for at, course_id in writes if course_id not in visible]
+    print(f"Writes: {len(acknowledged)} acknowledged before the cut, "
+          f"{len(acknowledged) - len(missing)} visible on the replica during the outage")
+    if missing:
+        oldest = min(at for at, _ in missing)
+        print(f"  {len(missing)} not yet replicated, acknowledged within {(cut_at - oldest) * 1000:.0f}ms of the cut")
+
+
+if __name__ == '__main__':
+    main()
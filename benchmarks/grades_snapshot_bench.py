@@ -0,0 +1,112 @@
+"""
+Student and course lookups: JSON grade file vs memory-mapped snapshot.
+
+Writes a synthetic grade file in the data/grades_*.json format (default one
+million records), builds its snapshot and times:
+  - json.load of the whole file, which a JSON reader pays for any lookup
+  - opening the snapshot plus one student lookup (a cold, one-off reader)
+  - student and course lookups on an open snapshot
+and the peak memory of each reader, measured in a fresh child process:
+    python benchmarks/grades_snapshot_bench.py --records 1000000
+"""
+import argparse
+import json
+import os
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+SERVICES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'services')
+sys.path.insert(0, SERVICES_DIR)
+
+from grades_snapshot import GradeSnapshot, build, load_json
+
+GRADES = ['1.00', '1.25', '1.50', '1.75', '2.00', '2.25', '2.50', '2.75', '3.00', '5.00', 'INC']
+
+
+def write_synthetic(path, records, per_student, courses):
+    """Stream a JSON grade file of about `records` records; returns the student ids"""
+    rng = random.Random(42)
+    course_ids = [f'C{n:05d}' for n in range(courses)]
+    students = [str(100000 + n) for n in range(records // per_student)]
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write('{')
+        for n, student in enumerate(students):
+            grades = [{"course": course, "grade": rng.choice(GRADES),
+                       "semester": f"Term {rng.randint(1, 3)} {rng.randint(2019, 2025)}-{rng.randint(2020, 2026)}"}
+                      for course in rng.sample(course_ids, per_student)]
+            f.write(f'{"," if n else ""}{json.dumps(student)}:{json.dumps(grades)}')
+        f.write('}')
+    return students, course_ids
+
+
+def timed(call):
+    start = time.perf_counter()
+    result = call()
+    return time.perf_counter() - start, result
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct))]
+
+
+def peak_rss_mb(code):
+    """Peak RSS of a fresh interpreter running code, in MB (Linux: VmHWM, which exec resets)"""
+    script = (f"import sys; sys.path.insert(0, {SERVICES_DIR!r}); {code}; "
+              "print(next(line.split()[1] for line in open('/proc/self/status') if line.startswith('VmHWM')))")
+    return int(subprocess.check_output([sys.executable, '-c', script])) / 1024
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--records', type=int, default=1000000)
+    parser.add_argument('--per-student', type=int, default=5)
+    parser.add_argument('--courses', type=int, default=2000)
+    parser.add_argument('--lookups', type=int, default=20000, help='timed lookups on the open snapshot')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        source = os.path.join(tmp, 'grades.json')
+        snapshot_path = os.path.join(tmp, 'grades.gsnap')
+        students, course_ids = write_synthetic(source, args.records, args.per_student, args.courses)
+
+        load_time, grades = timed(lambda: load_json(source))
+        build_time, count = timed(lambda: build(grades, snapshot_path))
+        del grades
+        print(f"{count} records, {len(students)} students, {args.courses} courses")
+        print(f"JSON {os.path.getsize(source) / 2**20:.1f} MB, snapshot {os.path.getsize(snapshot_path) / 2**20:.1f} MB; "
+              f"build {load_time + build_time:.1f}s ({load_time:.1f}s parsing)")
+
+        rng = random.Random(7)
+        student = rng.choice(students)
+        json_time, _ = timed(lambda: json.load(open(source, encoding='utf-8'))[student])
+        cold_time, _ = timed(lambda: GradeSnapshot(snapshot_path).student_grades(student))
+        print(f"One-off student lookup: json.load {json_time * 1000:.0f}ms, open snapshot + lookup {cold_time * 1000:.3f}ms")
+
+        with GradeSnapshot(snapshot_path) as snapshot:
+            for name, lookup, keys in (('student', snapshot.student_grades, students),
+                                       ('course', snapshot.course_grades, course_ids)):
+                samples = []
+                for key in (rng.choice(keys) for _ in range(args.lookups if name == 'student' else args.lookups // 20)):
+                    elapsed, found = timed(lambda: lookup(key))
+                    assert found, key
+                    samples.append(elapsed)
+                rows = len(lookup(keys[0]))
+                print(f"Snapshot {name} lookup (~{rows} rows): p50 {statistics.median(samples) * 1e6:.1f}us, "
+                      f"p99 {percentile(samples, 0.99) * 1e6:.1f}us")
+            assert snapshot.student_grades('missing') == [] and snapshot.course_grades('missing') == []
+
+        baseline = peak_rss_mb("import grades_snapshot")
+        json_rss = peak_rss_mb(f"import json; json.load(open({source!r}))[{student!r}]")
+        snapshot_rss = peak_rss_mb(f"import grades_snapshot; grades_snapshot.GradeSnapshot({snapshot_path!r})"
+                                   f".student_grades({student!r})")
+        print(f"Peak RSS for one lookup: json.load {json_rss:.0f} MB, snapshot {snapshot_rss:.0f} MB "
+              f"(interpreter alone {baseline:.0f} MB)")
+
+
+if __name__ == '__main__':
+    main()
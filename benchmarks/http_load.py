@@ -0,0 +1,103 @@
+"""
+Concurrent HTTP load generator reporting latency percentiles.
+
+Example - REST gateway course listing with 50 concurrent clients:
+    python benchmarks/http_load.py http://localhost:5001/api/v1/courses -c 50 -n 5000
+
+To compare two versions of a service, run the same command against each
+build (e.g. before/after a change) and compare the p50/p99 columns.
+"""
+import argparse
+import statistics
+import threading
+import time
+
+import requests
+
+
+def percentile(sorted_values, pct):
+    if not sorted_values:
+        return 0.0
+    k = min(len(sorted_values) - 1, max(0, round(pct / 100 * len(sorted_values)) - 1))
+    return sorted_values[k]
+
+
+def run(url, method, concurrency, total, headers, body, warmup):
+    latencies = []
+    errors = [0]
+    lock = threading.Lock()
+    remaining = [total]
+
+    def worker():
+        # Keep-alive session per client so only the server side is measured
+        session = requests.Session()
+        for _ in range(warmup):
+            session.request(method, url, headers=headers, data=body)
+        local = []
+        local_errors = 0
+        while True:
+            with lock:
+                if remaining[0] <= 0:
+                    break
+                remaining[0] -= 1
+            start = time.perf_counter()
+            try:
+                response = session.request(method, url, headers=headers, data=body)
+                response.content
+                if response.status_code >= 500:
+                    local_errors += 1
+            except requests.exceptions.RequestException:
+                local_errors += 1
+            local.append(time.perf_counter() - start)
+        with lock:
+            latencies.extend(local)
+            errors[0] += local_errors
+
+    threads = [threading.Thread(target=worker) for _ in range(concurrency)]
+    start = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    return {
+        "requests": len(latencies),
+        "errors": errors[0],
+        "elapsed_s": elapsed,
+        "rps": len(latencies) / elapsed if elapsed else 0.0,
+        "mean_ms": statistics.fmean(latencies) * 1000 if latencies else 0.0,
+        "p50_ms": percentile(latencies, 50) * 1000,
+        "p90_ms": percentile(latencies, 90) * 1000,
+        "p99_ms": percentile(latencies, 99) * 1000,
+        "max_ms": latencies[-1] * 1000 if latencies else 0.0,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('url')
+    parser.add_argument('-X', '--method', default='GET')
+    parser.add_argument('-c', '--concurrency', type=int, default=20)
+    parser.add_argument('-n', '--requests', type=int, default=2000)
+    parser.add_argument('-H', '--header', action='append', default=[], help="'Name: value', repeatable")
+    parser.add_argument('-d', '--data', default=None, help='request body')
+    parser.add_argument('--warmup', type=int, default=5, help='untimed requests per client')
+    parser.add_argument('--label', default='', help='tag printed with the results')
+    args = parser.parse_args()
+
+    headers = dict(h.split(':', 1) for h in args.header)
+    headers = {k.strip(): v.strip() for k, v in headers.items()}
+
+    result = run(args.url, args.method, args.concurrency, args.requests, headers, args.data, args.warmup)
+    label = f"[{args.label}] " if args.label else ""
+    print(f"{label}{args.method} {args.url}  concurrency={args.concurrency}")
+    print(f"  requests={result['requests']} errors={result['errors']} "
+          f"elapsed={result['elapsed_s']:.2f}s throughput={result['rps']:.1f} req/s")
+    print(f"  mean={result['mean_ms']:.2f}ms p50={result['p50_ms']:.2f}ms "
+          f"p90={result['p90_ms']:.2f}ms p99={result['p99_ms']:.2f}ms max={result['max_ms']:.2f}ms")
+
+
+if __name__ == '__main__':
+    main()
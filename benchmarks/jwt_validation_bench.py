@@ -0,0 +1,63 @@
+"""
+Microbenchmark for common_auth.validate_token_locally.
+
+Compares cold validation (every token seen for the first time, so it is a
+full jwt.decode) with cached validation (the same tokens validated again),
+for both valid tokens and tokens with a bad signature.
+    python benchmarks/jwt_validation_bench.py -n 20000
+"""
+import argparse
+import os
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'services'))
+
+import jwt
+
+import common_auth
+from common_auth import JWT_ALGORITHM, JWT_SECRET_KEY, validate_token_locally
+
+
+def make_tokens(count, secret):
+    exp = datetime.now(timezone.utc) + timedelta(hours=1)
+    return [
+        jwt.encode({'public_id': str(uuid.uuid4()), 'username': 'bench', 'role': 'student', 'exp': exp},
+                   secret, algorithm=JWT_ALGORITHM)
+        for _ in range(count)
+    ]
+
+
+def measure(tokens):
+    start = time.perf_counter()
+    for token in tokens:
+        validate_token_locally(token)
+    elapsed = time.perf_counter() - start
+    return len(tokens) / elapsed, elapsed / len(tokens) * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('-n', '--tokens', type=int, default=10000)
+    args = parser.parse_args()
+
+    # Size the caches so every benchmark token fits
+    common_auth._claims_cache.max_size = max(common_auth._claims_cache.max_size, args.tokens)
+    common_auth._rejected_cache.max_size = max(common_auth._rejected_cache.max_size, args.tokens)
+
+    valid = make_tokens(args.tokens, JWT_SECRET_KEY)
+    forged = make_tokens(args.tokens, 'not-the-real-secret-key-for-this-benchmark')
+
+    print(f"{args.tokens} distinct tokens per run")
+    for label, tokens in (("valid", valid), ("bad signature", forged)):
+        cold_rate, cold_us = measure(tokens)
+        warm_rate, warm_us = measure(tokens)
+        print(f"  {label:<14} cold: {cold_rate:>10.0f}/s ({cold_us:6.1f}us)   "
+              f"cached: {warm_rate:>10.0f}/s ({warm_us:6.1f}us)   speedup x{warm_rate / cold_rate:.1f}")
+    print(f"  cache stats: {common_auth.token_cache_stats()}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,70 @@
+"""
+Password hashing cost per policy setting, for sizing the auth service.
+
+Times hash_password (Register) and check_password_hash (Login) for each
+werkzeug method string and reports the latency plus the logins/sec one
+core can sustain at that cost:
+    python benchmarks/password_hash_bench.py
+    python benchmarks/password_hash_bench.py -m pbkdf2:sha256:600000 -m scrypt:16384:8:1 -n 50
+
+Methods take the form scrypt:N:r:p or pbkdf2:<digest>:<iterations>, as set
+through PASSWORD_HASH_ALGORITHM / PASSWORD_HASH_ITERATIONS / PASSWORD_HASH_DIGEST.
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+
+SERVICES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'services')
+sys.path.insert(0, SERVICES_DIR)
+sys.path.insert(0, os.path.join(SERVICES_DIR, 'generated'))
+
+from werkzeug.security import generate_password_hash, check_password_hash
+
+from grpc_auth_server import PASSWORD_HASH_METHOD, PASSWORD_SALT_LENGTH
+
+DEFAULT_METHODS = [
+    'scrypt:16384:8:1',
+    'scrypt:32768:8:1',
+    'scrypt:65536:8:1',
+    'pbkdf2:sha256:260000',
+    'pbkdf2:sha256:600000',
+    'pbkdf2:sha256:1000000',
+]
+
+
+def time_calls(func, count):
+    samples = []
+    for _ in range(count):
+        start = time.perf_counter()
+        func()
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('-m', '--method', action='append', help='werkzeug method string, repeatable')
+    parser.add_argument('-n', '--iterations', type=int, default=20, help='timed calls per method')
+    parser.add_argument('--salt-length', type=int, default=PASSWORD_SALT_LENGTH)
+    args = parser.parse_args()
+
+    methods = args.method or DEFAULT_METHODS
+    password = 'correct horse battery staple'
+
+    print(f"Current policy: {PASSWORD_HASH_METHOD}, {PASSWORD_SALT_LENGTH}-char salt")
+    print(f"{'method':<24} {'hash p50':>10} {'verify p50':>11} {'verify max':>11} {'logins/s/core':>14}")
+    for method in methods:
+        stored = generate_password_hash(password, method=method, salt_length=args.salt_length)  # warm up
+        hashes = time_calls(lambda: generate_password_hash(password, method=method, salt_length=args.salt_length),
+                            args.iterations)
+        verifies = time_calls(lambda: check_password_hash(stored, password), args.iterations)
+        verify_p50 = statistics.median(verifies)
+        marker = '  <- policy' if method == PASSWORD_HASH_METHOD else ''
+        print(f"{method:<24} {statistics.median(hashes) * 1000:>8.1f}ms {verify_p50 * 1000:>9.1f}ms "
+              f"{max(verifies) * 1000:>9.1f}ms {1 / verify_p50:>14.1f}{marker}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,115 @@
+"""
+Hot-query latency with and without server-side prepared statements.
+
+Calls the sync servicers in-process against the real databases and times
+each RPC with DB_PREPARED_STATEMENTS off (plain cur.execute) and on
+(PREPARE once per pooled connection, then EXECUTE), alternating between the
+two so drift hits both equally:
+    POSTGRES_HOST=/tmp/pgdata python benchmarks/prepared_statements_bench.py -n 500
+
+The benchmark student enrolls in up to three open courses and drops them again
+on exit; the read RPCs need that data to have rows to return.
+"""
+import argparse
+import contextlib
+import io
+import os
+import statistics
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+
+SERVICES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'services')
+sys.path.insert(0, SERVICES_DIR)
+sys.path.insert(0, os.path.join(SERVICES_DIR, 'generated'))
+
+import jwt
+
+import course_pb2
+import enrollment_pb2
+import grades_pb2
+
+import common_db
+from common_auth import JWT_ALGORITHM, JWT_SECRET_KEY
+from grpc_course_server import CourseServiceServicer
+from grpc_enrollment_server import EnrollmentServiceServicer
+from grpc_grades_server import GradesServiceServicer
+
+
+def make_token(role):
+    exp = datetime.now(timezone.utc) + timedelta(hours=1)
+    payload = {'public_id': str(uuid.uuid4()), 'username': f'bench_{role}', 'role': role, 'exp': exp}
+    return jwt.encode(payload, JWT_SECRET_KEY, algorithm=JWT_ALGORITHM)
+
+
+def time_calls(call, count):
+    samples = []
+    with contextlib.redirect_stdout(io.StringIO()):  # servicers log every call
+        for _ in range(count):
+            start = time.perf_counter()
+            call()
+            samples.append(time.perf_counter() - start)
+    return samples
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('-n', '--iterations', type=int, default=300, help='timed calls per RPC and mode')
+    parser.add_argument('--rounds', type=int, default=4, help='off/on alternations per RPC')
+    args = parser.parse_args()
+
+    courses = CourseServiceServicer()
+    enrollment = EnrollmentServiceServicer()
+    grades = GradesServiceServicer()
+    student = make_token('student')
+    faculty = make_token('faculty')
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        open_courses = [c.course_id for c in courses.GetCourses(course_pb2.GetCoursesRequest(), None).courses
+                        if c.is_open and c.enrolled < c.capacity][:3]
+        enrolled = [course_id for course_id in open_courses
+                    if enrollment.EnrollInCourse(
+                        enrollment_pb2.EnrollRequest(token=student, course_id=course_id), None).status == 'success']
+    course_id = enrolled[0] if enrolled else 'CS101'
+
+    rpcs = [
+        ('GetCourseDetails', lambda: courses.GetCourseDetails(course_pb2.CourseRequest(course_id=course_id), None)),
+        ('GetStudentEnrollments', lambda: enrollment.GetStudentEnrollments(
+            enrollment_pb2.StudentRequest(token=student), None)),
+        ('GetEnrolledCoursesWithGrades', lambda: grades.GetEnrolledCoursesWithGrades(
+            grades_pb2.EnrolledCoursesWithGradesRequest(token=student), None)),
+        ('GetStudentGrades', lambda: grades.GetStudentGrades(grades_pb2.GradesRequest(token=student), None)),
+        ('GetCourseGrades', lambda: grades.GetCourseGrades(
+            grades_pb2.CourseGradesRequest(token=faculty, course_id=course_id), None)),
+    ]
+
+    print(f"Student enrolled in {len(enrolled)} courses; {args.rounds} x {args.iterations} calls per RPC and mode")
+    print(f"{'rpc':<30} {'off p50':>9} {'on p50':>9} {'off p99':>9} {'on p99':>9} {'p50 gain':>9}")
+    try:
+        for name, call in rpcs:
+            samples = {False: [], True: []}
+            for prepared in (False, True):  # warm up: connections, PREPAREs, caches
+                common_db.DB_PREPARED_STATEMENTS = prepared
+                time_calls(call, 20)
+            for _ in range(args.rounds):
+                for prepared in (False, True):
+                    common_db.DB_PREPARED_STATEMENTS = prepared
+                    samples[prepared] += time_calls(call, args.iterations)
+            off, on = statistics.median(samples[False]), statistics.median(samples[True])
+            print(f"{name:<30} {off * 1000:>7.3f}ms {on * 1000:>7.3f}ms "
+                  f"{percentile(samples[False], 0.99) * 1000:>7.3f}ms {percentile(samples[True], 0.99) * 1000:>7.3f}ms "
+                  f"{(off - on) / off:>8.1%}")
+    finally:
+        with contextlib.redirect_stdout(io.StringIO()):
+            for enrolled_course in enrolled:
+                enrollment.DropFromCourse(enrollment_pb2.DropRequest(token=student, course_id=enrolled_course), None)
+
+
+if __name__ == '__main__':
+    main()
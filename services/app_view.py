@@ -1,6 +1,9 @@
-from flask import Flask, render_template, session, redirect, url_for, request, jsonify, flash
+from flask import Flask, render_template, session, redirect, url_for, request, jsonify, flash, Response
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from functools import wraps
+import os
 
 # Node 1: The View Server with Session Management
 app = Flask(__name__, 
@@ -12,6 +15,46 @@ app.secret_key = 'your_secret_key_here_change_in_production'
 # REST Gateway URL
 REST_GATEWAY_URL = 'http://localhost:5001/api/v1'
 
+# Pooled keep-alive HTTP client for gateway calls
+GATEWAY_POOL_MAXSIZE = int(os.getenv('GATEWAY_POOL_MAXSIZE', '32'))  # kept-alive connections per host
+GATEWAY_CONNECT_TIMEOUT = float(os.getenv('GATEWAY_CONNECT_TIMEOUT', '2'))
+GATEWAY_READ_TIMEOUT = float(os.getenv('GATEWAY_READ_TIMEOUT', '10'))
+GATEWAY_RETRIES = int(os.getenv('GATEWAY_RETRIES', '2'))  # idempotent methods only
+GATEWAY_CHUNK_SIZE = 64 * 1024
+
+# Headers the proxy relays unchanged (hop-by-hop headers like Connection are never forwarded)
+PASSTHROUGH_REQUEST_HEADERS = ('If-None-Match', 'If-Modified-Since', 'Accept-Encoding')
+PASSTHROUGH_RESPONSE_HEADERS = ('Content-Type', 'Content-Length', 'Content-Encoding',
+                                'ETag', 'Last-Modified', 'Cache-Control', 'Vary',
+                                'Content-Disposition', 'X-Accel-Buffering')
+
+def create_gateway_session():
+    """requests.Session whose connections to the gateway are reused across requests"""
+    # A 503 can come back after the backend committed (the gateway's gRPC deadline
+    # passed), so only reads are retried on status or read errors; connect errors,
+    # where nothing reached the gateway, are retried for every method
+    retry = Retry(
+        total=GATEWAY_RETRIES,
+        backoff_factor=0.1,
+        status_forcelist=(502, 503, 504),
+        allowed_methods=frozenset({'GET', 'HEAD', 'OPTIONS'}),
+        raise_on_status=False
+    )
+    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=GATEWAY_POOL_MAXSIZE,
+                          max_retries=retry, pool_block=False)
+    http = requests.Session()
+    http.mount('http://', adapter)
+    http.mount('https://', adapter)
+    return http
+
+gateway = create_gateway_session()
+GATEWAY_TIMEOUT = (GATEWAY_CONNECT_TIMEOUT, GATEWAY_READ_TIMEOUT)
+
+def forwarded_for():
+    """X-Forwarded-For for the gateway, with this request's client appended"""
+    prior = request.headers.get('X-Forwarded-For')
+    return f"{prior}, {request.remote_addr}" if prior else request.remote_addr
+
 def login_required(f):
     """Decorator to require login for protected routes"""
     @wraps(f)
@@ -43,10 +86,11 @@ def login():
     data = request.get_json()
     
     try:
-        response = requests.post(
+        response = gateway.post(
             f'{REST_GATEWAY_URL}/auth/login',
             json=data,
-            timeout=5
+            headers={'X-Forwarded-For': forwarded_for()},
+            timeout=(GATEWAY_CONNECT_TIMEOUT, 5)
         )
         
         result = response.json()
@@ -64,7 +108,8 @@ def login():
                 'role': result['role']
             }), 200
         else:
-            return jsonify(result), response.status_code
+            headers = {'Retry-After': response.headers['Retry-After']} if 'Retry-After' in response.headers else {}
+            return jsonify(result), response.status_code, headers
     
     except requests.exceptions.RequestException as e:
         return jsonify({
@@ -78,10 +123,10 @@ def register():
     data = request.get_json()
     
     try:
-        response = requests.post(
+        response = gateway.post(
             f'{REST_GATEWAY_URL}/auth/register',
             json=data,
-            timeout=5
+            timeout=(GATEWAY_CONNECT_TIMEOUT, 5)
         )
         
         result = response.json()
@@ -125,7 +170,8 @@ def courses_view():
     return render_template('courses.html', 
                          service_name="Course Service Node",
                          username=session.get('username'),
-                         role=session.get('role'))
+                         role=session.get('role'),
+                         gateway_url=REST_GATEWAY_URL)
 
 @app.route('/enroll')
 @login_required
@@ -169,28 +215,47 @@ def proxy_api(endpoint):
     
     headers = {
         'Authorization': f'Bearer {token}',
-        'Content-Type': 'application/json'
+        'Content-Type': request.headers.get('Content-Type', 'application/json')
     }
     
+    for name in PASSTHROUGH_REQUEST_HEADERS:
+        if name in request.headers:
+            headers[name] = request.headers[name]
+    # The body is relayed undecoded, so only ask for encodings the browser accepts
+    headers.setdefault('Accept-Encoding', 'identity')
+    
     url = f'{REST_GATEWAY_URL}/{endpoint}'
     
     try:
-        if request.method == 'GET':
-            response = requests.get(url, headers=headers, timeout=10)
-        elif request.method == 'POST':
-            response = requests.post(url, headers=headers, json=request.get_json(), timeout=10)
-        elif request.method == 'PUT':
-            response = requests.put(url, headers=headers, json=request.get_json(), timeout=10)
-        elif request.method == 'DELETE':
-            response = requests.delete(url, headers=headers, timeout=10)
-        
-        return jsonify(response.json()), response.status_code
-    
+        # Body bytes go upstream as-is and the reply is streamed back without re-encoding
+        upstream = gateway.request(
+            request.method,
+            url,
+            params=request.args,
+            headers=headers,
+            data=request.get_data() if request.method in ('POST', 'PUT') else None,
+            timeout=GATEWAY_TIMEOUT,
+            stream=True
+        )
     except requests.exceptions.RequestException as e:
         return jsonify({
             'status': 'error',
             'message': f'Service unavailable: {str(e)}'
         }), 503
+    
+    def body():
+        try:
+            # Raw wire bytes: nothing is decompressed, parsed or re-encoded here
+            for chunk in upstream.raw.stream(GATEWAY_CHUNK_SIZE, decode_content=False):
+                yield chunk
+        finally:
+            upstream.close()  # Hands the connection back to the pool
+    
+    response = Response(body(), status=upstream.status_code)
+    for name in PASSTHROUGH_RESPONSE_HEADERS:
+        if name in upstream.headers:
+            response.headers[name] = upstream.headers[name]
+    return response
 
 if __name__ == '__main__':
     print("=" * 70)
@@ -0,0 +1,21 @@
+# Schema of the auth database. Step N of MIGRATIONS is schema version N
+# (see common_migrations); the early steps are idempotent so databases
+# created before versioning adopt them as a baseline.
+
+SCHEMA_NAME = 'auth'
+
+MIGRATIONS = [
+    ('create_users', """
+        CREATE TABLE IF NOT EXISTS users (
+            id SERIAL PRIMARY KEY,
+            public_id UUID UNIQUE NOT NULL,
+            username VARCHAR(80) UNIQUE NOT NULL,
+            password_hash VARCHAR(255) NOT NULL,
+            role VARCHAR(50) NOT NULL DEFAULT 'student'
+        );
+    """),
+    ('users_role_username_index', """
+        CREATE INDEX IF NOT EXISTS idx_users_role_username
+        ON users (role, username COLLATE "C");
+    """),
+]
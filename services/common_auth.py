@@ -0,0 +1,143 @@
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+
+import jwt
+
+# JWT Configuration (must match auth server)
+JWT_SECRET_KEY = os.getenv('JWT_SECRET_KEY', 'super_secret_auth_key_12345')
+JWT_ALGORITHM = "HS256"
+
+# Decoded claims are reused until the token expires (or the TTL passes);
+# rejected tokens are remembered briefly so floods of bad tokens stay cheap
+JWT_CACHE_SIZE = int(os.getenv('JWT_CACHE_SIZE', '10000'))
+JWT_CACHE_TTL = float(os.getenv('JWT_CACHE_TTL', '300'))
+JWT_NEGATIVE_CACHE_SIZE = int(os.getenv('JWT_NEGATIVE_CACHE_SIZE', '10000'))
+JWT_NEGATIVE_CACHE_TTL = float(os.getenv('JWT_NEGATIVE_CACHE_TTL', '30'))
+
+
+def token_digest(token):
+    """Cache key for a token - avoids keeping raw bearer tokens around as dict keys"""
+    return hashlib.sha256(token.encode('utf-8')).digest()
+
+
+def token_expiry(token):
+    """Read the `exp` claim without verifying the signature (None if absent or malformed)"""
+    try:
+        exp = jwt.decode(token, options={"verify_signature": False}).get('exp')
+        return float(exp) if exp is not None else None
+    except (jwt.InvalidTokenError, TypeError, ValueError):
+        return None
+
+
+class TokenCache:
+    """
+    Bounded LRU cache of token validation results keyed by token digest.
+    Entries live for at most `ttl` seconds and never past the token's `exp`.
+    """
+
+    def __init__(self, max_size=10000, ttl=60.0):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries = OrderedDict()  # digest -> (expires_at, result)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, token):
+        key = token_digest(token)
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            expires_at, result = entry
+            if now >= expires_at:
+                del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return result
+
+    def put(self, token, result, exp=None):
+        expires_at = time.time() + self.ttl
+        if exp is not None:
+            expires_at = min(expires_at, exp)
+        if expires_at <= time.time():
+            return
+        key = token_digest(token)
+        with self._lock:
+            self._entries[key] = (expires_at, result)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            size = len(self._entries)
+        total = self.hits + self.misses
+        return {
+            "size": size,
+            "max_size": self.max_size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0
+        }
+
+
+_claims_cache = TokenCache(max_size=JWT_CACHE_SIZE, ttl=JWT_CACHE_TTL)
+_rejected_cache = TokenCache(max_size=JWT_NEGATIVE_CACHE_SIZE, ttl=JWT_NEGATIVE_CACHE_TTL)
+
+
+def validate_token_locally(token):
+    """Validate JWT token locally without calling auth service"""
+    if not token:
+        return {
+            "valid": False,
+            "message": "Token missing"
+        }
+
+    result = _claims_cache.get(token) or _rejected_cache.get(token)
+    if result is not None:
+        return result
+
+    try:
+        # jwt.decode verifies the signature and the exp claim
+        payload = jwt.decode(token, JWT_SECRET_KEY, algorithms=[JWT_ALGORITHM])
+    except jwt.ExpiredSignatureError:
+        result = {
+            "valid": False,
+            "message": "Token expired"
+        }
+    except jwt.InvalidTokenError:
+        result = {
+            "valid": False,
+            "message": "Invalid token"
+        }
+    else:
+        result = {
+            "valid": True,
+            "user_id": payload.get('public_id'),
+            "role": payload.get('role'),
+            "username": payload.get('username')
+        }
+        _claims_cache.put(token, result, payload.get('exp'))
+        return result
+
+    _rejected_cache.put(token, result)
+    return result
+
+
+def token_cache_stats():
+    return {
+        "claims": _claims_cache.stats(),
+        "rejected": _rejected_cache.stats()
+    }
@@ -0,0 +1,336 @@
+import os
+import re
+import threading
+import time
+
+import psycopg2
+from psycopg2 import extensions
+
+# Shared PostgreSQL pool config for all gRPC services.
+# Every value can be overridden per database by suffixing the database name,
+# e.g. DB_POOL_MAX_SIZE_STUDENT_PORTAL_GRADES=20
+DB_POOL_MIN_SIZE = int(os.getenv('DB_POOL_MIN_SIZE', '1'))
+DB_POOL_MAX_SIZE = int(os.getenv('DB_POOL_MAX_SIZE', '10'))  # matches ThreadPoolExecutor(max_workers=10)
+DB_POOL_TIMEOUT = float(os.getenv('DB_POOL_TIMEOUT', '5'))  # seconds to wait for a free connection
+DB_POOL_MAX_LIFETIME = float(os.getenv('DB_POOL_MAX_LIFETIME', '1800'))  # recycle after this many seconds
+DB_POOL_HEALTH_CHECK_IDLE = float(os.getenv('DB_POOL_HEALTH_CHECK_IDLE', '30'))  # ping if idle longer
+DB_POOL_STATS_INTERVAL = float(os.getenv('DB_POOL_STATS_INTERVAL', '0'))  # 0 disables periodic stats
+DB_CONNECT_TIMEOUT = int(os.getenv('DB_CONNECT_TIMEOUT', '5'))  # seconds; bounds connects to an unreachable host
+DB_STATEMENT_TIMEOUT_MS = int(os.getenv('DB_STATEMENT_TIMEOUT_MS', '0'))  # 0 = no server-side limit
+# Hot queries are PREPAREd once per pooled connection and then run with EXECUTE.
+# Turn off behind poolers that don't keep session state (PgBouncer transaction mode).
+DB_PREPARED_STATEMENTS = os.getenv('DB_PREPARED_STATEMENTS', 'true').lower() in ('1', 'true', 'yes')
+
+
+def pool_setting(name, dbname, value, cast):
+    """
+    Resolve a pool setting: the value passed in code first, then the
+    per-database env override, then the global default
+    """
+    if value is not None:
+        return value
+    override = os.getenv(f'{name}_{dbname.upper()}')
+    if override is not None:
+        return cast(override)
+    return globals()[name]
+
+
+class PooledConnection(extensions.connection):
+    """psycopg2 connection that remembers which statements it has PREPAREd"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.prepared_statements = set()
+
+
+class PreparedStatement:
+    """
+    A hot query written with the usual %s / %(name)s placeholders. The first
+    execute() on a pooled connection PREPAREs it server-side; every call then
+    runs EXECUTE, skipping parse and analysis and letting Postgres reuse the plan.
+    """
+
+    _defined = {}  # name -> sql; names are per session, so they must be unique
+
+    def __init__(self, name, sql):
+        if PreparedStatement._defined.setdefault(name, sql) != sql:
+            raise ValueError(f"Prepared statement '{name}' is already defined")
+        self.name = name
+        self.sql = sql
+        self._param_names = []  # %(name)s placeholders, in $n order
+        casts = []  # a placeholder's ::type, repeated on its EXECUTE argument
+
+        def number(match):
+            if match.group(0) == '%%':
+                return '%'
+            key, cast = match.group(1), match.group(2) or ''
+            if key is None or key not in self._param_names:
+                self._param_names.append(key)
+                casts.append(cast)
+                return f"${len(self._param_names)}{cast}"
+            return f"${self._param_names.index(key) + 1}{cast}"
+
+        body = re.sub(r"%%|(?:%\((\w+)\)s|%s)(::[\w\[\]]+)?", number, sql.strip().rstrip(';'))
+        self._prepare_sql = f"PREPARE {name} AS {body}"
+        # Array arguments arrive as text[], which only an explicit cast turns into e.g. uuid[]
+        args = ", ".join(f"%s{cast}" for cast in casts)
+        self._execute_sql = f"EXECUTE {name} ({args})" if args else f"EXECUTE {name}"
+
+    def _prepare(self, cur, prepared):
+        if self.name not in prepared:
+            # Prepared statements outlive rollbacks; they last as long as the session
+            cur.execute(self._prepare_sql)
+            prepared.add(self.name)
+
+    def _execute_args(self, params):
+        if isinstance(params, dict):
+            return [params[key] for key in self._param_names]
+        return params
+
+    def execute(self, cur, params=()):
+        """Run on cur's connection, preparing it there first if needed"""
+        prepared = getattr(cur.connection, 'prepared_statements', None)
+        if not DB_PREPARED_STATEMENTS or prepared is None:
+            cur.execute(self.sql, params)
+            return
+        self._prepare(cur, prepared)
+        cur.execute(self._execute_sql, self._execute_args(params))
+
+    def explain(self, cur, params=(), generic=False):
+        """
+        Plan of the prepared statement as JSON, for the custom plan built from
+        params or the generic plan Postgres switches to after a few executions.
+        Needs a PooledConnection; sets plan_cache_mode for the current transaction.
+        """
+        self._prepare(cur, cur.connection.prepared_statements)
+        mode = 'force_generic_plan' if generic else 'force_custom_plan'
+        cur.execute(f"SET LOCAL plan_cache_mode = {mode};")
+        cur.execute(f"EXPLAIN (FORMAT JSON) {self._execute_sql}", self._execute_args(params))
+        return cur.fetchone()[0][0]['Plan']
+
+
+class ConnectionPool:
+    """
+    Thread-safe psycopg2 connection pool.
+    Callers block up to `timeout` seconds for a free connection, idle
+    connections are health-checked before reuse and old ones are recycled.
+    """
+
+    def __init__(self, dbname, user, password, host, port,
+                 min_size=None, max_size=None, timeout=None,
+                 max_lifetime=None, health_check_idle=None,
+                 connect_timeout=None, statement_timeout_ms=None):
+        self.dbname = dbname
+        self._connect_args = dict(dbname=dbname, user=user, password=password, host=host, port=port,
+                                  connect_timeout=pool_setting('DB_CONNECT_TIMEOUT', dbname, connect_timeout, int))
+        statement_timeout_ms = pool_setting('DB_STATEMENT_TIMEOUT_MS', dbname, statement_timeout_ms, int)
+        if statement_timeout_ms:
+            self._connect_args['options'] = f"-c statement_timeout={statement_timeout_ms}"
+        self.min_size = pool_setting('DB_POOL_MIN_SIZE', dbname, min_size, int)
+        self.max_size = pool_setting('DB_POOL_MAX_SIZE', dbname, max_size, int)
+        self.timeout = pool_setting('DB_POOL_TIMEOUT', dbname, timeout, float)
+        self.max_lifetime = pool_setting('DB_POOL_MAX_LIFETIME', dbname, max_lifetime, float)
+        self.health_check_idle = pool_setting('DB_POOL_HEALTH_CHECK_IDLE', dbname, health_check_idle, float)
+
+        self._cond = threading.Condition()
+        self._idle = []        # [(conn, last_used)] - most recently used last
+        self._created = {}     # conn -> creation time, for every open connection
+        self._size = 0         # open connections plus slots reserved for connects in progress
+        self._in_use = 0
+
+        # Metrics
+        self._checkouts = 0
+        self._timeouts = 0
+        self._waiting = 0
+        self._total_wait = 0.0
+        self._max_wait = 0.0
+        self._peak_in_use = 0
+        self._recycled = 0
+        self._failed_health_checks = 0
+
+    def _connect(self):
+        conn = psycopg2.connect(connection_factory=PooledConnection, **self._connect_args)
+        self._created[conn] = time.monotonic()
+        return conn
+
+    def _discard(self, conn):
+        self._created.pop(conn, None)
+        try:
+            conn.close()
+        except psycopg2.Error:
+            pass
+
+    def _is_healthy(self, conn, last_used):
+        """Recycle expired connections and ping ones that sat idle for a while"""
+        now = time.monotonic()
+        if conn.closed:
+            return False
+        if now - self._created.get(conn, now) > self.max_lifetime:
+            self._recycled += 1
+            return False
+        if now - last_used > self.health_check_idle:
+            try:
+                with conn.cursor() as cur:
+                    cur.execute("SELECT 1;")
+                conn.rollback()
+            except psycopg2.Error:
+                self._failed_health_checks += 1
+                return False
+        return True
+
+    def warm(self):
+        """Open min_size connections up front so the first requests skip the handshake"""
+        conns = [self.getconn() for _ in range(self.min_size)]
+        for conn in conns:
+            self.putconn(conn)
+
+    def getconn(self):
+        """Check out a connection, or return None if the database is unavailable"""
+        start = time.monotonic()
+        deadline = start + self.timeout
+        conn = None
+        last_used = None
+
+        with self._cond:
+            self._waiting += 1
+            try:
+                while True:
+                    if self._idle:
+                        conn, last_used = self._idle.pop()
+                        break
+                    if self._size < self.max_size:
+                        self._size += 1
+                        break
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        self._timeouts += 1
+                        print(f"Database pool '{self.dbname}' exhausted: no connection after {self.timeout}s")
+                        return None
+                    self._cond.wait(remaining)
+            finally:
+                self._waiting -= 1
+
+            waited = time.monotonic() - start
+            self._checkouts += 1
+            self._total_wait += waited
+            self._max_wait = max(self._max_wait, waited)
+            self._in_use += 1
+            self._peak_in_use = max(self._peak_in_use, self._in_use)
+
+        # Health check and connect happen outside the lock; the slot is already ours
+        if conn is not None and not self._is_healthy(conn, last_used):
+            self._discard(conn)
+            conn = None
+
+        if conn is None:
+            try:
+                conn = self._connect()
+            except psycopg2.OperationalError as e:
+                print(f"Database connection failed: {e}")
+                with self._cond:
+                    self._size -= 1
+                    self._in_use -= 1
+                    self._cond.notify()
+                return None
+
+        return conn
+
+    def putconn(self, conn):
+        """Return a connection to the pool, rolling back any open transaction"""
+        if conn is None:
+            return
+
+        keep = not conn.closed
+        if keep and conn.get_transaction_status() != extensions.TRANSACTION_STATUS_IDLE:
+            try:
+                conn.rollback()
+            except psycopg2.Error:
+                keep = False
+
+        with self._cond:
+            self._in_use -= 1
+            if keep:
+                self._idle.append((conn, time.monotonic()))
+            else:
+                self._size -= 1
+            self._cond.notify()
+
+        if not keep:
+            self._discard(conn)
+
+    def closeall(self):
+        with self._cond:
+            idle, self._idle = self._idle, []
+            self._size -= len(idle)
+        for conn, _ in idle:
+            self._discard(conn)
+
+    def stats(self):
+        """Snapshot of pool wait-time and saturation metrics"""
+        with self._cond:
+            return {
+                "dbname": self.dbname,
+                "max_size": self.max_size,
+                "size": self._size,
+                "in_use": self._in_use,
+                "idle": len(self._idle),
+                "waiting": self._waiting,
+                "saturation": self._in_use / self.max_size if self.max_size else 0.0,
+                "peak_in_use": self._peak_in_use,
+                "checkouts": self._checkouts,
+                "timeouts": self._timeouts,
+                "avg_wait_ms": (self._total_wait / self._checkouts * 1000) if self._checkouts else 0.0,
+                "max_wait_ms": self._max_wait * 1000,
+                "recycled": self._recycled,
+                "failed_health_checks": self._failed_health_checks
+            }
+
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def get_pool(dbname, **connect_args):
+    """
+    Return the process-wide pool for a database, creating it on first use.
+    connect_args are user, password, host, port and optional pool sizing.
+    Pools are keyed by database, host and port, so a replica with the same
+    database name on another server gets its own pool.
+    """
+    key = (dbname, connect_args.get('host'), connect_args.get('port'))
+    with _pools_lock:
+        pool = _pools.get(key)
+        if pool is None:
+            pool = ConnectionPool(dbname, **connect_args)
+            _pools[key] = pool
+        return pool
+
+
+def pool_stats():
+    with _pools_lock:
+        pools = list(_pools.values())
+    return [pool.stats() for pool in pools]
+
+
+def log_pool_stats():
+    for s in pool_stats():
+        print(f"[db-pool {s['dbname']}] in_use={s['in_use']}/{s['max_size']} "
+              f"saturation={s['saturation']:.0%} waiting={s['waiting']} "
+              f"avg_wait={s['avg_wait_ms']:.1f}ms max_wait={s['max_wait_ms']:.1f}ms "
+              f"timeouts={s['timeouts']} recycled={s['recycled']}")
+
+
+def start_pool_stats_reporter(interval=None):
+    """Print pool metrics every `interval` seconds (DB_POOL_STATS_INTERVAL, disabled when 0)"""
+    interval = DB_POOL_STATS_INTERVAL if interval is None else interval
+    if interval <= 0:
+        return None
+
+    def report():
+        while True:
+            time.sleep(interval)
+            log_pool_stats()
+
+    thread = threading.Thread(target=report, name='db-pool-stats', daemon=True)
+    thread.start()
+    return thread
@@ -0,0 +1,54 @@
+import psycopg
+from psycopg.rows import dict_row
+from psycopg_pool import AsyncConnectionPool, PoolTimeout
+
+from common_db import pool_setting
+
+# Async PostgreSQL pools for the grpc.aio servers (psycopg 3). Sizing uses the
+# same DB_POOL_* settings and per-database overrides as common_db; with no
+# worker threads to match, the pool size is what bounds a server's concurrency.
+
+# Raised when no connection could be obtained (pool exhausted or DB down)
+DB_UNAVAILABLE = (PoolTimeout, psycopg.OperationalError)
+
+_pools = {}
+
+
+def get_aio_pool(dbname, user, password, host, port, min_size=None, max_size=None, timeout=None):
+    """
+    Return the process-wide async pool for a database, creating it on first use.
+    Connections return rows as dicts (like DictCursor). Call open_aio_pools()
+    from the event loop before serving. Keyed like common_db.get_pool, by
+    database, host and port.
+    """
+    key = (dbname, host, port)
+    pool = _pools.get(key)
+    if pool is None:
+        pool = AsyncConnectionPool(
+            conninfo=psycopg.conninfo.make_conninfo(
+                dbname=dbname, user=user, password=password, host=host, port=port
+            ),
+            kwargs={"row_factory": dict_row},
+            min_size=pool_setting('DB_POOL_MIN_SIZE', dbname, min_size, int),
+            max_size=pool_setting('DB_POOL_MAX_SIZE', dbname, max_size, int),
+            timeout=pool_setting('DB_POOL_TIMEOUT', dbname, timeout, float),
+            max_lifetime=pool_setting('DB_POOL_MAX_LIFETIME', dbname, None, float),
+            name=f"{dbname}@{host}:{port}",
+            open=False
+        )
+        _pools[key] = pool
+    return pool
+
+
+async def open_aio_pools():
+    for pool in _pools.values():
+        await pool.open()
+
+
+async def close_aio_pools():
+    for pool in _pools.values():
+        await pool.close()
+
+
+def aio_pool_stats():
+    return {pool.name: pool.get_stats() for pool in _pools.values()}
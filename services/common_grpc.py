@@ -0,0 +1,106 @@
+import os
+import threading
+
+import grpc
+
+# Shared gRPC channel config for clients (REST gateway, service-to-service calls)
+GRPC_CALL_TIMEOUT = float(os.getenv('GRPC_CALL_TIMEOUT', '5'))  # per-call deadline in seconds
+GRPC_EXPORT_TIMEOUT = float(os.getenv('GRPC_EXPORT_TIMEOUT', '300'))  # deadline for whole export streams
+GRPC_KEEPALIVE_TIME_MS = int(os.getenv('GRPC_KEEPALIVE_TIME_MS', '30000'))
+GRPC_KEEPALIVE_TIMEOUT_MS = int(os.getenv('GRPC_KEEPALIVE_TIMEOUT_MS', '10000'))
+
+GRPC_CHANNEL_OPTIONS = [
+    # Keep idle HTTP/2 connections alive so the next request skips connection setup
+    ('grpc.keepalive_time_ms', GRPC_KEEPALIVE_TIME_MS),
+    ('grpc.keepalive_timeout_ms', GRPC_KEEPALIVE_TIMEOUT_MS),
+    ('grpc.keepalive_permit_without_calls', 1),
+    ('grpc.http2.max_pings_without_data', 0),
+    # Back off reconnect attempts while a backend is down
+    ('grpc.initial_reconnect_backoff_ms', 500),
+    ('grpc.min_reconnect_backoff_ms', 500),
+    ('grpc.max_reconnect_backoff_ms', 10000),
+]
+
+# Server concurrency: worker threads of the sync servers (each also sizes its DB
+# pool), plus optional caps on HTTP/2 streams per client connection and on
+# in-flight RPCs per server (0 = unlimited; mostly useful for the grpc.aio servers).
+# A stream cap refuses calls a client opens before it has seen the server's
+# SETTINGS, so keep it above the largest burst one channel can send.
+GRPC_MAX_WORKERS = int(os.getenv('GRPC_MAX_WORKERS', '10'))
+GRPC_MAX_CONCURRENT_STREAMS = int(os.getenv('GRPC_MAX_CONCURRENT_STREAMS', '0'))
+GRPC_MAX_CONCURRENT_RPCS = int(os.getenv('GRPC_MAX_CONCURRENT_RPCS', '0')) or None
+
+# Server side must accept the client keepalive pings above
+GRPC_SERVER_OPTIONS = [
+    ('grpc.keepalive_permit_without_calls', 1),
+    ('grpc.http2.min_ping_interval_without_data_ms', min(GRPC_KEEPALIVE_TIME_MS, 10000)),
+    ('grpc.http2.max_pings_without_data', 0),
+]
+if GRPC_MAX_CONCURRENT_STREAMS:
+    GRPC_SERVER_OPTIONS.append(('grpc.max_concurrent_streams', GRPC_MAX_CONCURRENT_STREAMS))
+
+_channels = {}
+_stubs = {}
+_lock = threading.Lock()
+
+
+def get_channel(target):
+    """Return the process-wide channel for a target, creating it on first use"""
+    with _lock:
+        channel = _channels.get(target)
+        if channel is None:
+            channel = grpc.insecure_channel(target, options=GRPC_CHANNEL_OPTIONS)
+            _channels[target] = channel
+        return channel
+
+
+def get_stub(target, stub_class):
+    """Return a shared stub of stub_class bound to the long-lived channel for target"""
+    key = (target, stub_class)
+    stub = _stubs.get(key)
+    if stub is None:
+        channel = get_channel(target)
+        with _lock:
+            stub = _stubs.setdefault(key, stub_class(channel))
+    return stub
+
+
+def close_channels():
+    with _lock:
+        channels = list(_channels.values())
+        _channels.clear()
+        _stubs.clear()
+    for channel in channels:
+        channel.close()
+
+
+# grpc.aio channels belong to the event loop that created them, so these are
+# only used from code running on one loop (the async gateway and servers)
+_aio_channels = {}
+_aio_stubs = {}
+
+
+def get_aio_channel(target):
+    """Return the shared grpc.aio channel for a target, creating it on first use"""
+    channel = _aio_channels.get(target)
+    if channel is None:
+        channel = grpc.aio.insecure_channel(target, options=GRPC_CHANNEL_OPTIONS)
+        _aio_channels[target] = channel
+    return channel
+
+
+def get_aio_stub(target, stub_class):
+    """Return a shared stub of stub_class bound to the grpc.aio channel for target"""
+    key = (target, stub_class)
+    stub = _aio_stubs.get(key)
+    if stub is None:
+        stub = _aio_stubs[key] = stub_class(get_aio_channel(target))
+    return stub
+
+
+async def close_aio_channels():
+    channels = list(_aio_channels.values())
+    _aio_channels.clear()
+    _aio_stubs.clear()
+    for channel in channels:
+        await channel.close()
@@ -0,0 +1,61 @@
+# Versioned schema migrations shared by the services.
+# Each schema (auth, courses, grades) has an ordered MIGRATIONS list of
+# (name, sql) steps in its *_schema module, and step N is schema version N:
+# only ever append steps, never edit or reorder applied ones. The
+# schema_version table records what has been applied, so once a database is
+# current a service start costs one lookup in a tiny table, whatever the
+# size of the data.
+
+SCHEMA_VERSION_TABLE = """
+    CREATE TABLE IF NOT EXISTS schema_version (
+        schema_name VARCHAR(50) NOT NULL,
+        version INTEGER NOT NULL,
+        name VARCHAR(100) NOT NULL,
+        applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        PRIMARY KEY (schema_name, version)
+    );
+"""
+
+
+def current_version(cur, schema_name):
+    """Latest applied version of schema_name (0 for a database without schema_version)"""
+    cur.execute("SELECT to_regclass('schema_version') IS NOT NULL;")
+    if not cur.fetchone()[0]:
+        return 0
+    cur.execute("SELECT COALESCE(MAX(version), 0) FROM schema_version WHERE schema_name = %s;", (schema_name,))
+    return cur.fetchone()[0]
+
+
+def apply_migrations(conn, schema_name, migrations):
+    """
+    Apply the steps after schema_name's current version, each in its own
+    transaction together with its schema_version row. A session advisory lock
+    keeps concurrent service starts from applying the same step twice.
+    Returns the number of steps applied.
+    """
+    applied = 0
+    with conn.cursor() as cur:
+        cur.execute("SELECT pg_advisory_lock(hashtext('schema_version'));")
+        try:
+            cur.execute(SCHEMA_VERSION_TABLE)
+            version = current_version(cur, schema_name)
+            conn.commit()
+
+            if version > len(migrations):
+                print(f"✗ {schema_name} schema is at version {version}, newer than this code ({len(migrations)})")
+            for step, (name, sql) in enumerate(migrations[version:], start=version + 1):
+                try:
+                    cur.execute(sql)
+                    cur.execute("INSERT INTO schema_version (schema_name, version, name) VALUES (%s, %s, %s);",
+                                (schema_name, step, name))
+                    conn.commit()
+                except Exception:
+                    print(f"✗ {schema_name}: migration {step} ({name}) failed")
+                    raise
+                applied += 1
+                print(f"✓ {schema_name}: applied migration {step} ({name})")
+        finally:
+            conn.rollback()  # session-level lock: survives the rollback of a failed step
+            cur.execute("SELECT pg_advisory_unlock(hashtext('schema_version'));")
+            conn.commit()
+    return applied
@@ -0,0 +1,183 @@
+import os
+import threading
+import time
+from collections import OrderedDict, deque
+from urllib.parse import unquote
+
+# Login throttling for the auth service. Every attempt spends a token from a
+# bucket per username and one per client address; too many failed logins
+# within LOGIN_FAILURE_WINDOW lock that username or address out for
+# LOGIN_LOCKOUT_SECONDS. State is in memory and per process, so with
+# AUTH_WORKER_PROCESSES=N an attacker spread over N connections gets up to N
+# times these limits.
+LOGIN_RATE_LIMIT_ENABLED = os.getenv('LOGIN_RATE_LIMIT_ENABLED', 'true').lower() in ('1', 'true', 'yes')
+LOGIN_USER_BURST = int(os.getenv('LOGIN_USER_BURST', '5'))
+LOGIN_USER_PER_MINUTE = float(os.getenv('LOGIN_USER_PER_MINUTE', '10'))
+LOGIN_PEER_BURST = int(os.getenv('LOGIN_PEER_BURST', '20'))
+LOGIN_PEER_PER_MINUTE = float(os.getenv('LOGIN_PEER_PER_MINUTE', '60'))
+LOGIN_FAILURE_WINDOW = float(os.getenv('LOGIN_FAILURE_WINDOW', '600'))
+LOGIN_USER_MAX_FAILURES = int(os.getenv('LOGIN_USER_MAX_FAILURES', '10'))
+LOGIN_PEER_MAX_FAILURES = int(os.getenv('LOGIN_PEER_MAX_FAILURES', '50'))
+LOGIN_LOCKOUT_SECONDS = float(os.getenv('LOGIN_LOCKOUT_SECONDS', '300'))
+LOGIN_LIMITER_MAX_KEYS = int(os.getenv('LOGIN_LIMITER_MAX_KEYS', '100000'))
+LOGIN_LIMITER_STATS_INTERVAL = float(os.getenv('LOGIN_LIMITER_STATS_INTERVAL', '0'))  # 0 disables
+
+# Proxies whose forwarded client address is believed: app_view's X-Forwarded-For
+# at the REST gateway, and the gateway's x-client-address at the auth service
+# (both run locally by default)
+TRUSTED_PROXIES = {p.strip() for p in os.getenv('TRUSTED_PROXIES', '127.0.0.1,::1').split(',') if p.strip()}
+
+
+def forwarded_client_address(remote_addr, forwarded_for):
+    """The browser's address: the last X-Forwarded-For hop when a trusted proxy added it"""
+    if forwarded_for and remote_addr in TRUSTED_PROXIES:
+        return forwarded_for.split(',')[-1].strip()
+    return remote_addr or ''
+
+
+def grpc_peer_host(peer):
+    """Host part of a gRPC peer string: 'ipv4:10.0.0.5:53422' -> '10.0.0.5', 'ipv6:[::1]:53422' -> '::1'"""
+    kind, _, address = unquote(peer).partition(':')  # newer gRPC percent-encodes the brackets
+    if kind not in ('ipv4', 'ipv6'):
+        return peer  # e.g. unix: sockets have no port to drop
+    return address.rsplit(':', 1)[0].strip('[]')
+
+
+class LoginRateLimiter:
+    """
+    Token buckets plus sliding-window failure lockout, keyed by username and
+    client address. check() is cheap and runs before any DB or hash work;
+    report the outcome of allowed attempts with record_failure/record_success.
+    """
+
+    def __init__(self, user_burst=LOGIN_USER_BURST, user_per_minute=LOGIN_USER_PER_MINUTE,
+                 peer_burst=LOGIN_PEER_BURST, peer_per_minute=LOGIN_PEER_PER_MINUTE,
+                 failure_window=LOGIN_FAILURE_WINDOW, user_max_failures=LOGIN_USER_MAX_FAILURES,
+                 peer_max_failures=LOGIN_PEER_MAX_FAILURES, lockout_seconds=LOGIN_LOCKOUT_SECONDS,
+                 max_keys=LOGIN_LIMITER_MAX_KEYS):
+        # kind -> (burst, tokens per second, failures before lockout)
+        self._limits = {
+            'user': (user_burst, user_per_minute / 60, user_max_failures),
+            'peer': (peer_burst, peer_per_minute / 60, peer_max_failures),
+        }
+        self.failure_window = failure_window
+        self.lockout_seconds = lockout_seconds
+        self.max_keys = max_keys
+        self._buckets = OrderedDict()   # (kind, key) -> [tokens, updated_at]
+        self._failures = OrderedDict()  # (kind, key) -> deque of failure times
+        self._locked = OrderedDict()    # (kind, key) -> locked_until
+        self._lock = threading.Lock()
+
+        # Metrics
+        self.allowed = 0
+        self.shed = {'user_rate': 0, 'peer_rate': 0, 'user_locked': 0, 'peer_locked': 0}
+        self.failures = 0
+        self.lockouts = 0
+
+    @staticmethod
+    def _keys(username, peer):
+        return (('user', username.casefold()), ('peer', peer or 'unknown'))
+
+    def _touch(self, table, key, value):
+        table[key] = value
+        table.move_to_end(key)
+        while len(table) > self.max_keys:
+            table.popitem(last=False)
+
+    def check(self, username, peer):
+        """
+        Spend one attempt for username and peer.
+        Returns (allowed, retry_after_seconds); nothing is spent when rejected.
+        """
+        now = time.monotonic()
+        keys = self._keys(username, peer)
+        with self._lock:
+            for key in keys:
+                locked_until = self._locked.get(key)
+                if locked_until is None:
+                    continue
+                if locked_until > now:
+                    self.shed[f'{key[0]}_locked'] += 1
+                    return False, locked_until - now
+                del self._locked[key]
+
+            buckets = []
+            for key in keys:
+                burst, rate, _ = self._limits[key[0]]
+                tokens, updated_at = self._buckets.get(key, (burst, now))
+                tokens = min(burst, tokens + (now - updated_at) * rate)
+                if tokens < 1:
+                    self.shed[f'{key[0]}_rate'] += 1
+                    return False, (1 - tokens) / rate if rate else self.lockout_seconds
+                buckets.append((key, tokens))
+
+            for key, tokens in buckets:
+                self._touch(self._buckets, key, [tokens - 1, now])
+            self.allowed += 1
+            return True, 0.0
+
+    def record_failure(self, username, peer):
+        """Count a failed login; lock out a username or address that fails too often"""
+        now = time.monotonic()
+        locked = []
+        with self._lock:
+            self.failures += 1
+            for key in self._keys(username, peer):
+                max_failures = self._limits[key[0]][2]
+                window = self._failures.get(key)
+                if window is None or window.maxlen != max_failures:
+                    window = deque(maxlen=max_failures)
+                window.append(now)
+                if len(window) == max_failures and now - window[0] <= self.failure_window:
+                    self._touch(self._locked, key, now + self.lockout_seconds)
+                    self.lockouts += 1
+                    window.clear()
+                    locked.append(key)
+                self._touch(self._failures, key, window)
+        for kind, key in locked:
+            print(f"✗ Login lockout: {kind} '{key}' for {self.lockout_seconds:.0f}s")
+
+    def record_success(self, username, peer):
+        """A successful login clears the username's failure history"""
+        with self._lock:
+            self._failures.pop(self._keys(username, peer)[0], None)
+
+    def stats(self):
+        with self._lock:
+            shed = dict(self.shed)
+            locked = len(self._locked)
+            tracked = len(self._buckets)
+        total_shed = sum(shed.values())
+        attempts = self.allowed + total_shed
+        return {
+            "allowed": self.allowed,
+            "shed": total_shed,
+            "shed_rate": total_shed / attempts if attempts else 0.0,
+            **{f"shed_{reason}": count for reason, count in shed.items()},
+            "failures": self.failures,
+            "lockouts": self.lockouts,
+            "locked_keys": locked,
+            "tracked_keys": tracked
+        }
+
+    def log_stats(self):
+        s = self.stats()
+        print(f"[login-limiter] allowed={s['allowed']} shed={s['shed']} ({s['shed_rate']:.0%}) "
+              f"user_rate={s['shed_user_rate']} peer_rate={s['shed_peer_rate']} "
+              f"user_locked={s['shed_user_locked']} peer_locked={s['shed_peer_locked']} "
+              f"lockouts={s['lockouts']} locked_now={s['locked_keys']}")
+
+    def start_stats_reporter(self, interval=None):
+        """Print limiter metrics every `interval` seconds (LOGIN_LIMITER_STATS_INTERVAL, disabled when 0)"""
+        interval = LOGIN_LIMITER_STATS_INTERVAL if interval is None else interval
+        if interval <= 0:
+            return None
+
+        def report():
+            while True:
+                time.sleep(interval)
+                self.log_stats()
+
+        thread = threading.Thread(target=report, name='login-limiter-stats', daemon=True)
+        thread.start()
+        return thread
@@ -0,0 +1,208 @@
+import argparse
+import os
+import sys
+
+import psycopg2
+
+from common_db import PooledConnection
+from common_migrations import apply_migrations
+
+# Schema of the courses database (courses, enrollments), shared by the course
+# and enrollment services. Step N of MIGRATIONS is schema version N (see
+# common_migrations); the early steps are idempotent so databases created
+# before versioning adopt them as a baseline.
+#
+# Audit the plans of the hot queries against a large synthetic dataset:
+#     python courses_schema.py --audit
+
+SCHEMA_NAME = 'courses'
+COURSE_CATALOG_CHANNEL = 'course_catalog_changed'
+
+MIGRATIONS = [
+    ('create_courses', """
+        CREATE TABLE IF NOT EXISTS courses (
+            course_id VARCHAR(20) PRIMARY KEY,
+            name VARCHAR(100) NOT NULL,
+            capacity INTEGER NOT NULL,
+            enrolled INTEGER DEFAULT 0,
+            is_open BOOLEAN DEFAULT TRUE
+        );
+    """),
+    ('create_enrollments', """
+        CREATE TABLE IF NOT EXISTS enrollments (
+            id SERIAL PRIMARY KEY,
+            student_public_id UUID NOT NULL,
+            course_id VARCHAR(20) NOT NULL,
+            enrollment_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            UNIQUE(student_public_id, course_id)
+        );
+    """),
+    # Notify listeners (the catalog cache) whenever course rows change
+    ('course_catalog_notify', f"""
+        CREATE OR REPLACE FUNCTION notify_course_catalog_changed() RETURNS trigger AS $$
+        BEGIN
+            PERFORM pg_notify('{COURSE_CATALOG_CHANNEL}', '');
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql;
+        DROP TRIGGER IF EXISTS courses_catalog_changed ON courses;
+        CREATE TRIGGER courses_catalog_changed
+        AFTER INSERT OR DELETE OR UPDATE OF name, capacity, enrolled, is_open ON courses
+        FOR EACH STATEMENT EXECUTE FUNCTION notify_course_catalog_changed();
+    """),
+    # A student's enrollments, newest first, without a sort or heap visit for course_id
+    ('enrollments_student_date_index', """
+        CREATE INDEX IF NOT EXISTS idx_enrollments_student_date
+        ON enrollments (student_public_id, enrollment_date DESC) INCLUDE (course_id);
+    """),
+    # Course-level listings (who is enrolled in a course)
+    ('enrollments_course_index', """
+        CREATE INDEX IF NOT EXISTS idx_enrollments_course
+        ON enrollments (course_id);
+    """),
+]
+
+
+SAMPLE_COURSES = [
+    ('CS101', 'Introduction to Computer Science', 30, 0, True),
+    ('MATH203', 'Calculus III', 25, 0, True),
+    ('ENG100', 'English Composition', 20, 0, True),
+    ('GERIZAL', 'Rizal: Life and Works', 35, 0, True),
+    ('GEETHIC', 'Ethics', 30, 0, True),
+]
+
+
+def create_schema(cur):
+    """Run every step, unversioned, in the current search_path; the caller commits"""
+    for name, sql in MIGRATIONS:
+        cur.execute(sql)
+
+
+def seed(cur):
+    """Insert the sample courses that are missing; returns how many were added"""
+    added = 0
+    for course in SAMPLE_COURSES:
+        cur.execute("""
+            INSERT INTO courses (course_id, name, capacity, enrolled, is_open)
+            VALUES (%s, %s, %s, %s, %s)
+            ON CONFLICT (course_id) DO NOTHING;
+        """, course)
+        added += cur.rowcount
+    return added
+
+
+def hot_queries(student_id, course_id):
+    """(statement, params) for every prepared query the services run against this database"""
+    import grpc_course_server
+    import grpc_enrollment_server
+    import grpc_faculty_grades_server
+    import grpc_grades_server
+
+    return [
+        (grpc_course_server.SELECT_COURSE, (course_id,)),
+        (grpc_enrollment_server.ENROLL, {"student_id": student_id, "course_id": course_id}),
+        (grpc_enrollment_server.SELECT_STUDENT_ENROLLMENTS, (student_id,)),
+        (grpc_enrollment_server.SELECT_ENROLLMENT, (student_id, course_id)),
+        (grpc_enrollment_server.SELECT_COURSE_NAME, (course_id,)),
+        (grpc_enrollment_server.DELETE_ENROLLMENT, (student_id, course_id)),
+        (grpc_enrollment_server.RELEASE_SEAT, (course_id,)),
+        (grpc_grades_server.SELECT_ENROLLMENTS, (student_id,)),
+        (grpc_faculty_grades_server.SELECT_ENROLLMENTS, (student_id,)),
+        (grpc_faculty_grades_server.SELECT_ENROLLMENT, (student_id, course_id)),
+        (grpc_faculty_grades_server.SELECT_BULK_ENROLLMENTS, ([student_id], [course_id])),
+    ]
+
+
+def plan_nodes(plan):
+    yield plan
+    for child in plan.get('Plans', []):
+        yield from plan_nodes(child)
+
+
+def describe(node):
+    if 'Index Name' in node:
+        return f"{node['Node Type']} using {node['Index Name']}"
+    if 'Relation Name' in node:
+        return f"{node['Node Type']} on {node['Relation Name']}"
+    return node['Node Type']
+
+
+def explain_audit(conn, students, courses, per_student):
+    """
+    Build the schema in a scratch schema, fill it with `students` x
+    `per_student` enrollments over `courses` courses, and EXPLAIN the custom
+    and generic plan of every hot query. Everything is rolled back afterwards.
+    Returns the number of plans that contain a sequential scan.
+    """
+    if per_student > courses:
+        raise ValueError("per_student cannot exceed the number of courses")
+    failures = 0
+    try:
+        with conn.cursor() as cur:
+            cur.execute(f"CREATE SCHEMA courses_audit_{os.getpid()};")
+            cur.execute(f"SET LOCAL search_path TO courses_audit_{os.getpid()};")
+            create_schema(cur)
+
+            cur.execute("""
+                INSERT INTO courses (course_id, name, capacity, enrolled, is_open)
+                SELECT 'AUD' || c, 'Audit course ' || c, 1000, 0, TRUE
+                FROM generate_series(1, %s) AS c;
+            """, (courses,))
+            # Each student gets per_student distinct courses, spread over the catalog
+            cur.execute("""
+                INSERT INTO enrollments (student_public_id, course_id, enrollment_date)
+                SELECT md5(s::text)::uuid,
+                       'AUD' || ((s * 37 + k * (%(courses)s / %(per_student)s)) %% %(courses)s + 1),
+                       TIMESTAMP '2024-01-01' + (s + k) * INTERVAL '1 minute'
+                FROM generate_series(1, %(students)s) AS s, generate_series(1, %(per_student)s) AS k;
+            """, {"students": students, "courses": courses, "per_student": per_student})
+            cur.execute("ANALYZE courses; ANALYZE enrollments;")
+
+            cur.execute("SELECT student_public_id::text, course_id FROM enrollments ORDER BY id LIMIT 1;")
+            student_id, course_id = cur.fetchone()
+
+            print(f"Synthetic dataset: {courses} courses, {students * per_student} enrollments")
+            for statement, params in hot_queries(student_id, course_id):
+                for generic in (False, True):
+                    plan = statement.explain(cur, params, generic=generic)
+                    # Table access and sorts; only sequential scans fail the audit
+                    nodes = [node for node in plan_nodes(plan)
+                             if 'Relation Name' in node or node['Node Type'] == 'Sort']
+                    seq_scans = [node for node in nodes if node['Node Type'] == 'Seq Scan']
+                    label = f"{statement.name} ({'generic' if generic else 'custom'})"
+                    if seq_scans:
+                        failures += 1
+                        print(f"✗ {label}: {', '.join(describe(node) for node in seq_scans)}")
+                    else:
+                        print(f"✓ {label}: {', '.join(describe(node) for node in nodes)}")
+    finally:
+        conn.rollback()
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Courses database schema")
+    parser.add_argument('--audit', action='store_true',
+                        help='EXPLAIN the hot queries on synthetic data; exit 1 on a sequential scan')
+    parser.add_argument('--students', type=int, default=50000)
+    parser.add_argument('--courses', type=int, default=10000)
+    parser.add_argument('--per-student', type=int, default=6)
+    args = parser.parse_args()
+
+    from grpc_course_server import POSTGRES_DB, POSTGRES_USER, POSTGRES_PASSWORD, POSTGRES_HOST, POSTGRES_PORT
+
+    conn = psycopg2.connect(connection_factory=PooledConnection, dbname=POSTGRES_DB, user=POSTGRES_USER,
+                            password=POSTGRES_PASSWORD, host=POSTGRES_HOST, port=POSTGRES_PORT)
+    try:
+        if args.audit:
+            failures = explain_audit(conn, args.students, args.courses, args.per_student)
+            print(f"{'✗' if failures else '✓'} {failures} plan(s) with a sequential scan")
+            return 1 if failures else 0
+        apply_migrations(conn, SCHEMA_NAME, MIGRATIONS)
+        return 0
+    finally:
+        conn.close()
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -24,7 +24,7 @@ _sym_db = _symbol_database.Default()
 
 
 
-DESCRIPTOR = _descriptor_pool.Default().AddSerializedFile(b'\n\x0c\x63ourse.proto\x12\x06\x63ourse\"\x13\n\x11GetCoursesRequest\"\"\n\rCourseRequest\x12\x11\n\tcourse_id\x18\x01 \x01(\t\"b\n\nCourseInfo\x12\x11\n\tcourse_id\x18\x01 \x01(\t\x12\x0c\n\x04name\x18\x02 \x01(\t\x12\x10\n\x08\x63\x61pacity\x18\x03 \x01(\x05\x12\x10\n\x08\x65nrolled\x18\x04 \x01(\x05\x12\x0f\n\x07is_open\x18\x05 \x01(\x08\"Z\n\x12GetCoursesResponse\x12\x0e\n\x06status\x18\x01 \x01(\t\x12\x0f\n\x07message\x18\x02 \x01(\t\x12#\n\x07\x63ourses\x18\x03 \x03(\x0b\x32\x12.course.CourseInfo\"U\n\x0e\x43ourseResponse\x12\x0e\n\x06status\x18\x01 \x01(\t\x12\x0f\n\x07message\x18\x02 \x01(\t\x12\"\n\x06\x63ourse\x18\x03 \x01(\x0b\x32\x12.course.CourseInfo2\x97\x01\n\rCourseService\x12\x43\n\nGetCourses\x12\x19.course.GetCoursesRequest\x1a\x1a.course.GetCoursesResponse\x12\x41\n\x10GetCourseDetails\x12\x15.course.CourseRequest\x1a\x16.course.CourseResponseb\x06proto3')
+DESCRIPTOR = _descriptor_pool.Default().AddSerializedFile(b'\n\x0c\x63ourse.proto\x12\x06\x63ourse\"\x13\n\x11GetCoursesRequest\"\"\n\rCourseRequest\x12\x11\n\tcourse_id\x18\x01 \x01(\t\"\'\n\x11WatchSeatsRequest\x12\x12\n\ncourse_ids\x18\x01 \x03(\t\"b\n\nCourseInfo\x12\x11\n\tcourse_id\x18\x01 \x01(\t\x12\x0c\n\x04name\x18\x02 \x01(\t\x12\x10\n\x08\x63\x61pacity\x18\x03 \x01(\x05\x12\x10\n\x08\x65nrolled\x18\x04 \x01(\x05\x12\x0f\n\x07is_open\x18\x05 \x01(\x08\"Z\n\x12GetCoursesResponse\x12\x0e\n\x06status\x18\x01 \x01(\t\x12\x0f\n\x07message\x18\x02 \x01(\t\x12#\n\x07\x63ourses\x18\x03 \x03(\x0b\x32\x12.course.CourseInfo\"U\n\x0e\x43ourseResponse\x12\x0e\n\x06status\x18\x01 \x01(\t\x12\x0f\n\x07message\x18\x02 \x01(\t\x12\"\n\x06\x63ourse\x18\x03 \x01(\x0b\x32\x12.course.CourseInfo\"e\n\nSeatUpdate\x12\x11\n\tcourse_id\x18\x01 \x01(\t\x12\x10\n\x08\x63\x61pacity\x18\x02 \x01(\x05\x12\x10\n\x08\x65nrolled\x18\x03 \x01(\x05\x12\x0f\n\x07is_open\x18\x04 \x01(\x08\x12\x0f\n\x07removed\x18\x05 \x01(\x08\x32\xe1\x01\n\rCourseService\x12\x43\n\nGetCourses\x12\x19.course.GetCoursesRequest\x1a\x1a.course.GetCoursesResponse\x12\x41\n\x10GetCourseDetails\x12\x15.course.CourseRequest\x1a\x16.course.CourseResponse\x12H\n\x15WatchSeatAvailability\x12\x19.course.WatchSeatsRequest\x1a\x12.course.SeatUpdate0\x01\x62\x06proto3')
 
 _globals = globals()
 _builder.BuildMessageAndEnumDescriptors(DESCRIPTOR, _globals)
@@ -35,12 +35,16 @@ if not _descriptor._USE_C_DESCRIPTORS:
   _globals['_GETCOURSESREQUEST']._serialized_end=43
   _globals['_COURSEREQUEST']._serialized_start=45
   _globals['_COURSEREQUEST']._serialized_end=79
-  _globals['_COURSEINFO']._serialized_start=81
-  _globals['_COURSEINFO']._serialized_end=179
-  _globals['_GETCOURSESRESPONSE']._serialized_start=181
-  _globals['_GETCOURSESRESPONSE']._serialized_end=271
-  _globals['_COURSERESPONSE']._serialized_start=273
-  _globals['_COURSERESPONSE']._serialized_end=358
-  _globals['_COURSESERVICE']._serialized_start=361
-  _globals['_COURSESERVICE']._serialized_end=512
+  _globals['_WATCHSEATSREQUEST']._serialized_start=81
+  _globals['_WATCHSEATSREQUEST']._serialized_end=120
+  _globals['_COURSEINFO']._serialized_start=122
+  _globals['_COURSEINFO']._serialized_end=220
+  _globals['_GETCOURSESRESPONSE']._serialized_start=222
+  _globals['_GETCOURSESRESPONSE']._serialized_end=312
+  _globals['_COURSERESPONSE']._serialized_start=314
+  _globals['_COURSERESPONSE']._serialized_end=399
+  _globals['_SEATUPDATE']._serialized_start=401
+  _globals['_SEATUPDATE']._serialized_end=502
+  _globals['_COURSESERVICE']._serialized_start=505
+  _globals['_COURSESERVICE']._serialized_end=730
 # @@protoc_insertion_point(module_scope)
@@ -45,6 +45,11 @@ class CourseServiceStub(object):
                 request_serializer=course__pb2.CourseRequest.SerializeToString,
                 response_deserializer=course__pb2.CourseResponse.FromString,
                 _registered_method=True)
+        self.WatchSeatAvailability = channel.unary_stream(
+                '/course.CourseService/WatchSeatAvailability',
+                request_serializer=course__pb2.WatchSeatsRequest.SerializeToString,
+                response_deserializer=course__pb2.SeatUpdate.FromString,
+                _registered_method=True)
 
 
 class CourseServiceServicer(object):
@@ -65,6 +70,14 @@ class CourseServiceServicer(object):
         context.set_details('Method not implemented!')
         raise NotImplementedError('Method not implemented!')
 
+    def WatchSeatAvailability(self, request, context):
+        """Stream seat counts: a snapshot of every watched course, then an update
+        whenever a course's enrolled/capacity/is_open changes
+        """
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
 
 def add_CourseServiceServicer_to_server(servicer, server):
     rpc_method_handlers = {
@@ -78,6 +91,11 @@ def add_CourseServiceServicer_to_server(servicer, server):
                     request_deserializer=course__pb2.CourseRequest.FromString,
                     response_serializer=course__pb2.CourseResponse.SerializeToString,
             ),
+            'WatchSeatAvailability': grpc.unary_stream_rpc_method_handler(
+                    servicer.WatchSeatAvailability,
+                    request_deserializer=course__pb2.WatchSeatsRequest.FromString,
+                    response_serializer=course__pb2.SeatUpdate.SerializeToString,
+            ),
     }
     generic_handler = grpc.method_handlers_generic_handler(
             'course.CourseService', rpc_method_handlers)
@@ -143,3 +161,30 @@ class CourseService(object):
             timeout,
             metadata,
             _registered_method=True)
+
+    @staticmethod
+    def WatchSeatAvailability(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_stream(
+            request,
+            target,
+            '/course.CourseService/WatchSeatAvailability',
+            course__pb2.WatchSeatsRequest.SerializeToString,
+            course__pb2.SeatUpdate.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
@@ -24,7 +24,7 @@ _sym_db = _symbol_database.Default()
 
 
 
-DESCRIPTOR = _descriptor_pool.Default().AddSerializedFile(b'\n\x14\x66\x61\x63ulty_grades.proto\x12\x0e\x66\x61\x63ulty_grades\"#\n\x12GetStudentsRequest\x12\r\n\x05token\x18\x01 \x01(\t\":\n\x15GetEnrollmentsRequest\x12\r\n\x05token\x18\x01 \x01(\t\x12\x12\n\nstudent_id\x18\x02 \x01(\t\"|\n\x12UploadGradeRequest\x12\r\n\x05token\x18\x01 \x01(\t\x12\x12\n\nstudent_id\x18\x02 \x01(\t\x12\x11\n\tcourse_id\x18\x03 \x01(\t\x12\r\n\x05grade\x18\x04 \x01(\t\x12\x10\n\x08semester\x18\x05 \x01(\t\x12\x0f\n\x07remarks\x18\x06 \x01(\t\"b\n\x10StudentsResponse\x12\x0e\n\x06status\x18\x01 \x01(\t\x12\x0f\n\x07message\x18\x02 \x01(\t\x12-\n\x08students\x18\x03 \x03(\x0b\x32\x1b.faculty_grades.StudentInfo\"3\n\x0bStudentInfo\x12\x12\n\nstudent_id\x18\x01 \x01(\t\x12\x10\n\x08username\x18\x02 \x01(\t\"\xa0\x01\n\x1aStudentEnrollmentsResponse\x12\x0e\n\x06status\x18\x01 \x01(\t\x12\x0f\n\x07message\x18\x02 \x01(\t\x12\x12\n\nstudent_id\x18\x03 \x01(\t\x12\x18\n\x10student_username\x18\x04 \x01(\t\x12\x33\n\x0b\x65nrollments\x18\x05 \x03(\x0b\x32\x1e.faculty_grades.EnrollmentInfo\"Q\n\x0e\x45nrollmentInfo\x12\x11\n\tcourse_id\x18\x01 \x01(\t\x12\x13\n\x0b\x63ourse_name\x18\x02 \x01(\t\x12\x17\n\x0f\x65nrollment_date\x18\x03 \x01(\t\"H\n\x13UploadGradeResponse\x12\x0e\n\x06status\x18\x01 \x01(\t\x12\x0f\n\x07message\x18\x02 \x01(\t\x12\x10\n\x08grade_id\x18\x03 \x01(\t2\xb9\x02\n\x14\x46\x61\x63ultyGradesService\x12V\n\x0eGetAllStudents\x12\".faculty_grades.GetStudentsRequest\x1a .faculty_grades.StudentsResponse\x12j\n\x15GetStudentEnrollments\x12%.faculty_grades.GetEnrollmentsRequest\x1a*.faculty_grades.StudentEnrollmentsResponse\x12]\n\x12UploadStudentGrade\x12\".faculty_grades.UploadGradeRequest\x1a#.faculty_grades.UploadGradeResponseb\x06proto3')
+DESCRIPTOR = _descriptor_pool.Default().AddSerializedFile(b'\n\x14\x66\x61\x63ulty_grades.proto\x12\x0e\x66\x61\x63ulty_grades\"Z\n\x12GetStudentsRequest\x12\r\n\x05token\x18\x01 \x01(\t\x12\x16\n\x0e\x61\x66ter_username\x18\x02 \x01(\t\x12\r\n\x05limit\x18\x03 \x01(\x05\x12\x0e\n\x06prefix\x18\x04 \x01(\t\":\n\x15GetEnrollmentsRequest\x12\r\n\x05token\x18\x01 \x01(\t\x12\x12\n\nstudent_id\x18\x02 \x01(\t\"|\n\x12UploadGradeRequest\x12\r\n\x05token\x18\x01 \x01(\t\x12\x12\n\nstudent_id\x18\x02 \x01(\t\x12\x11\n\tcourse_id\x18\x03 \x01(\t\x12\r\n\x05grade\x18\x04 \x01(\t\x12\x10\n\x08semester\x18\x05 \x01(\t\x12\x0f\n\x07remarks\x18\x06 \x01(\t\"e\n\nGradeEntry\x12\x12\n\nstudent_id\x18\x01 \x01(\t\x12\x11\n\tcourse_id\x18\x02 \x01(\t\x12\r\n\x05grade\x18\x03 \x01(\t\x12\x10\n\x08semester\x18\x04 \x01(\t\x12\x0f\n\x07remarks\x18\x05 \x01(\t\"T\n\x17\x42ulkUploadGradesRequest\x12\r\n\x05token\x18\x01 \x01(\t\x12*\n\x06grades\x18\x02 \x03(\x0b\x32\x1a.faculty_grades.GradeEntry\"\x7f\n\x10StudentsResponse\x12\x0e\n\x06status\x18\x01 \x01(\t\x12\x0f\n\x07message\x18\x02 \x01(\t\x12-\n\x08students\x18\x03 \x03(\x0b\x32\x1b.faculty_grades.StudentInfo\x12\x1b\n\x13next_after_username\x18\x04 \x01(\t\"3\n\x0bStudentInfo\x12\x12\n\nstudent_id\x18\x01 \x01(\t\x12\x10\n\x08username\x18\x02 \x01(\t\"\xa0\x01\n\x1aStudentEnrollmentsResponse\x12\x0e\n\x06status\x18\x01 \x01(\t\x12\x0f\n\x07message\x18\x02 \x01(\t\x12\x12\n\nstudent_id\x18\x03 \x01(\t\x12\x18\n\x10student_username\x18\x04 \x01(\t\x12\x33\n\x0b\x65nrollments\x18\x05 \x03(\x0b\x32\x1e.faculty_grades.EnrollmentInfo\"Q\n\x0e\x45nrollmentInfo\x12\x11\n\tcourse_id\x18\x01 \x01(\t\x12\x13\n\x0b\x63ourse_name\x18\x02 \x01(\t\x12\x17\n\x0f\x65nrollment_date\x18\x03 \x01(\t\"H\n\x13UploadGradeResponse\x12\x0e\n\x06status\x18\x01 \x01(\t\x12\x0f\n\x07message\x18\x02 \x01(\t\x12\x10\n\x08grade_id\x18\x03 \x01(\t\"z\n\x11GradeUploadResult\x12\x0b\n\x03row\x18\x01 \x01(\x05\x12\x12\n\nstudent_id\x18\x02 \x01(\t\x12\x11\n\tcourse_id\x18\x03 \x01(\t\x12\x0e\n\x06status\x18\x04 \x01(\t\x12\x0f\n\x07message\x18\x05 \x01(\t\x12\x10\n\x08grade_id\x18\x06 \x01(\t\"\x91\x01\n\x18\x42ulkUploadGradesResponse\x12\x0e\n\x06status\x18\x01 \x01(\t\x12\x0f\n\x07message\x18\x02 \x01(\t\x12\x10\n\x08uploaded\x18\x03 \x01(\x05\x12\x0e\n\x06\x66\x61iled\x18\x04 \x01(\x05\x12\x32\n\x07results\x18\x05 \x03(\x0b\x32!.faculty_grades.GradeUploadResult2\xa3\x03\n\x14\x46\x61\x63ultyGradesService\x12V\n\x0eGetAllStudents\x12\".faculty_grades.GetStudentsRequest\x1a .faculty_grades.StudentsResponse\x12j\n\x15GetStudentEnrollments\x12%.faculty_grades.GetEnrollmentsRequest\x1a*.faculty_grades.StudentEnrollmentsResponse\x12]\n\x12UploadStudentGrade\x12\".faculty_grades.UploadGradeRequest\x1a#.faculty_grades.UploadGradeResponse\x12h\n\x13UploadStudentGrades\x12\'.faculty_grades.BulkUploadGradesRequest\x1a(.faculty_grades.BulkUploadGradesResponseb\x06proto3')
 
 _globals = globals()
 _builder.BuildMessageAndEnumDescriptors(DESCRIPTOR, _globals)
@@ -32,21 +32,29 @@ _builder.BuildTopDescriptorsAndMessages(DESCRIPTOR, 'faculty_grades_pb2', _globa
 if not _descriptor._USE_C_DESCRIPTORS:
   DESCRIPTOR._loaded_options = None
   _globals['_GETSTUDENTSREQUEST']._serialized_start=40
-  _globals['_GETSTUDENTSREQUEST']._serialized_end=75
-  _globals['_GETENROLLMENTSREQUEST']._serialized_start=77
-  _globals['_GETENROLLMENTSREQUEST']._serialized_end=135
-  _globals['_UPLOADGRADEREQUEST']._serialized_start=137
-  _globals['_UPLOADGRADEREQUEST']._serialized_end=261
-  _globals['_STUDENTSRESPONSE']._serialized_start=263
-  _globals['_STUDENTSRESPONSE']._serialized_end=361
-  _globals['_STUDENTINFO']._serialized_start=363
-  _globals['_STUDENTINFO']._serialized_end=414
-  _globals['_STUDENTENROLLMENTSRESPONSE']._serialized_start=417
-  _globals['_STUDENTENROLLMENTSRESPONSE']._serialized_end=577
-  _globals['_ENROLLMENTINFO']._serialized_start=579
-  _globals['_ENROLLMENTINFO']._serialized_end=660
-  _globals['_UPLOADGRADERESPONSE']._serialized_start=662
-  _globals['_UPLOADGRADERESPONSE']._serialized_end=734
-  _globals['_FACULTYGRADESSERVICE']._serialized_start=737
-  _globals['_FACULTYGRADESSERVICE']._serialized_end=1050
+  _globals['_GETSTUDENTSREQUEST']._serialized_end=130
+  _globals['_GETENROLLMENTSREQUEST']._serialized_start=132
+  _globals['_GETENROLLMENTSREQUEST']._serialized_end=190
+  _globals['_UPLOADGRADEREQUEST']._serialized_start=192
+  _globals['_UPLOADGRADEREQUEST']._serialized_end=316
+  _globals['_GRADEENTRY']._serialized_start=318
+  _globals['_GRADEENTRY']._serialized_end=419
+  _globals['_BULKUPLOADGRADESREQUEST']._serialized_start=421
+  _globals['_BULKUPLOADGRADESREQUEST']._serialized_end=505
+  _globals['_STUDENTSRESPONSE']._serialized_start=507
+  _globals['_STUDENTSRESPONSE']._serialized_end=634
+  _globals['_STUDENTINFO']._serialized_start=636
+  _globals['_STUDENTINFO']._serialized_end=687
+  _globals['_STUDENTENROLLMENTSRESPONSE']._serialized_start=690
+  _globals['_STUDENTENROLLMENTSRESPONSE']._serialized_end=850
+  _globals['_ENROLLMENTINFO']._serialized_start=852
+  _globals['_ENROLLMENTINFO']._serialized_end=933
+  _globals['_UPLOADGRADERESPONSE']._serialized_start=935
+  _globals['_UPLOADGRADERESPONSE']._serialized_end=1007
+  _globals['_GRADEUPLOADRESULT']._serialized_start=1009
+  _globals['_GRADEUPLOADRESULT']._serialized_end=1131
+  _globals['_BULKUPLOADGRADESRESPONSE']._serialized_start=1134
+  _globals['_BULKUPLOADGRADESRESPONSE']._serialized_end=1279
+  _globals['_FACULTYGRADESSERVICE']._serialized_start=1282
+  _globals['_FACULTYGRADESSERVICE']._serialized_end=1701
 # @@protoc_insertion_point(module_scope)
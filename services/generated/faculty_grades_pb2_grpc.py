@@ -50,6 +50,11 @@ class FacultyGradesServiceStub(object):
                 request_serializer=faculty__grades__pb2.UploadGradeRequest.SerializeToString,
                 response_deserializer=faculty__grades__pb2.UploadGradeResponse.FromString,
                 _registered_method=True)
+        self.UploadStudentGrades = channel.unary_unary(
+                '/faculty_grades.FacultyGradesService/UploadStudentGrades',
+                request_serializer=faculty__grades__pb2.BulkUploadGradesRequest.SerializeToString,
+                response_deserializer=faculty__grades__pb2.BulkUploadGradesResponse.FromString,
+                _registered_method=True)
 
 
 class FacultyGradesServiceServicer(object):
@@ -57,7 +62,7 @@ class FacultyGradesServiceServicer(object):
     """
 
     def GetAllStudents(self, request, context):
-        """Get all students in the system (Faculty only)
+        """Get students in the system, one page at a time in username order (Faculty only)
         """
         context.set_code(grpc.StatusCode.UNIMPLEMENTED)
         context.set_details('Method not implemented!')
@@ -77,6 +82,13 @@ class FacultyGradesServiceServicer(object):
         context.set_details('Method not implemented!')
         raise NotImplementedError('Method not implemented!')
 
+    def UploadStudentGrades(self, request, context):
+        """Upload or update many grades in one transaction, with a result per row (Faculty only)
+        """
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
 
 def add_FacultyGradesServiceServicer_to_server(servicer, server):
     rpc_method_handlers = {
@@ -95,6 +107,11 @@ def add_FacultyGradesServiceServicer_to_server(servicer, server):
                     request_deserializer=faculty__grades__pb2.UploadGradeRequest.FromString,
                     response_serializer=faculty__grades__pb2.UploadGradeResponse.SerializeToString,
             ),
+            'UploadStudentGrades': grpc.unary_unary_rpc_method_handler(
+                    servicer.UploadStudentGrades,
+                    request_deserializer=faculty__grades__pb2.BulkUploadGradesRequest.FromString,
+                    response_serializer=faculty__grades__pb2.BulkUploadGradesResponse.SerializeToString,
+            ),
     }
     generic_handler = grpc.method_handlers_generic_handler(
             'faculty_grades.FacultyGradesService', rpc_method_handlers)
@@ -187,3 +204,30 @@ class FacultyGradesService(object):
             timeout,
             metadata,
             _registered_method=True)
+
+    @staticmethod
+    def UploadStudentGrades(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            '/faculty_grades.FacultyGradesService/UploadStudentGrades',
+            faculty__grades__pb2.BulkUploadGradesRequest.SerializeToString,
+            faculty__grades__pb2.BulkUploadGradesResponse.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
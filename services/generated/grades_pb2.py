@@ -24,7 +24,7 @@ _sym_db = _symbol_database.Default()
 
 
 
-DESCRIPTOR = _descriptor_pool.Default().AddSerializedFile(b'\n\x0cgrades.proto\x12\x06grades\"\x1e\n\rGradesRequest\x12\r\n\x05token\x18\x01 \x01(\t\"1\n EnrolledCoursesWithGradesRequest\x12\r\n\x05token\x18\x01 \x01(\t\"|\n\x12UploadGradeRequest\x12\r\n\x05token\x18\x01 \x01(\t\x12\x12\n\nstudent_id\x18\x02 \x01(\t\x12\x11\n\tcourse_id\x18\x03 \x01(\t\x12\r\n\x05grade\x18\x04 \x01(\t\x12\x10\n\x08semester\x18\x05 \x01(\t\x12\x0f\n\x07remarks\x18\x06 \x01(\t\"7\n\x13\x43ourseGradesRequest\x12\r\n\x05token\x18\x01 \x01(\t\x12\x11\n\tcourse_id\x18\x02 \x01(\t\"\xb1\x01\n\x0f\x43ourseGradeInfo\x12\x11\n\tcourse_id\x18\x01 \x01(\t\x12\x13\n\x0b\x63ourse_name\x18\x02 \x01(\t\x12\x17\n\x0f\x65nrollment_date\x18\x03 \x01(\t\x12\x16\n\x0egrade_released\x18\x04 \x01(\x08\x12\r\n\x05grade\x18\x05 \x01(\t\x12\x10\n\x08semester\x18\x06 \x01(\t\x12\x13\n\x0b\x64\x61te_posted\x18\x07 \x01(\t\x12\x0f\n\x07remarks\x18\x08 \x01(\t\"\x84\x01\n!EnrolledCoursesWithGradesResponse\x12\x0e\n\x06status\x18\x01 \x01(\t\x12\x0f\n\x07message\x18\x02 \x01(\t\x12(\n\x07\x63ourses\x18\x03 \x03(\x0b\x32\x17.grades.CourseGradeInfo\x12\x14\n\x0cstudent_name\x18\x04 \x01(\t\"\x8c\x01\n\tGradeInfo\x12\x10\n\x08grade_id\x18\x01 \x01(\t\x12\x11\n\tcourse_id\x18\x02 \x01(\t\x12\x13\n\x0b\x63ourse_name\x18\x03 \x01(\t\x12\r\n\x05grade\x18\x04 \x01(\t\x12\x10\n\x08semester\x18\x05 \x01(\t\x12\x13\n\x0b\x64\x61te_posted\x18\x06 \x01(\t\x12\x0f\n\x07remarks\x18\x07 \x01(\t\"j\n\x0eGradesResponse\x12\x0e\n\x06status\x18\x01 \x01(\t\x12\x0f\n\x07message\x18\x02 \x01(\t\x12!\n\x06grades\x18\x03 \x03(\x0b\x32\x11.grades.GradeInfo\x12\x14\n\x0cstudent_name\x18\x04 \x01(\t\"H\n\x13UploadGradeResponse\x12\x0e\n\x06status\x18\x01 \x01(\t\x12\x0f\n\x07message\x18\x02 \x01(\t\x12\x10\n\x08grade_id\x18\x03 \x01(\t\"`\n\x10StudentGradeInfo\x12\x12\n\nstudent_id\x18\x01 \x01(\t\x12\x14\n\x0cstudent_name\x18\x02 \x01(\t\x12\r\n\x05grade\x18\x03 \x01(\t\x12\x13\n\x0b\x64\x61te_posted\x18\x04 \x01(\t\"\x91\x01\n\x14\x43ourseGradesResponse\x12\x0e\n\x06status\x18\x01 \x01(\t\x12\x0f\n\x07message\x18\x02 \x01(\t\x12\x11\n\tcourse_id\x18\x03 \x01(\t\x12\x13\n\x0b\x63ourse_name\x18\x04 \x01(\t\x12\x30\n\x0estudent_grades\x18\x05 \x03(\x0b\x32\x18.grades.StudentGradeInfo2\xdd\x02\n\rGradesService\x12s\n\x1cGetEnrolledCoursesWithGrades\x12(.grades.EnrolledCoursesWithGradesRequest\x1a).grades.EnrolledCoursesWithGradesResponse\x12\x41\n\x10GetStudentGrades\x12\x15.grades.GradesRequest\x1a\x16.grades.GradesResponse\x12\x46\n\x0bUploadGrade\x12\x1a.grades.UploadGradeRequest\x1a\x1b.grades.UploadGradeResponse\x12L\n\x0fGetCourseGrades\x12\x1b.grades.CourseGradesRequest\x1a\x1c.grades.CourseGradesResponseb\x06proto3')
+DESCRIPTOR = _descriptor_pool.Default().AddSerializedFile(b'\n\x0cgrades.proto\x12\x06grades\"\x1e\n\rGradesRequest\x12\r\n\x05token\x18\x01 \x01(\t\"1\n EnrolledCoursesWithGradesRequest\x12\r\n\x05token\x18\x01 \x01(\t\"|\n\x12UploadGradeRequest\x12\r\n\x05token\x18\x01 \x01(\t\x12\x12\n\nstudent_id\x18\x02 \x01(\t\x12\x11\n\tcourse_id\x18\x03 \x01(\t\x12\r\n\x05grade\x18\x04 \x01(\t\x12\x10\n\x08semester\x18\x05 \x01(\t\x12\x0f\n\x07remarks\x18\x06 \x01(\t\"7\n\x13\x43ourseGradesRequest\x12\r\n\x05token\x18\x01 \x01(\t\x12\x11\n\tcourse_id\x18\x02 \x01(\t\"\xb1\x01\n\x0f\x43ourseGradeInfo\x12\x11\n\tcourse_id\x18\x01 \x01(\t\x12\x13\n\x0b\x63ourse_name\x18\x02 \x01(\t\x12\x17\n\x0f\x65nrollment_date\x18\x03 \x01(\t\x12\x16\n\x0egrade_released\x18\x04 \x01(\x08\x12\r\n\x05grade\x18\x05 \x01(\t\x12\x10\n\x08semester\x18\x06 \x01(\t\x12\x13\n\x0b\x64\x61te_posted\x18\x07 \x01(\t\x12\x0f\n\x07remarks\x18\x08 \x01(\t\"\x84\x01\n!EnrolledCoursesWithGradesResponse\x12\x0e\n\x06status\x18\x01 \x01(\t\x12\x0f\n\x07message\x18\x02 \x01(\t\x12(\n\x07\x63ourses\x18\x03 \x03(\x0b\x32\x17.grades.CourseGradeInfo\x12\x14\n\x0cstudent_name\x18\x04 \x01(\t\"\x8c\x01\n\tGradeInfo\x12\x10\n\x08grade_id\x18\x01 \x01(\t\x12\x11\n\tcourse_id\x18\x02 \x01(\t\x12\x13\n\x0b\x63ourse_name\x18\x03 \x01(\t\x12\r\n\x05grade\x18\x04 \x01(\t\x12\x10\n\x08semester\x18\x05 \x01(\t\x12\x13\n\x0b\x64\x61te_posted\x18\x06 \x01(\t\x12\x0f\n\x07remarks\x18\x07 \x01(\t\"j\n\x0eGradesResponse\x12\x0e\n\x06status\x18\x01 \x01(\t\x12\x0f\n\x07message\x18\x02 \x01(\t\x12!\n\x06grades\x18\x03 \x03(\x0b\x32\x11.grades.GradeInfo\x12\x14\n\x0cstudent_name\x18\x04 \x01(\t\"H\n\x13UploadGradeResponse\x12\x0e\n\x06status\x18\x01 \x01(\t\x12\x0f\n\x07message\x18\x02 \x01(\t\x12\x10\n\x08grade_id\x18\x03 \x01(\t\"`\n\x10StudentGradeInfo\x12\x12\n\nstudent_id\x18\x01 \x01(\t\x12\x14\n\x0cstudent_name\x18\x02 \x01(\t\x12\r\n\x05grade\x18\x03 \x01(\t\x12\x13\n\x0b\x64\x61te_posted\x18\x04 \x01(\t\"\x91\x01\n\x14\x43ourseGradesResponse\x12\x0e\n\x06status\x18\x01 \x01(\t\x12\x0f\n\x07message\x18\x02 \x01(\t\x12\x11\n\tcourse_id\x18\x03 \x01(\t\x12\x13\n\x0b\x63ourse_name\x18\x04 \x01(\t\x12\x30\n\x0estudent_grades\x18\x05 \x03(\x0b\x32\x18.grades.StudentGradeInfo\"f\n\x11\x43ourseGradesBatch\x12\x0e\n\x06status\x18\x01 \x01(\t\x12\x0f\n\x07message\x18\x02 \x01(\t\x12\x30\n\x0estudent_grades\x18\x03 \x03(\x0b\x32\x18.grades.StudentGradeInfo2\xad\x03\n\rGradesService\x12s\n\x1cGetEnrolledCoursesWithGrades\x12(.grades.EnrolledCoursesWithGradesRequest\x1a).grades.EnrolledCoursesWithGradesResponse\x12\x41\n\x10GetStudentGrades\x12\x15.grades.GradesRequest\x1a\x16.grades.GradesResponse\x12\x46\n\x0bUploadGrade\x12\x1a.grades.UploadGradeRequest\x1a\x1b.grades.UploadGradeResponse\x12L\n\x0fGetCourseGrades\x12\x1b.grades.CourseGradesRequest\x1a\x1c.grades.CourseGradesResponse\x12N\n\x12StreamCourseGrades\x12\x1b.grades.CourseGradesRequest\x1a\x19.grades.CourseGradesBatch0\x01\x62\x06proto3')
 
 _globals = globals()
 _builder.BuildMessageAndEnumDescriptors(DESCRIPTOR, _globals)
@@ -53,6 +53,8 @@ if not _descriptor._USE_C_DESCRIPTORS:
   _globals['_STUDENTGRADEINFO']._serialized_end=1026
   _globals['_COURSEGRADESRESPONSE']._serialized_start=1029
   _globals['_COURSEGRADESRESPONSE']._serialized_end=1174
-  _globals['_GRADESSERVICE']._serialized_start=1177
-  _globals['_GRADESSERVICE']._serialized_end=1526
+  _globals['_COURSEGRADESBATCH']._serialized_start=1176
+  _globals['_COURSEGRADESBATCH']._serialized_end=1278
+  _globals['_GRADESSERVICE']._serialized_start=1281
+  _globals['_GRADESSERVICE']._serialized_end=1710
 # @@protoc_insertion_point(module_scope)
@@ -0,0 +1,261 @@
+import threading
+import time
+from datetime import datetime, timedelta
+
+import psycopg2
+from psycopg2.extras import DictCursor, execute_values
+
+# Primary/replica grade store for the grades service.
+#
+# GradeReplicator copies grades from the primary database to a replica
+# asynchronously: every interval it reads the rows posted since its last
+# position, in (date_posted, grade_id) order, and upserts them into the
+# replica. Every grade write sets date_posted, so this also picks up grades
+# the faculty service writes straight to the primary. Each pass re-reads
+# `overlap` seconds before its last position, so transactions that commit up
+# to that long after their CURRENT_TIMESTAMP are not skipped. The services
+# never delete grades, so deletes are not replicated. After a pass the
+# replica records synced_at: it holds every grade committed on the primary
+# before that time.
+#
+# GradeStore runs reads on the primary and retries them on the replica when
+# the primary fails or takes longer than primary_timeout_ms, as long as the
+# replica is at most max_staleness seconds behind. The timeout is set per read
+# transaction (SET LOCAL), so writes and migrations on the same pool are not
+# cut short by it. Writes only ever go to the primary.
+
+ZERO_UUID = '00000000-0000-0000-0000-000000000000'
+GRADE_COLUMNS = ('grade_id, student_public_id, course_id, grade, semester, '
+                 'date_posted, remarks, uploaded_by_faculty_id')
+
+
+class GradesUnavailable(Exception):
+    """Neither the primary nor a fresh enough replica could answer a read"""
+
+
+class GradeStore:
+    """
+    Read routing between the primary and replica pools. After a primary
+    failure, reads skip the primary for retry_interval seconds and go
+    straight to the replica.
+    """
+
+    def __init__(self, primary_pool, replica_pool=None, max_staleness=300.0, retry_interval=5.0,
+                 primary_timeout_ms=0):
+        self.primary_pool = primary_pool
+        self.replica_pool = replica_pool
+        self.primary_timeout_ms = primary_timeout_ms
+        self.max_staleness = max_staleness
+        self.retry_interval = retry_interval
+        self._primary_down_until = 0.0
+        self._lock = threading.Lock()
+
+        # Metrics
+        self.primary_reads = 0
+        self.replica_reads = 0
+        self.failovers = 0
+        self.stale_rejections = 0
+
+    def _primary_failed(self, reason):
+        with self._lock:
+            was_up = time.monotonic() >= self._primary_down_until
+            self._primary_down_until = time.monotonic() + self.retry_interval
+            if was_up:
+                self.failovers += 1
+        if was_up:
+            print(f"✗ Grades primary unavailable ({reason}); reading from replica for {self.retry_interval:.0f}s")
+
+    def primary_down(self):
+        return time.monotonic() < self._primary_down_until
+
+    def read(self, query):
+        """
+        Run query(cur) with a DictCursor and return (result, replica_lag):
+        replica_lag is None when the primary answered, else how many seconds
+        the replica may be behind. Raises GradesUnavailable.
+        """
+        if self.replica_pool is None or not self.primary_down():
+            conn = self.primary_pool.getconn()
+            if conn is None:
+                if self.replica_pool is None:
+                    raise GradesUnavailable("Database connection error")
+                self._primary_failed("no connection")
+            else:
+                try:
+                    with conn.cursor(cursor_factory=DictCursor) as cur:
+                        if self.replica_pool is not None and self.primary_timeout_ms:
+                            # With a replica to fall back on, a slow primary counts as a failed one
+                            cur.execute("SET LOCAL statement_timeout = %s;", (self.primary_timeout_ms,))
+                        result = query(cur)
+                    self.primary_reads += 1
+                    return result, None
+                except psycopg2.OperationalError as e:
+                    # Connection loss or statement timeout; other errors are the query's fault
+                    if self.replica_pool is None:
+                        raise GradesUnavailable("Database connection error") from e
+                    self._primary_failed(str(e).strip().splitlines()[0])
+                finally:
+                    self.primary_pool.putconn(conn)
+        return self._read_replica(query)
+
+    def _read_replica(self, query):
+        conn = self.replica_pool.getconn()
+        if conn is None:
+            raise GradesUnavailable("Grades database and replica are unavailable")
+        try:
+            with conn.cursor(cursor_factory=DictCursor) as cur:
+                # Same snapshot as the query, so the lag applies to what it reads
+                cur.execute("SELECT EXTRACT(EPOCH FROM now() - synced_at) FROM grades_replication_state;")
+                row = cur.fetchone()
+                lag = float(row[0]) if row else None
+                if lag is None or lag > self.max_staleness:
+                    self.stale_rejections += 1
+                    behind = "never synced" if lag is None else f"{lag:.0f}s behind"
+                    raise GradesUnavailable(f"Grades database is unavailable and the replica is stale ({behind})")
+                result = query(cur)
+            self.replica_reads += 1
+            return result, max(lag, 0.0)
+        except psycopg2.OperationalError as e:
+            raise GradesUnavailable("Grades database and replica are unavailable") from e
+        finally:
+            self.replica_pool.putconn(conn)
+
+    def stats(self):
+        return {
+            "primary_reads": self.primary_reads,
+            "replica_reads": self.replica_reads,
+            "failovers": self.failovers,
+            "stale_rejections": self.stale_rejections,
+            "primary_down": self.primary_down()
+        }
+
+
+class GradeReplicator:
+    """Background thread that keeps the replica's grades in step with the primary"""
+
+    def __init__(self, primary_args, replica_args, interval=1.0, batch_size=1000, overlap=5.0,
+                 statement_timeout_ms=0):
+        self.primary_args = dict(primary_args)
+        if statement_timeout_ms:
+            self.primary_args['options'] = f"-c statement_timeout={statement_timeout_ms}"
+        self.replica_args = dict(replica_args)
+        self.interval = interval
+        self.batch_size = batch_size
+        self.overlap = timedelta(seconds=overlap)
+        self._primary = None
+        self._replica = None
+        self._stop = threading.Event()
+        self._thread = None
+
+        # Metrics
+        self.passes = 0
+        self.rows_copied = 0
+        self.failures = 0
+        self.last_error = None
+
+    def _connections(self):
+        if self._primary is None or self._primary.closed:
+            self._primary = psycopg2.connect(**self.primary_args)
+        if self._replica is None or self._replica.closed:
+            self._replica = psycopg2.connect(**self.replica_args)
+        return self._primary, self._replica
+
+    def _close(self):
+        for conn in (self._primary, self._replica):
+            if conn is not None:
+                try:
+                    conn.close()
+                except psycopg2.Error:
+                    pass
+        self._primary = self._replica = None
+
+    def sync_once(self):
+        """Copy everything posted since the last pass; returns the number of rows copied"""
+        primary, replica = self._connections()
+        with primary.cursor() as src, replica.cursor() as dst:
+            dst.execute("SELECT last_date_posted, last_grade_id FROM grades_replication_state;")
+            row = dst.fetchone()
+            position = (row[0] - self.overlap, ZERO_UUID) if row else (datetime.min, ZERO_UUID)
+
+            # Everything committed on the primary before this instant is copied by this pass
+            src.execute("SELECT now();")
+            pass_started = src.fetchone()[0]
+            primary.commit()
+
+            copied = 0
+            while True:
+                src.execute(f"""
+                    SELECT {GRADE_COLUMNS} FROM grades
+                    WHERE (date_posted, grade_id) > (%s, %s)
+                    ORDER BY date_posted, grade_id
+                    LIMIT %s;
+                """, (position[0], position[1], self.batch_size))
+                rows = src.fetchall()
+                primary.commit()
+                if rows:
+                    execute_values(dst, f"""
+                        INSERT INTO grades ({GRADE_COLUMNS}) VALUES %s
+                        ON CONFLICT (student_public_id, course_id) DO UPDATE
+                        SET grade_id = EXCLUDED.grade_id, grade = EXCLUDED.grade,
+                            semester = EXCLUDED.semester, date_posted = EXCLUDED.date_posted,
+                            remarks = EXCLUDED.remarks,
+                            uploaded_by_faculty_id = EXCLUDED.uploaded_by_faculty_id
+                        WHERE grades.date_posted IS DISTINCT FROM EXCLUDED.date_posted
+                           OR grades.grade_id <> EXCLUDED.grade_id;
+                    """, rows)
+                    copied += len(rows)
+                    position = (rows[-1][5], str(rows[-1][0]))
+                if len(rows) < self.batch_size:
+                    break
+
+            if position[0] == datetime.min:
+                position = (pass_started.replace(tzinfo=None), ZERO_UUID)  # empty primary
+            dst.execute("""
+                INSERT INTO grades_replication_state (id, synced_at, last_date_posted, last_grade_id)
+                VALUES (TRUE, %s, %s, %s)
+                ON CONFLICT (id) DO UPDATE
+                SET synced_at = GREATEST(grades_replication_state.synced_at, EXCLUDED.synced_at),
+                    last_date_posted = GREATEST(grades_replication_state.last_date_posted, EXCLUDED.last_date_posted),
+                    last_grade_id = EXCLUDED.last_grade_id;
+            """, (pass_started, position[0], position[1]))
+            replica.commit()
+
+        self.passes += 1
+        self.rows_copied += copied
+        return copied
+
+    def run(self):
+        failing = False
+        while not self._stop.is_set():
+            try:
+                self.sync_once()
+                if failing:
+                    print("✓ Grades replication resumed")
+                failing = False
+            except psycopg2.Error as e:
+                self.failures += 1
+                self.last_error = str(e).strip().splitlines()[0] if str(e).strip() else type(e).__name__
+                if not failing:
+                    print(f"✗ Grades replication failed: {self.last_error}")
+                failing = True
+                self._close()
+            self._stop.wait(self.interval)
+        self._close()
+
+    def start(self):
+        self._thread = threading.Thread(target=self.run, name='grades-replicator', daemon=True)
+        self._thread.start()
+        return self._thread
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def stats(self):
+        return {
+            "passes": self.passes,
+            "rows_copied": self.rows_copied,
+            "failures": self.failures,
+            "last_error": self.last_error
+        }
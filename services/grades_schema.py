@@ -0,0 +1,92 @@
+import uuid
+
+# Schema of the grades database. Step N of MIGRATIONS is schema version N
+# (see common_migrations); the early steps are idempotent so databases
+# created before versioning adopt them as a baseline.
+
+SCHEMA_NAME = 'grades'
+
+MIGRATIONS = [
+    ('create_grades', """
+        CREATE TABLE IF NOT EXISTS grades (
+            grade_id UUID PRIMARY KEY,
+            student_public_id UUID NOT NULL,
+            course_id VARCHAR(20) NOT NULL,
+            grade VARCHAR(5) NOT NULL,
+            semester VARCHAR(20) NOT NULL,
+            date_posted TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            remarks TEXT,
+            uploaded_by_faculty_id UUID NOT NULL
+        );
+    """),
+    ('grades_student_index', """
+        CREATE INDEX IF NOT EXISTS idx_student_grades
+        ON grades(student_public_id);
+    """),
+    ('grades_course_index', """
+        CREATE INDEX IF NOT EXISTS idx_course_grades
+        ON grades(course_id);
+    """),
+    # One grade per student per course. Older deployments allowed duplicates,
+    # so keep only the most recent row before adding the key.
+    ('grades_unique_student_course', """
+        DO $$
+        BEGIN
+            IF to_regclass('uq_grades_student_course') IS NULL THEN
+                LOCK TABLE grades IN SHARE ROW EXCLUSIVE MODE;
+                DELETE FROM grades
+                WHERE grade_id IN (
+                    SELECT grade_id FROM (
+                        SELECT grade_id, ROW_NUMBER() OVER (
+                            PARTITION BY student_public_id, course_id
+                            ORDER BY date_posted DESC NULLS LAST, grade_id DESC
+                        ) AS rn
+                        FROM grades
+                    ) ranked
+                    WHERE rn > 1
+                );
+                CREATE UNIQUE INDEX uq_grades_student_course
+                ON grades(student_public_id, course_id);
+            END IF;
+        END
+        $$;
+    """),
+    # Replication scans grades in (date_posted, grade_id) order from its last position
+    ('grades_date_posted_index', """
+        CREATE INDEX IF NOT EXISTS idx_grades_date_posted
+        ON grades(date_posted, grade_id);
+    """),
+    # Replica bookkeeping (see grades_replica); stays empty on the primary
+    ('grades_replication_state', """
+        CREATE TABLE IF NOT EXISTS grades_replication_state (
+            id BOOLEAN PRIMARY KEY DEFAULT TRUE CHECK (id),
+            synced_at TIMESTAMPTZ NOT NULL,
+            last_date_posted TIMESTAMP NOT NULL,
+            last_grade_id UUID NOT NULL
+        );
+    """),
+]
+
+# Placeholder student and faculty UUIDs; real ones come from the auth database
+SAMPLE_GRADES = [
+    ('00000000-0000-0000-0000-000000000001', 'CS101', 'A', 'Fall 2023', 'Excellent work',
+     '00000000-0000-0000-0000-000000000002'),
+    ('00000000-0000-0000-0000-000000000001', 'MATH203', 'B+', 'Fall 2023', 'Good performance',
+     '00000000-0000-0000-0000-000000000002'),
+    ('00000000-0000-0000-0000-000000000001', 'ENG100', 'A-', 'Spring 2024', 'Strong essays',
+     '00000000-0000-0000-0000-000000000002'),
+]
+
+
+def seed(cur):
+    """Insert the sample grades that are missing; returns how many were added"""
+    added = 0
+    for grade in SAMPLE_GRADES:
+        cur.execute("""
+            INSERT INTO grades (grade_id, student_public_id, course_id,
+                                grade, semester, remarks, uploaded_by_faculty_id)
+            VALUES (%s, %s, %s, %s, %s, %s, %s)
+            ON CONFLICT (student_public_id, course_id) DO NOTHING;
+        """, (str(uuid.uuid4()),) + grade)
+        added += cur.rowcount
+    return added
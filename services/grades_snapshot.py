@@ -0,0 +1,239 @@
+import argparse
+import json
+import mmap
+import os
+import struct
+import sys
+
+# Binary snapshots of the JSON grade files (data/grades_primary.json,
+# data/grades_backup.json), which map a student id to a list of
+# {course, grade, semester} records. Looking up one student in the JSON means
+# parsing the whole file; a snapshot is memory-mapped instead and answers a
+# student or course lookup with a binary search over a sorted index, touching
+# only the pages it reads.
+#     python grades_snapshot.py build ../data/grades_primary.json
+#     python grades_snapshot.py lookup ../data/grades_primary.gsnap --student 101
+#     python grades_snapshot.py lookup ../data/grades_primary.gsnap --course CS101
+#
+# Layout (little-endian), sections in this order after the header:
+#   string index     (offset u32, length u32) per distinct string
+#   string data      UTF-8 bytes of every distinct string
+#   records          (student, course, grade, semester) string ids, u32 each,
+#                    grouped by student in index order, JSON order within one
+#   student index    (student string id, first record, record count), u32 each,
+#                    sorted by the student id's UTF-8 bytes
+#   course index     (course string id, first posting, posting count), u32 each,
+#                    sorted by the course id's UTF-8 bytes
+#   course postings  record numbers (u32), grouped by course, ascending
+
+MAGIC = b'GRSN'
+VERSION = 1
+HEADER = struct.Struct('<4sHHIIII6Q')
+STRING_ENTRY = struct.Struct('<II')
+RECORD = struct.Struct('<IIII')
+INDEX_ENTRY = struct.Struct('<III')
+POSTING = struct.Struct('<I')
+U32_MAX = 0xFFFFFFFF
+
+
+def load_json(path):
+    """Read a JSON grade file as {student: [(course, grade, semester)]}, sharing repeated strings"""
+    def record(obj):
+        if 'course' in obj:
+            return (sys.intern(obj['course']), sys.intern(obj['grade']), sys.intern(obj['semester']))
+        return obj
+
+    with open(path, encoding='utf-8') as f:
+        return json.load(f, object_hook=record)
+
+
+def build(grades, path):
+    """
+    Write a snapshot of {student: [(course, grade, semester)]} to path
+    (through a temporary file, so readers never see a partial snapshot).
+    Returns the number of records written.
+    """
+    strings = {}
+
+    def string_id(value):
+        sid = strings.get(value)
+        if sid is None:
+            sid = strings[value] = len(strings)
+        return sid
+
+    def sort_key(value):
+        return value.encode('utf-8')
+
+    records = []
+    student_index = []
+    postings = {}
+    for student in sorted(grades, key=sort_key):
+        student_index.append((string_id(student), len(records), len(grades[student])))
+        for course, grade, semester in grades[student]:
+            postings.setdefault(course, []).append(len(records))
+            records.append((string_id(student), string_id(course), string_id(grade), string_id(semester)))
+
+    course_index = []
+    course_postings = []
+    for course in sorted(postings, key=sort_key):
+        course_index.append((strings[course], len(course_postings), len(postings[course])))
+        course_postings.extend(postings[course])
+
+    encoded = [value.encode('utf-8') for value in strings]  # dicts keep insertion (= id) order
+    if sum(len(value) for value in encoded) > U32_MAX or len(records) > U32_MAX:
+        raise ValueError("grades are too large for a snapshot")
+
+    string_index_offset = HEADER.size
+    string_data_offset = string_index_offset + STRING_ENTRY.size * len(encoded)
+    records_offset = string_data_offset + sum(len(value) for value in encoded)
+    records_offset += -records_offset % 4  # keep the u32 sections aligned
+    student_index_offset = records_offset + RECORD.size * len(records)
+    course_index_offset = student_index_offset + INDEX_ENTRY.size * len(student_index)
+    postings_offset = course_index_offset + INDEX_ENTRY.size * len(course_index)
+
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(HEADER.pack(MAGIC, VERSION, 0, len(encoded), len(records), len(student_index), len(course_index),
+                            string_index_offset, string_data_offset, records_offset,
+                            student_index_offset, course_index_offset, postings_offset))
+        offset = 0
+        for value in encoded:
+            f.write(STRING_ENTRY.pack(offset, len(value)))
+            offset += len(value)
+        f.write(b''.join(encoded))
+        f.write(b'\0' * (records_offset - f.tell()))
+        f.write(b''.join(RECORD.pack(*entry) for entry in records))
+        f.write(b''.join(INDEX_ENTRY.pack(*entry) for entry in student_index))
+        f.write(b''.join(INDEX_ENTRY.pack(*entry) for entry in course_index))
+        f.write(struct.pack(f'<{len(course_postings)}I', *course_postings))
+    os.replace(tmp_path, path)
+    return len(records)
+
+
+class GradeSnapshot:
+    """
+    Read-only, memory-mapped view of a snapshot. Lookups return lists of
+    dicts shaped like the JSON records; nothing else is decoded.
+    """
+
+    def __init__(self, path):
+        with open(path, 'rb') as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            if len(self._mm) < HEADER.size:
+                raise ValueError(f"{path} is not a grade snapshot")
+            (magic, version, _, self.string_count, self.record_count, self.student_count, self.course_count,
+             self._string_index, self._string_data, self._records,
+             self._student_index, self._course_index, self._postings) = HEADER.unpack_from(self._mm, 0)
+            if magic != MAGIC:
+                raise ValueError(f"{path} is not a grade snapshot")
+            if version != VERSION:
+                raise ValueError(f"{path} is snapshot version {version}, expected {VERSION}")
+            if self._postings + POSTING.size * self.record_count != len(self._mm):
+                raise ValueError(f"{path} is truncated or corrupt")
+        except ValueError:
+            self._mm.close()
+            raise
+
+    def close(self):
+        self._mm.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __len__(self):
+        return self.record_count
+
+    def _bytes(self, sid):
+        offset, length = STRING_ENTRY.unpack_from(self._mm, self._string_index + STRING_ENTRY.size * sid)
+        start = self._string_data + offset
+        return self._mm[start:start + length]
+
+    def _string(self, sid):
+        return self._bytes(sid).decode('utf-8')
+
+    def _find(self, index, count, key):
+        """(first, count) of key's entry in a sorted index, or None; O(log count) probes"""
+        key = key.encode('utf-8')
+        lo, hi = 0, count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            sid, first, n = INDEX_ENTRY.unpack_from(self._mm, index + INDEX_ENTRY.size * mid)
+            probe = self._bytes(sid)
+            if probe < key:
+                lo = mid + 1
+            elif probe > key:
+                hi = mid
+            else:
+                return first, n
+        return None
+
+    def _record(self, number):
+        return RECORD.unpack_from(self._mm, self._records + RECORD.size * number)
+
+    def student_grades(self, student_id):
+        """[{course, grade, semester}] for one student, in the JSON's order ([] if unknown)"""
+        found = self._find(self._student_index, self.student_count, student_id)
+        if found is None:
+            return []
+        first, count = found
+        grades = []
+        for number in range(first, first + count):
+            _, course, grade, semester = self._record(number)
+            grades.append({"course": self._string(course), "grade": self._string(grade),
+                           "semester": self._string(semester)})
+        return grades
+
+    def course_grades(self, course_id):
+        """[{student, grade, semester}] for one course, by student id ([] if unknown)"""
+        found = self._find(self._course_index, self.course_count, course_id)
+        if found is None:
+            return []
+        first, count = found
+        numbers = struct.unpack_from(f'<{count}I', self._mm, self._postings + POSTING.size * first)
+        grades = []
+        for number in numbers:
+            student, _, grade, semester = self._record(number)
+            grades.append({"student": self._string(student), "grade": self._string(grade),
+                           "semester": self._string(semester)})
+        return grades
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Binary snapshots of the JSON grade files")
+    commands = parser.add_subparsers(dest='command', required=True)
+    build_cmd = commands.add_parser('build', help='build a snapshot from a JSON grade file')
+    build_cmd.add_argument('source')
+    build_cmd.add_argument('-o', '--output', help='snapshot path (default: source with a .gsnap extension)')
+    lookup_cmd = commands.add_parser('lookup', help='print the grades of a student or course')
+    lookup_cmd.add_argument('snapshot')
+    key = lookup_cmd.add_mutually_exclusive_group(required=True)
+    key.add_argument('--student')
+    key.add_argument('--course')
+    args = parser.parse_args()
+
+    try:
+        if args.command == 'build':
+            output = args.output or os.path.splitext(args.source)[0] + '.gsnap'
+            count = build(load_json(args.source), output)
+            print(f"✓ {output}: {count} records, {os.path.getsize(output)} bytes")
+        else:
+            with GradeSnapshot(args.snapshot) as snapshot:
+                if args.student is not None:
+                    grades = snapshot.student_grades(args.student)
+                else:
+                    grades = snapshot.course_grades(args.course)
+            print(json.dumps(grades, indent=2))
+            if not grades:
+                return 1
+    except (OSError, ValueError) as e:
+        print(f"✗ {e}")
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -6,12 +6,20 @@ sys.path.append('./generated')
 import auth_pb2
 import auth_pb2_grpc
 
-from werkzeug.security import generate_password_hash, check_password_hash
+from werkzeug.security import generate_password_hash, check_password_hash, DEFAULT_PBKDF2_ITERATIONS
 import jwt
 from datetime import datetime, timedelta, timezone
 import psycopg2
 import uuid
 import os
+import hashlib
+import multiprocessing
+import signal
+from common_db import PreparedStatement, get_pool, start_pool_stats_reporter
+from common_migrations import apply_migrations
+from auth_schema import SCHEMA_NAME, MIGRATIONS
+from common_grpc import GRPC_SERVER_OPTIONS, GRPC_MAX_WORKERS, GRPC_MAX_CONCURRENT_RPCS
+from common_ratelimit import LOGIN_RATE_LIMIT_ENABLED, TRUSTED_PROXIES, LoginRateLimiter, grpc_peer_host
 
 POSTGRES_DB = os.getenv('POSTGRES_DB', 'student_portal_auth')
 POSTGRES_USER = os.getenv('POSTGRES_USER', 'postgres')
@@ -23,44 +31,118 @@ JWT_SECRET_KEY = os.getenv('JWT_SECRET_KEY', 'super_secret_auth_key_12345')
 JWT_ALGORITHM = "HS256"
 JWT_EXPIRATION_HOURS = 24
 
+# Password hashing policy: algorithm is 'scrypt' or 'pbkdf2', iterations is the
+# scrypt cost N (a power of two) or the PBKDF2 round count (0 = werkzeug's
+# default); a bad policy stops the service at startup. Stored hashes weaker than
+# the policy are rehashed on the user's next successful login.
+PASSWORD_HASH_ALGORITHM = os.getenv('PASSWORD_HASH_ALGORITHM', 'scrypt')
+PASSWORD_HASH_ITERATIONS = int(os.getenv('PASSWORD_HASH_ITERATIONS', '0'))
+PASSWORD_HASH_DIGEST = os.getenv('PASSWORD_HASH_DIGEST', 'sha256')  # PBKDF2 only
+PASSWORD_SALT_LENGTH = int(os.getenv('PASSWORD_SALT_LENGTH', '16'))
+
+# One pooled DB connection per gRPC worker thread
+MAX_WORKERS = GRPC_MAX_WORKERS
+
+# Password hashing is CPU-bound, so one process tops out at one core. With
+# more than one worker process each runs its own server on the same port
+# (SO_REUSEPORT) and the kernel spreads incoming connections across them.
+# 0 = one process per CPU.
+AUTH_WORKER_PROCESSES = int(os.getenv('AUTH_WORKER_PROCESSES', '1')) or os.cpu_count()
+
+# Throttles Login per username and client address before any DB or hash work
+login_limiter = LoginRateLimiter() if LOGIN_RATE_LIMIT_ENABLED else None
+
+db_pool = get_pool(
+    POSTGRES_DB,
+    user=POSTGRES_USER,
+    password=POSTGRES_PASSWORD,
+    host=POSTGRES_HOST,
+    port=POSTGRES_PORT,
+    max_size=MAX_WORKERS
+)
+
 def get_db_connection():
-    try:
-        conn = psycopg2.connect(
-            dbname=POSTGRES_DB,
-            user=POSTGRES_USER,
-            password=POSTGRES_PASSWORD,
-            host=POSTGRES_HOST,
-            port=POSTGRES_PORT
-        )
-        return conn
-    except psycopg2.OperationalError as e:
-        print(f"Database connection failed: {e}")
-        return None
+    """Check a connection out of the shared pool (None if the DB is unavailable)"""
+    return db_pool.getconn()
+
+def release_db_connection(conn):
+    """Return a connection obtained from get_db_connection() to the pool"""
+    db_pool.putconn(conn)
+
+# Hot queries, prepared once per pooled connection
+INSERT_USER = PreparedStatement('auth_insert_user', """
+    INSERT INTO users (public_id, username, password_hash, role)
+    VALUES (%s, %s, %s, %s) RETURNING public_id;
+""")
+SELECT_USER_LOGIN = PreparedStatement('auth_select_user_login', """
+    SELECT public_id, password_hash, role FROM users WHERE username = %s;
+""")
 
 def init_db():
+    """Apply pending auth schema migrations (seed data: manage_db.py seed)"""
     conn = get_db_connection()
     if conn is None:
         print("Cannot initialize DB without a connection.")
         return
 
-    create_table_query = """
-    CREATE TABLE IF NOT EXISTS users (
-        id SERIAL PRIMARY KEY,
-        public_id UUID UNIQUE NOT NULL,
-        username VARCHAR(80) UNIQUE NOT NULL,
-        password_hash VARCHAR(255) NOT NULL,
-        role VARCHAR(50) NOT NULL DEFAULT 'student'
-    );
-    """
     try:
-        with conn.cursor() as cur:
-            cur.execute(create_table_query)
-        conn.commit()
-        print("User table checked/created successfully.")
+        apply_migrations(conn, SCHEMA_NAME, MIGRATIONS)
+        print("User database schema is up to date.")
     except Exception as e:
         print(f"Error initializing database: {e}")
     finally:
-        conn.close()
+        release_db_connection(conn)
+
+def password_hash_method(algorithm, iterations=0, digest='sha256'):
+    """werkzeug method string for a policy, as it appears at the start of a stored hash"""
+    if iterations < 0:
+        raise ValueError(f"PASSWORD_HASH_ITERATIONS must be positive (or 0 for the default), got {iterations}")
+    if algorithm == 'scrypt':
+        if iterations and (iterations < 2 or iterations & (iterations - 1)):
+            raise ValueError(f"PASSWORD_HASH_ITERATIONS is the scrypt cost N and must be a power of two, got {iterations}")
+        return f"scrypt:{iterations or 2**15}:8:1"
+    if algorithm == 'pbkdf2':
+        if digest not in hashlib.algorithms_available:
+            raise ValueError(f"Unsupported PASSWORD_HASH_DIGEST '{digest}'")
+        return f"pbkdf2:{digest}:{iterations or DEFAULT_PBKDF2_ITERATIONS}"
+    raise ValueError(f"Unsupported PASSWORD_HASH_ALGORITHM '{algorithm}' (use 'scrypt' or 'pbkdf2')")
+
+PASSWORD_HASH_METHOD = password_hash_method(PASSWORD_HASH_ALGORITHM, PASSWORD_HASH_ITERATIONS, PASSWORD_HASH_DIGEST)
+
+def hash_password(password):
+    """Hash a password with the configured policy"""
+    return generate_password_hash(password, method=PASSWORD_HASH_METHOD, salt_length=PASSWORD_SALT_LENGTH)
+
+PBKDF2_DIGEST_RANK = {'sha1': 1, 'sha224': 2, 'sha256': 3, 'sha384': 4, 'sha512': 5}
+
+def password_hash_strength(method):
+    """
+    Comparable strength of a werkzeug method string: scrypt > pbkdf2 > anything
+    else, then by cost (scrypt N*r then p; pbkdf2 iterations then digest)
+    """
+    algorithm, *params = method.split(':')
+    try:
+        if algorithm == 'scrypt':
+            n, r, p = (int(value) for value in params) if params else (2**15, 8, 1)
+            return (2, n * r, p)
+        if algorithm == 'pbkdf2':
+            digest = params[0] if params else 'sha256'
+            iterations = int(params[1]) if len(params) > 1 else DEFAULT_PBKDF2_ITERATIONS
+            return (1, iterations, PBKDF2_DIGEST_RANK.get(digest, 0))
+    except ValueError:
+        pass
+    return (0,)
+
+def password_needs_rehash(stored_hash):
+    """
+    True if a stored hash is weaker than the policy or has a shorter salt.
+    Hashes stronger than the policy are kept, so lowering the policy (e.g. to
+    speed up logins) applies to new passwords only and never downgrades.
+    """
+    method, _, rest = stored_hash.partition('$')
+    salt = rest.partition('$')[0]
+    return (password_hash_strength(method) < password_hash_strength(PASSWORD_HASH_METHOD)
+            or len(salt) < PASSWORD_SALT_LENGTH)
 
 def generate_jwt(public_id, username, role):
     """Generate JWT token - public_id can be UUID or string"""
@@ -75,6 +157,49 @@ def generate_jwt(public_id, username, role):
     token = jwt.encode(payload, JWT_SECRET_KEY, algorithm=JWT_ALGORITHM)
     return token
 
+def client_address(context):
+    """
+    Caller's address for rate limiting. The REST gateway forwards the browser's
+    as x-client-address; it is only believed from TRUSTED_PROXIES, so a client
+    that reaches this port directly cannot pick a fresh address per attempt.
+    """
+    if context is None:
+        return ""
+    peer = grpc_peer_host(context.peer())
+    if peer in TRUSTED_PROXIES:
+        for key, value in context.invocation_metadata() or ():
+            if key == 'x-client-address':
+                return value
+    return peer
+
+def throttled_response(context, retry_after):
+    """Reject a throttled login; the gateway turns Retry-After into an HTTP 429 header"""
+    retry_after = max(1, round(retry_after))
+    if context is not None:
+        context.set_trailing_metadata((('retry-after', str(retry_after)),))
+    return auth_pb2.AuthResponse(
+        status="throttled",
+        message=f"Too many login attempts. Try again in {retry_after} seconds",
+        token="",
+        user_id="",
+        role=""
+    )
+
+def rehash_password(conn, username, old_hash, password):
+    """Upgrade a stored hash to the current policy; a failure never blocks the login"""
+    try:
+        with conn.cursor() as cur:
+            # Only replace the hash we verified, in case the password changed meanwhile
+            cur.execute(
+                "UPDATE users SET password_hash = %s WHERE username = %s AND password_hash = %s;",
+                (hash_password(password), username, old_hash)
+            )
+        conn.commit()
+        print(f"✓ Rehashed password for '{username}' to {PASSWORD_HASH_METHOD}")
+    except psycopg2.Error as e:
+        conn.rollback()
+        print(f"✗ Password rehash failed for '{username}': {e}")
+
 class AuthServiceServicer(auth_pb2_grpc.AuthServiceServicer):
     
     def Register(self, request, context):
@@ -102,15 +227,11 @@ class AuthServiceServicer(auth_pb2_grpc.AuthServiceServicer):
             )
 
         try:
-            password_hash = generate_password_hash(password)
+            password_hash = hash_password(password)
             public_id = uuid.uuid4()
             
             with conn.cursor() as cur:
-                insert_query = """
-                INSERT INTO users (public_id, username, password_hash, role) 
-                VALUES (%s, %s, %s, %s) RETURNING public_id;
-                """
-                cur.execute(insert_query, (str(public_id), username, password_hash, role))
+                INSERT_USER.execute(cur, (str(public_id), username, password_hash, role))
                 returned_id = cur.fetchone()[0]  # UUID returned from DB
 
             conn.commit()
@@ -151,7 +272,7 @@ class AuthServiceServicer(auth_pb2_grpc.AuthServiceServicer):
                 role=""
             )
         finally:
-            conn.close()
+            release_db_connection(conn)
 
     def Login(self, request, context):
         username = request.username
@@ -166,6 +287,12 @@ class AuthServiceServicer(auth_pb2_grpc.AuthServiceServicer):
                 role=""
             )
 
+        peer = client_address(context)
+        if login_limiter:
+            allowed, retry_after = login_limiter.check(username, peer)
+            if not allowed:
+                return throttled_response(context, retry_after)
+
         conn = get_db_connection()
         if conn is None:
             return auth_pb2.AuthResponse(
@@ -178,15 +305,17 @@ class AuthServiceServicer(auth_pb2_grpc.AuthServiceServicer):
 
         try:
             with conn.cursor() as cur:
-                select_query = """
-                SELECT public_id, password_hash, role FROM users WHERE username = %s;
-                """
-                cur.execute(select_query, (username,))
+                SELECT_USER_LOGIN.execute(cur, (username,))
                 result = cur.fetchone()
                 
                 if result and check_password_hash(result[1], password):
                     user_public_id = result[0]  # string from DB
                     user_role = result[2]
+
+                    if password_needs_rehash(result[1]):
+                        rehash_password(conn, username, result[1], password)
+                    if login_limiter:
+                        login_limiter.record_success(username, peer)
                     
                     token = generate_jwt(user_public_id, username, user_role)
                     
@@ -200,6 +329,8 @@ class AuthServiceServicer(auth_pb2_grpc.AuthServiceServicer):
                         role=user_role
                     )
                 else:
+                    if login_limiter:
+                        login_limiter.record_failure(username, peer)
                     print(f"✗ Login failed for user '{username}': Invalid credentials")
                     return auth_pb2.AuthResponse(
                         status="error",
@@ -220,7 +351,7 @@ class AuthServiceServicer(auth_pb2_grpc.AuthServiceServicer):
                 role=""
             )
         finally:
-            conn.close()
+            release_db_connection(conn)
 
     def ValidateToken(self, request, context):
         token = request.token
@@ -262,17 +393,60 @@ class AuthServiceServicer(auth_pb2_grpc.AuthServiceServicer):
                 username=""
             )
 
-def serve():
-    init_db()
-    server = grpc.server(futures.ThreadPoolExecutor(max_workers=10))
+def run_server():
+    """Run one auth server process until it is terminated"""
+    db_pool.warm()
+    start_pool_stats_reporter()
+    if login_limiter:
+        login_limiter.start_stats_reporter()
+    server = grpc.server(
+        futures.ThreadPoolExecutor(max_workers=MAX_WORKERS),
+        options=GRPC_SERVER_OPTIONS + [('grpc.so_reuseport', 1)],
+        maximum_concurrent_rpcs=GRPC_MAX_CONCURRENT_RPCS
+    )
     auth_pb2_grpc.add_AuthServiceServicer_to_server(AuthServiceServicer(), server)
     server.add_insecure_port('[::]:50051')
+    server.start()
+    server.wait_for_termination()
+
+def serve():
+    init_db()
+    worker_processes = AUTH_WORKER_PROCESSES
+    if worker_processes > 1 and 'fork' not in multiprocessing.get_all_start_methods():
+        # Pre-fork workers share the port with SO_REUSEPORT after fork(), which is Linux-only
+        print(f"✗ AUTH_WORKER_PROCESSES={worker_processes} needs fork(), which this platform lacks; "
+              "running one process")
+        worker_processes = 1
     print("=" * 70)
     print("gRPC Auth Service starting on port 50051...")
     print(f"JWT Token Expiration: {JWT_EXPIRATION_HOURS} hours")
+    print(f"Password hashing: {PASSWORD_HASH_METHOD}, {PASSWORD_SALT_LENGTH}-char salt")
+    print(f"Worker processes: {worker_processes}")
+    print(f"Login rate limiting: {'on' if login_limiter else 'off'}")
     print("=" * 70)
-    server.start()
-    server.wait_for_termination()
+    if worker_processes == 1:
+        run_server()
+        return
+
+    # gRPC must not be started before fork, and children must not share
+    # the connections init_db() opened
+    db_pool.closeall()
+    workers = [
+        multiprocessing.get_context('fork').Process(target=run_server, name=f'auth-worker-{i}')
+        for i in range(worker_processes)
+    ]
+    for worker in workers:
+        worker.start()
+    # Stopping the parent (Ctrl+C or SIGTERM) stops every worker
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+    try:
+        for worker in workers:
+            worker.join()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        for worker in workers:
+            worker.terminate()
 
 if __name__ == '__main__':
     serve()
\ No newline at end of file
@@ -0,0 +1,217 @@
+import grpc
+from concurrent import futures
+import sys
+sys.path.append('./generated')
+
+import auth_pb2
+import auth_pb2_grpc
+
+from werkzeug.security import check_password_hash
+import asyncio
+import psycopg
+import uuid
+from common_db_aio import DB_UNAVAILABLE, get_aio_pool, open_aio_pools, close_aio_pools
+from common_grpc import GRPC_SERVER_OPTIONS, GRPC_MAX_WORKERS, GRPC_MAX_CONCURRENT_RPCS
+from grpc_auth_server import (
+    POSTGRES_DB, POSTGRES_USER, POSTGRES_PASSWORD, POSTGRES_HOST, POSTGRES_PORT,
+    JWT_EXPIRATION_HOURS, PASSWORD_HASH_METHOD, init_db, generate_jwt, hash_password, password_needs_rehash,
+    login_limiter, client_address, throttled_response, AuthServiceServicer
+)
+
+# grpc.aio version of grpc_auth_server.py. Password hashing is CPU-bound, so it
+# runs on a small thread pool (hashlib releases the GIL) instead of the loop.
+
+db_pool = get_aio_pool(
+    POSTGRES_DB,
+    user=POSTGRES_USER,
+    password=POSTGRES_PASSWORD,
+    host=POSTGRES_HOST,
+    port=POSTGRES_PORT
+)
+
+hash_executor = futures.ThreadPoolExecutor(max_workers=GRPC_MAX_WORKERS, thread_name_prefix='hash')
+
+async def run_hashing(func, *args):
+    return await asyncio.get_running_loop().run_in_executor(hash_executor, func, *args)
+
+async def rehash_password(username, old_hash, password):
+    """Upgrade a stored hash to the current policy; a failure never blocks the login"""
+    try:
+        new_hash = await run_hashing(hash_password, password)
+        async with db_pool.connection() as conn:
+            # Only replace the hash we verified, in case the password changed meanwhile
+            await conn.execute(
+                "UPDATE users SET password_hash = %s WHERE username = %s AND password_hash = %s;",
+                (new_hash, username, old_hash)
+            )
+            await conn.commit()
+        print(f"✓ Rehashed password for '{username}' to {PASSWORD_HASH_METHOD}")
+    except Exception as e:
+        print(f"✗ Password rehash failed for '{username}': {e}")
+
+class AsyncAuthServiceServicer(auth_pb2_grpc.AuthServiceServicer):
+
+    async def Register(self, request, context):
+        username = request.username
+        password = request.password
+        role = request.role or 'student'
+
+        if not username or not password:
+            return auth_pb2.AuthResponse(
+                status="error",
+                message="Missing username or password",
+                token="",
+                user_id="",
+                role=""
+            )
+
+        try:
+            password_hash = await run_hashing(hash_password, password)
+            public_id = uuid.uuid4()
+
+            async with db_pool.connection() as conn:
+                await conn.execute("""
+                    INSERT INTO users (public_id, username, password_hash, role)
+                    VALUES (%s, %s, %s, %s);
+                """, (public_id, username, password_hash, role))
+                await conn.commit()
+
+            # Generate token
+            token = generate_jwt(public_id, username, role)
+
+            print(f"✓ User '{username}' registered successfully with ID: {public_id}")
+
+            return auth_pb2.AuthResponse(
+                status="success",
+                message=f"User {username} successfully registered",
+                token=token,
+                user_id=str(public_id),
+                role=role
+            )
+
+        except psycopg.errors.UniqueViolation:
+            print(f"✗ Registration failed: Username '{username}' already exists")
+            return auth_pb2.AuthResponse(
+                status="error",
+                message=f"User '{username}' already exists",
+                token="",
+                user_id="",
+                role=""
+            )
+        except DB_UNAVAILABLE:
+            return auth_pb2.AuthResponse(
+                status="error",
+                message="Database connection error",
+                token="",
+                user_id="",
+                role=""
+            )
+        except Exception as e:
+            print(f"✗ Registration error for user '{username}': {type(e).__name__}: {e}")
+            return auth_pb2.AuthResponse(
+                status="error",
+                message="An internal error occurred during registration",
+                token="",
+                user_id="",
+                role=""
+            )
+
+    async def Login(self, request, context):
+        username = request.username
+        password = request.password
+
+        if not username or not password:
+            return auth_pb2.AuthResponse(
+                status="error",
+                message="Missing username or password",
+                token="",
+                user_id="",
+                role=""
+            )
+
+        peer = client_address(context)
+        if login_limiter:
+            allowed, retry_after = login_limiter.check(username, peer)
+            if not allowed:
+                return throttled_response(context, retry_after)
+
+        try:
+            async with db_pool.connection() as conn:
+                cur = await conn.execute(
+                    "SELECT public_id, password_hash, role FROM users WHERE username = %s;",
+                    (username,)
+                )
+                result = await cur.fetchone()
+
+            if result and await run_hashing(check_password_hash, result['password_hash'], password):
+                if password_needs_rehash(result['password_hash']):
+                    await rehash_password(username, result['password_hash'], password)
+                if login_limiter:
+                    login_limiter.record_success(username, peer)
+
+                token = generate_jwt(result['public_id'], username, result['role'])
+
+                print(f"✓ User '{username}' logged in successfully")
+
+                return auth_pb2.AuthResponse(
+                    status="success",
+                    message="Login successful",
+                    token=token,
+                    user_id=str(result['public_id']),
+                    role=result['role']
+                )
+
+            if login_limiter:
+                login_limiter.record_failure(username, peer)
+            print(f"✗ Login failed for user '{username}': Invalid credentials")
+            return auth_pb2.AuthResponse(
+                status="error",
+                message="Invalid credentials",
+                token="",
+                user_id="",
+                role=""
+            )
+        except DB_UNAVAILABLE:
+            return auth_pb2.AuthResponse(
+                status="error",
+                message="Database connection error",
+                token="",
+                user_id="",
+                role=""
+            )
+        except Exception as e:
+            print(f"✗ Login error for user '{username}': {type(e).__name__}: {e}")
+            return auth_pb2.AuthResponse(
+                status="error",
+                message="Internal server error",
+                token="",
+                user_id="",
+                role=""
+            )
+
+    async def ValidateToken(self, request, context):
+        # Pure CPU and fast enough to run inline on the loop
+        return AuthServiceServicer.ValidateToken(self, request, context)
+
+async def serve():
+    init_db()
+    await open_aio_pools()
+    if login_limiter:
+        login_limiter.start_stats_reporter()
+    server = grpc.aio.server(options=GRPC_SERVER_OPTIONS, maximum_concurrent_rpcs=GRPC_MAX_CONCURRENT_RPCS)
+    auth_pb2_grpc.add_AuthServiceServicer_to_server(AsyncAuthServiceServicer(), server)
+    server.add_insecure_port('[::]:50051')
+    print("=" * 70)
+    print("gRPC Auth Service (asyncio) starting on port 50051...")
+    print(f"JWT Token Expiration: {JWT_EXPIRATION_HOURS} hours")
+    print(f"Password hashing: {PASSWORD_HASH_METHOD} on {GRPC_MAX_WORKERS} threads")
+    print("=" * 70)
+    await server.start()
+    try:
+        await server.wait_for_termination()
+    finally:
+        await close_aio_pools()
+        hash_executor.shutdown()
+
+if __name__ == '__main__':
+    asyncio.run(serve())
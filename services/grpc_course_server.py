@@ -9,6 +9,14 @@ import course_pb2_grpc
 import psycopg2
 from psycopg2.extras import DictCursor
 import os
+import queue
+import select
+import threading
+import time
+from common_db import PreparedStatement, get_pool, start_pool_stats_reporter
+from common_grpc import GRPC_SERVER_OPTIONS, GRPC_MAX_WORKERS, GRPC_MAX_CONCURRENT_RPCS
+from common_migrations import apply_migrations
+from courses_schema import COURSE_CATALOG_CHANNEL, SCHEMA_NAME, MIGRATIONS
 
 # Configuration
 POSTGRES_DB = os.getenv('POSTGRES_DB', 'student_portal_courses')
@@ -17,122 +25,284 @@ POSTGRES_PASSWORD = os.getenv('POSTGRES_PASSWORD', '1234')
 POSTGRES_HOST = os.getenv('POSTGRES_HOST', 'localhost')
 POSTGRES_PORT = os.getenv('POSTGRES_PORT', '5432')
 
+# Course catalog cache: a change notification is picked up within
+# COURSE_CATALOG_STALENESS_MS; COURSE_CATALOG_MAX_AGE caps the age of the
+# cached catalog even if a notification is missed
+COURSE_CATALOG_STALENESS_MS = int(os.getenv('COURSE_CATALOG_STALENESS_MS', '500'))
+COURSE_CATALOG_MAX_AGE = float(os.getenv('COURSE_CATALOG_MAX_AGE', '30'))
+
+# Seat feed: pending batches buffered per WatchSeatAvailability stream
+SEAT_FEED_QUEUE_SIZE = int(os.getenv('SEAT_FEED_QUEUE_SIZE', '100'))
+SEAT_FEED_HEARTBEAT = float(os.getenv('SEAT_FEED_HEARTBEAT', '15'))
+
+# One pooled DB connection per gRPC worker thread
+MAX_WORKERS = GRPC_MAX_WORKERS
+
+db_pool = get_pool(
+    POSTGRES_DB,
+    user=POSTGRES_USER,
+    password=POSTGRES_PASSWORD,
+    host=POSTGRES_HOST,
+    port=POSTGRES_PORT,
+    max_size=MAX_WORKERS
+)
+
 def get_db_connection():
-    try:
-        conn = psycopg2.connect(
-            dbname=POSTGRES_DB,
-            user=POSTGRES_USER,
-            password=POSTGRES_PASSWORD,
-            host=POSTGRES_HOST,
-            port=POSTGRES_PORT
-        )
-        return conn
-    except psycopg2.OperationalError as e:
-        print(f"Database connection failed: {e}")
-        return None
+    """Check a connection out of the shared pool (None if the DB is unavailable)"""
+    return db_pool.getconn()
+
+def release_db_connection(conn):
+    """Return a connection obtained from get_db_connection() to the pool"""
+    db_pool.putconn(conn)
+
+# Hot queries, prepared once per pooled connection
+SELECT_COURSE = PreparedStatement('course_select_course', """
+    SELECT course_id, name, capacity, enrolled, is_open
+    FROM courses
+    WHERE course_id = %s;
+""")
 
 def init_db():
-    """Initialize courses database with sample data"""
+    """Apply pending courses schema migrations (seed data: manage_db.py seed)"""
     conn = get_db_connection()
     if conn is None:
         print("Cannot initialize DB without a connection.")
         return
 
     try:
-        with conn.cursor() as cur:
-            # Create courses table
-            cur.execute("""
-                CREATE TABLE IF NOT EXISTS courses (
-                    course_id VARCHAR(20) PRIMARY KEY,
-                    name VARCHAR(100) NOT NULL,
-                    capacity INTEGER NOT NULL,
-                    enrolled INTEGER DEFAULT 0,
-                    is_open BOOLEAN DEFAULT TRUE
-                );
-            """)
-            
-            # Create enrollments table
+        apply_migrations(conn, SCHEMA_NAME, MIGRATIONS)
+        print("Course database schema is up to date.")
+    except Exception as e:
+        print(f"Error initializing database: {e}")
+    finally:
+        release_db_connection(conn)
+
+def load_courses():
+    """Query the courses table and build a GetCoursesResponse"""
+    conn = get_db_connection()
+    if conn is None:
+        return course_pb2.GetCoursesResponse(
+            status="error",
+            message="Database connection error",
+            courses=[]
+        )
+    
+    try:
+        with conn.cursor(cursor_factory=DictCursor) as cur:
             cur.execute("""
-                CREATE TABLE IF NOT EXISTS enrollments (
-                    id SERIAL PRIMARY KEY,
-                    student_public_id UUID NOT NULL,
-                    course_id VARCHAR(20) NOT NULL,
-                    enrollment_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    UNIQUE(student_public_id, course_id)
-                );
+                SELECT course_id, name, capacity, enrolled, is_open 
+                FROM courses 
+                ORDER BY course_id;
             """)
+            rows = cur.fetchall()
             
-            # Insert sample courses if they don't exist
-            cur.execute("SELECT COUNT(*) FROM courses;")
-            if cur.fetchone()[0] == 0:
-                sample_courses = [
-                    ('CS101', 'Introduction to Computer Science', 30, 0, True),
-                    ('MATH203', 'Calculus III', 25, 0, True),
-                    ('ENG100', 'English Composition', 20, 0, True),
-                    ('GERIZAL', 'Rizal: Life and Works', 35, 0, True),
-                    ('GEETHIC', 'Ethics', 30, 0, True),
-                ]
-                cur.executemany(
-                    "INSERT INTO courses (course_id, name, capacity, enrolled, is_open) VALUES (%s, %s, %s, %s, %s);",
-                    sample_courses
+            courses = []
+            for row in rows:
+                course_info = course_pb2.CourseInfo(
+                    course_id=row['course_id'],
+                    name=row['name'],
+                    capacity=row['capacity'],
+                    enrolled=row['enrolled'],
+                    is_open=row['is_open']
                 )
-                print("Sample courses inserted.")
-        
-        conn.commit()
-        print("Course database initialized successfully.")
+                courses.append(course_info)
+            
+            return course_pb2.GetCoursesResponse(
+                status="success",
+                message="Courses retrieved successfully",
+                courses=courses
+            )
+    
     except Exception as e:
-        print(f"Error initializing database: {e}")
-        conn.rollback()
+        print(f"Error fetching courses: {e}")
+        return course_pb2.GetCoursesResponse(
+            status="error",
+            message="Internal server error",
+            courses=[]
+        )
     finally:
-        conn.close()
+        release_db_connection(conn)
+
+class CourseCatalogCache:
+    """
+    In-process cache of the prebuilt GetCoursesResponse.
+    A LISTEN connection marks the cache dirty whenever the courses table
+    changes; the next read after the staleness window rebuilds it. While the
+    listener is disconnected the cache falls back to refreshing on every
+    staleness window.
+    Every rebuild is diffed against the previous catalog and the changed
+    seat counts are pushed to WatchSeatAvailability subscribers.
+    """
+
+    def __init__(self, staleness_ms=COURSE_CATALOG_STALENESS_MS, max_age=COURSE_CATALOG_MAX_AGE):
+        self.staleness = staleness_ms / 1000.0
+        self.max_age = max_age
+        self._response = None
+        self._loaded_at = 0.0
+        self._changes = 0          # bumped by every notification
+        self._loaded_changes = 0   # value of _changes when the cache was built
+        self._dirty_since = None
+        self._listening = False
+        self._lock = threading.Lock()
+        self._refresh_lock = threading.Lock()
+        self._subscribers = set()
+        self._changed = threading.Event()
+
+    def invalidate(self):
+        with self._lock:
+            self._changes += 1
+            if self._dirty_since is None:
+                self._dirty_since = time.monotonic()
+        self._changed.set()
+
+    def subscribe(self, q=None):
+        """Register a seat feed subscriber; returns a queue of SeatUpdate batches"""
+        if q is None:
+            q = queue.Queue(maxsize=SEAT_FEED_QUEUE_SIZE)
+        with self._lock:
+            self._subscribers.add(q)
+        return q
+
+    def unsubscribe(self, q):
+        with self._lock:
+            self._subscribers.discard(q)
+
+    def _publish(self, old, new):
+        """Push seat changes between two catalogs to every subscriber"""
+        with self._lock:
+            subscribers = list(self._subscribers)
+        # A first load has nothing to diff against; subscribers start from a snapshot
+        if not subscribers or old is None:
+            return
+
+        before = {c.course_id: c for c in old.courses}
+        updates = []
+        for course in new.courses:
+            prev = before.pop(course.course_id, None)
+            if (prev is None or prev.enrolled != course.enrolled
+                    or prev.capacity != course.capacity or prev.is_open != course.is_open):
+                updates.append(seat_update(course))
+        for course_id in before:
+            updates.append(course_pb2.SeatUpdate(course_id=course_id, removed=True))
+        if not updates:
+            return
+
+        for q in subscribers:
+            try:
+                q.put_nowait(updates)
+            except queue.Full:
+                # Slow consumer: replace its backlog with a full snapshot
+                with q.mutex:
+                    q.queue.clear()
+                q.put_nowait([seat_update(c) for c in new.courses])
+
+    def _is_fresh(self, now):
+        if self._response is None:
+            return False
+        age = now - self._loaded_at
+        if age >= self.max_age:
+            return False
+        if not self._listening:
+            return age < self.staleness
+        if self._dirty_since is not None:
+            return now - self._dirty_since < self.staleness
+        return True
+
+    def cached(self):
+        """Return the cached catalog if it is fresh, without ever touching the database"""
+        if self._is_fresh(time.monotonic()):
+            return self._response
+        return None
+
+    def get(self):
+        """Return the cached catalog, rebuilding it first if it is too stale"""
+        if self._is_fresh(time.monotonic()):
+            return self._response
+
+        with self._refresh_lock:
+            if self._is_fresh(time.monotonic()):
+                return self._response
+
+            changes = self._changes
+            response = load_courses()
+            if response.status != "success":
+                # Serve the last good catalog rather than failing the page
+                return self._response or response
+
+            with self._lock:
+                previous = self._response
+                self._response = response
+                self._loaded_at = time.monotonic()
+                self._loaded_changes = changes
+                if self._changes == changes:
+                    self._dirty_since = None
+            self._publish(previous, response)
+            return response
+
+    def start(self):
+        for target, name in ((self._listen, 'course-catalog-listener'), (self._push, 'seat-feed-pusher')):
+            threading.Thread(target=target, name=name, daemon=True).start()
+
+    def _push(self):
+        """Rebuild promptly after a change while anyone is watching, so watchers don't wait for a reader"""
+        while True:
+            self._changed.wait()
+            self._changed.clear()
+            time.sleep(self.staleness)
+            if self._subscribers:
+                self.get()
+
+    def _listen(self):
+        backoff = 1
+        while True:
+            conn = None
+            try:
+                conn = psycopg2.connect(
+                    dbname=POSTGRES_DB,
+                    user=POSTGRES_USER,
+                    password=POSTGRES_PASSWORD,
+                    host=POSTGRES_HOST,
+                    port=POSTGRES_PORT
+                )
+                conn.autocommit = True
+                with conn.cursor() as cur:
+                    cur.execute(f"LISTEN {COURSE_CATALOG_CHANNEL};")
+                # Changes may have been missed while disconnected
+                self.invalidate()
+                self._listening = True
+                backoff = 1
+                print(f"Course catalog listening on '{COURSE_CATALOG_CHANNEL}'")
+
+                while True:
+                    select.select([conn], [], [], 30)
+                    conn.poll()
+                    if conn.notifies:
+                        conn.notifies.clear()
+                        self.invalidate()
+            except psycopg2.Error as e:
+                print(f"Course catalog listener error: {e}")
+            finally:
+                self._listening = False
+                if conn is not None:
+                    conn.close()
+            time.sleep(backoff)
+            backoff = min(backoff * 2, 30)
+
+def seat_update(course):
+    return course_pb2.SeatUpdate(
+        course_id=course.course_id,
+        capacity=course.capacity,
+        enrolled=course.enrolled,
+        is_open=course.is_open
+    )
+
+course_catalog = CourseCatalogCache()
 
 class CourseServiceServicer(course_pb2_grpc.CourseServiceServicer):
     
     def GetCourses(self, request, context):
-        """Get all available courses"""
-        conn = get_db_connection()
-        if conn is None:
-            return course_pb2.GetCoursesResponse(
-                status="error",
-                message="Database connection error",
-                courses=[]
-            )
-        
-        try:
-            with conn.cursor(cursor_factory=DictCursor) as cur:
-                cur.execute("""
-                    SELECT course_id, name, capacity, enrolled, is_open 
-                    FROM courses 
-                    ORDER BY course_id;
-                """)
-                rows = cur.fetchall()
-                
-                courses = []
-                for row in rows:
-                    course_info = course_pb2.CourseInfo(
-                        course_id=row['course_id'],
-                        name=row['name'],
-                        capacity=row['capacity'],
-                        enrolled=row['enrolled'],
-                        is_open=row['is_open']
-                    )
-                    courses.append(course_info)
-                
-                return course_pb2.GetCoursesResponse(
-                    status="success",
-                    message="Courses retrieved successfully",
-                    courses=courses
-                )
-        
-        except Exception as e:
-            print(f"Error fetching courses: {e}")
-            return course_pb2.GetCoursesResponse(
-                status="error",
-                message="Internal server error",
-                courses=[]
-            )
-        finally:
-            conn.close()
+        """Get all available courses (served from the in-process catalog cache)"""
+        return course_catalog.get()
     
     def GetCourseDetails(self, request, context):
         """Get details of a specific course"""
@@ -148,11 +318,7 @@ class CourseServiceServicer(course_pb2_grpc.CourseServiceServicer):
         
         try:
             with conn.cursor(cursor_factory=DictCursor) as cur:
-                cur.execute("""
-                    SELECT course_id, name, capacity, enrolled, is_open 
-                    FROM courses 
-                    WHERE course_id = %s;
-                """, (course_id,))
+                SELECT_COURSE.execute(cur, (course_id,))
                 row = cur.fetchone()
                 
                 if row is None:
@@ -184,11 +350,39 @@ class CourseServiceServicer(course_pb2_grpc.CourseServiceServicer):
                 course=None
             )
         finally:
-            conn.close()
+            release_db_connection(conn)
+    
+    def WatchSeatAvailability(self, request, context):
+        """Stream seat counts: a snapshot first, then changes as enrollments happen"""
+        watched = set(request.course_ids)
+        updates = course_catalog.subscribe()
+        try:
+            snapshot = course_catalog.get()
+            for course in snapshot.courses:
+                if not watched or course.course_id in watched:
+                    yield seat_update(course)
+
+            while context.is_active():
+                try:
+                    batch = updates.get(timeout=SEAT_FEED_HEARTBEAT)
+                except queue.Empty:
+                    continue
+                for update in batch:
+                    if not watched or update.course_id in watched:
+                        yield update
+        finally:
+            course_catalog.unsubscribe(updates)
 
 def serve():
     init_db()
-    server = grpc.server(futures.ThreadPoolExecutor(max_workers=10))
+    db_pool.warm()
+    start_pool_stats_reporter()
+    course_catalog.start()
+    server = grpc.server(
+        futures.ThreadPoolExecutor(max_workers=MAX_WORKERS),
+        options=GRPC_SERVER_OPTIONS,
+        maximum_concurrent_rpcs=GRPC_MAX_CONCURRENT_RPCS
+    )
     course_pb2_grpc.add_CourseServiceServicer_to_server(CourseServiceServicer(), server)
     server.add_insecure_port('[::]:50052')
     print("gRPC Course Service starting on port 50052...")
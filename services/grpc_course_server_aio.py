@@ -0,0 +1,144 @@
+import grpc
+import sys
+sys.path.append('./generated')
+
+import course_pb2
+import course_pb2_grpc
+
+import asyncio
+import queue
+from common_db import start_pool_stats_reporter
+from common_db_aio import DB_UNAVAILABLE, get_aio_pool, open_aio_pools, close_aio_pools
+from common_grpc import GRPC_SERVER_OPTIONS, GRPC_MAX_CONCURRENT_RPCS
+from grpc_course_server import (
+    POSTGRES_DB, POSTGRES_USER, POSTGRES_PASSWORD, POSTGRES_HOST, POSTGRES_PORT,
+    SEAT_FEED_QUEUE_SIZE, SEAT_FEED_HEARTBEAT, init_db, course_catalog, seat_update
+)
+
+# grpc.aio version of grpc_course_server.py. The catalog cache and its LISTEN
+# thread are shared with the threaded server; course lookups use an async pool.
+
+db_pool = get_aio_pool(
+    POSTGRES_DB,
+    user=POSTGRES_USER,
+    password=POSTGRES_PASSWORD,
+    host=POSTGRES_HOST,
+    port=POSTGRES_PORT
+)
+
+class LoopQueue(queue.Queue):
+    """Seat feed queue filled by the catalog cache thread and drained by a coroutine"""
+
+    def __init__(self, maxsize):
+        super().__init__(maxsize)
+        self._loop = asyncio.get_running_loop()
+        self._ready = asyncio.Event()
+
+    def _put(self, item):
+        super()._put(item)
+        self._loop.call_soon_threadsafe(self._ready.set)
+
+    async def get_async(self, timeout):
+        """Next batch, or raise asyncio.TimeoutError after `timeout` seconds"""
+        while True:
+            try:
+                return self.get_nowait()
+            except queue.Empty:
+                pass
+            self._ready.clear()
+            if self.empty():
+                await asyncio.wait_for(self._ready.wait(), timeout)
+
+class AsyncCourseServiceServicer(course_pb2_grpc.CourseServiceServicer):
+
+    async def GetCourses(self, request, context):
+        """Get all available courses (served from the in-process catalog cache)"""
+        response = course_catalog.cached()
+        if response is None:
+            # Rebuilds are rare and single-flight; keep the blocking query off the loop
+            response = await asyncio.to_thread(course_catalog.get)
+        return response
+
+    async def GetCourseDetails(self, request, context):
+        """Get details of a specific course"""
+        course_id = request.course_id
+
+        try:
+            async with db_pool.connection() as conn:
+                cur = await conn.execute("""
+                    SELECT course_id, name, capacity, enrolled, is_open
+                    FROM courses
+                    WHERE course_id = %s;
+                """, (course_id,))
+                row = await cur.fetchone()
+        except DB_UNAVAILABLE:
+            return course_pb2.CourseResponse(
+                status="error",
+                message="Database connection error",
+                course=None
+            )
+        except Exception as e:
+            print(f"Error fetching course details: {e}")
+            return course_pb2.CourseResponse(
+                status="error",
+                message="Internal server error",
+                course=None
+            )
+
+        if row is None:
+            return course_pb2.CourseResponse(
+                status="error",
+                message=f"Course {course_id} not found",
+                course=None
+            )
+
+        return course_pb2.CourseResponse(
+            status="success",
+            message="Course details retrieved",
+            course=course_pb2.CourseInfo(
+                course_id=row['course_id'],
+                name=row['name'],
+                capacity=row['capacity'],
+                enrolled=row['enrolled'],
+                is_open=row['is_open']
+            )
+        )
+
+    async def WatchSeatAvailability(self, request, context):
+        """Stream seat counts: a snapshot first, then changes as enrollments happen"""
+        watched = set(request.course_ids)
+        updates = course_catalog.subscribe(LoopQueue(SEAT_FEED_QUEUE_SIZE))
+        try:
+            snapshot = await self.GetCourses(None, context)
+            for course in snapshot.courses:
+                if not watched or course.course_id in watched:
+                    yield seat_update(course)
+
+            while True:
+                try:
+                    batch = await updates.get_async(SEAT_FEED_HEARTBEAT)
+                except asyncio.TimeoutError:
+                    continue
+                for update in batch:
+                    if not watched or update.course_id in watched:
+                        yield update
+        finally:
+            course_catalog.unsubscribe(updates)
+
+async def serve():
+    init_db()
+    await open_aio_pools()
+    start_pool_stats_reporter()
+    course_catalog.start()
+    server = grpc.aio.server(options=GRPC_SERVER_OPTIONS, maximum_concurrent_rpcs=GRPC_MAX_CONCURRENT_RPCS)
+    course_pb2_grpc.add_CourseServiceServicer_to_server(AsyncCourseServiceServicer(), server)
+    server.add_insecure_port('[::]:50052')
+    print("gRPC Course Service (asyncio) starting on port 50052...")
+    await server.start()
+    try:
+        await server.wait_for_termination()
+    finally:
+        await close_aio_pools()
+
+if __name__ == '__main__':
+    asyncio.run(serve())
@@ -9,8 +9,9 @@ import enrollment_pb2_grpc
 import psycopg2
 from psycopg2.extras import DictCursor
 import os
-import jwt
-from datetime import datetime, timezone
+from common_db import PreparedStatement, get_pool, start_pool_stats_reporter
+from common_grpc import GRPC_SERVER_OPTIONS, GRPC_MAX_WORKERS, GRPC_MAX_CONCURRENT_RPCS
+from common_auth import validate_token_locally
 
 DB_NAME = os.getenv('POSTGRES_DB', 'student_portal_courses')
 DB_USER = os.getenv('POSTGRES_USER', 'postgres')
@@ -18,71 +19,75 @@ DB_PASSWORD = os.getenv('POSTGRES_PASSWORD', '1234')
 DB_HOST = os.getenv('POSTGRES_HOST', 'localhost')
 DB_PORT = os.getenv('POSTGRES_PORT', '5432')
 
-# JWT Configuration (must match auth server)
-JWT_SECRET_KEY = os.getenv('JWT_SECRET_KEY', 'super_secret_auth_key_12345')
-JWT_ALGORITHM = "HS256"
+# Conditional seat reservation: the seat is only taken when the course is open,
+# has room and the student is not yet enrolled, and the enrollment row is only
+# inserted when the seat was taken. The outer SELECT reads the pre-update row
+# so the caller can tell why a reservation did not happen.
+ENROLL_QUERY = """
+    WITH seat AS (
+        UPDATE courses
+        SET enrolled = enrolled + 1
+        WHERE course_id = %(course_id)s
+          AND is_open
+          AND enrolled < capacity
+          AND NOT EXISTS (
+              SELECT 1 FROM enrollments
+              WHERE student_public_id = %(student_id)s AND course_id = %(course_id)s
+          )
+        RETURNING course_id
+    ),
+    new_enrollment AS (
+        INSERT INTO enrollments (student_public_id, course_id)
+        SELECT %(student_id)s, course_id FROM seat
+        RETURNING course_id
+    )
+    SELECT c.name, c.capacity, c.enrolled, c.is_open,
+           EXISTS (SELECT 1 FROM new_enrollment) AS reserved,
+           EXISTS (
+               SELECT 1 FROM enrollments e
+               WHERE e.student_public_id = %(student_id)s AND e.course_id = c.course_id
+           ) AS already_enrolled
+    FROM courses c
+    WHERE c.course_id = %(course_id)s;
+"""
+
+# Hot queries, prepared once per pooled connection
+ENROLL = PreparedStatement('enrollment_enroll', ENROLL_QUERY)
+SELECT_STUDENT_ENROLLMENTS = PreparedStatement('enrollment_select_student_enrollments', """
+    SELECT e.course_id, c.name, e.enrollment_date
+    FROM enrollments e
+    JOIN courses c ON e.course_id = c.course_id
+    WHERE e.student_public_id = %s
+    ORDER BY e.enrollment_date DESC;
+""")
+SELECT_ENROLLMENT = PreparedStatement('enrollment_select_enrollment',
+    "SELECT 1 FROM enrollments WHERE student_public_id = %s AND course_id = %s;")
+SELECT_COURSE_NAME = PreparedStatement('enrollment_select_course_name',
+    "SELECT name FROM courses WHERE course_id = %s;")
+DELETE_ENROLLMENT = PreparedStatement('enrollment_delete_enrollment',
+    "DELETE FROM enrollments WHERE student_public_id = %s AND course_id = %s;")
+RELEASE_SEAT = PreparedStatement('enrollment_release_seat',
+    "UPDATE courses SET enrolled = enrolled - 1 WHERE course_id = %s AND enrolled > 0;")
+
+# One pooled DB connection per gRPC worker thread
+MAX_WORKERS = GRPC_MAX_WORKERS
+
+db_pool = get_pool(
+    DB_NAME,
+    user=DB_USER,
+    password=DB_PASSWORD,
+    host=DB_HOST,
+    port=DB_PORT,
+    max_size=MAX_WORKERS
+)
 
 def get_db_connection():
-    try:
-        conn = psycopg2.connect(
-            dbname=DB_NAME,
-            user=DB_USER,
-            password=DB_PASSWORD,
-            host=DB_HOST,
-            port=DB_PORT
-        )
-        return conn
-    except psycopg2.Error as e:
-        print(f"Database connection error: {e}")
-        return None
-
-def validate_token_locally(token):
-    """Validate JWT token locally without calling auth service"""
-    if not token:
-        return {
-            "valid": False,
-            "message": "Token missing"
-        }
-    
-    try:
-        # Decode and verify the JWT token
-        payload = jwt.decode(token, JWT_SECRET_KEY, algorithms=[JWT_ALGORITHM])
-        
-        # Check if token has expired (jwt.decode already does this, but being explicit)
-        exp_timestamp = payload.get('exp')
-        if exp_timestamp:
-            exp_datetime = datetime.fromtimestamp(exp_timestamp, tz=timezone.utc)
-            if datetime.now(timezone.utc) > exp_datetime:
-                return {
-                    "valid": False,
-                    "message": "Token expired"
-                }
-        
-        return {
-            "valid": True,
-            "user_id": payload.get('public_id'),
-            "role": payload.get('role'),
-            "username": payload.get('username')
-        }
-    
-    except jwt.ExpiredSignatureError:
-        print(f"✗ Token validation failed: Token expired")
-        return {
-            "valid": False,
-            "message": "Token expired"
-        }
-    except jwt.InvalidTokenError as e:
-        print(f"✗ Token validation failed: Invalid token - {e}")
-        return {
-            "valid": False,
-            "message": "Invalid token"
-        }
-    except Exception as e:
-        print(f"✗ Token validation error: {e}")
-        return {
-            "valid": False,
-            "message": "Token validation error"
-        }
+    """Check a connection out of the shared pool (None if the DB is unavailable)"""
+    return db_pool.getconn()
+
+def release_db_connection(conn):
+    """Return a connection obtained from get_db_connection() to the pool"""
+    db_pool.putconn(conn)
 
 class EnrollmentServiceServicer(enrollment_pb2_grpc.EnrollmentServiceServicer):
     
@@ -118,7 +123,10 @@ class EnrollmentServiceServicer(enrollment_pb2_grpc.EnrollmentServiceServicer):
         try:
             cur = conn.cursor(cursor_factory=DictCursor)
 
-            cur.execute("SELECT name, capacity, enrolled, is_open FROM courses WHERE course_id = %s;", (course_id,))
+            # Reserve a seat and record the enrollment in one statement. The
+            # UPDATE re-checks enrolled < capacity under the row lock, so
+            # concurrent enrollers on the same course can never overbook it.
+            ENROLL.execute(cur, {"student_id": user_id, "course_id": course_id})
             course = cur.fetchone()
 
             if course is None:
@@ -127,30 +135,26 @@ class EnrollmentServiceServicer(enrollment_pb2_grpc.EnrollmentServiceServicer):
                     message=f"Course {course_id} not found"
                 )
 
-            if not course['is_open']:
-                return enrollment_pb2.EnrollResponse(
-                    status="error",
-                    message=f"Course {course['name']} is not open for enrollment"
-                )
+            if not course['reserved']:
+                conn.rollback()
 
-            if course['enrolled'] >= course['capacity']:
-                return enrollment_pb2.EnrollResponse(
-                    status="error",
-                    message=f"Course {course['name']} is full"
-                )
+                if not course['is_open']:
+                    return enrollment_pb2.EnrollResponse(
+                        status="error",
+                        message=f"Course {course['name']} is not open for enrollment"
+                    )
+
+                if course['already_enrolled']:
+                    return enrollment_pb2.EnrollResponse(
+                        status="error",
+                        message=f"You are already enrolled in {course['name']}"
+                    )
 
-            cur.execute("SELECT 1 FROM enrollments WHERE student_public_id = %s AND course_id = %s;", 
-                        (user_id, course_id))
-            if cur.fetchone() is not None:
                 return enrollment_pb2.EnrollResponse(
                     status="error",
-                    message=f"You are already enrolled in {course['name']}"
+                    message=f"Course {course['name']} is full"
                 )
 
-            cur.execute("UPDATE courses SET enrolled = enrolled + 1 WHERE course_id = %s;", (course_id,))
-            cur.execute("INSERT INTO enrollments (student_public_id, course_id) VALUES (%s, %s);", 
-                        (user_id, course_id))
-
             conn.commit()
             print(f"✓ User {user_id} successfully enrolled in {course_id}")
             
@@ -159,6 +163,14 @@ class EnrollmentServiceServicer(enrollment_pb2_grpc.EnrollmentServiceServicer):
                 message=f"Successfully enrolled in {course['name']}!"
             )
 
+        except psycopg2.errors.UniqueViolation:
+            # Lost a race against the same student's concurrent request; the
+            # whole statement (including the seat increment) was rolled back
+            conn.rollback()
+            return enrollment_pb2.EnrollResponse(
+                status="error",
+                message=f"You are already enrolled in {course_id}"
+            )
         except Exception as e:
             conn.rollback()
             print(f"✗ Enrollment error: {e}")
@@ -167,8 +179,7 @@ class EnrollmentServiceServicer(enrollment_pb2_grpc.EnrollmentServiceServicer):
                 message="An internal error occurred during enrollment"
             )
         finally:
-            if conn:
-                conn.close()
+            release_db_connection(conn)
 
     def GetStudentEnrollments(self, request, context):
         token = request.token
@@ -195,13 +206,7 @@ class EnrollmentServiceServicer(enrollment_pb2_grpc.EnrollmentServiceServicer):
 
         try:
             with conn.cursor(cursor_factory=DictCursor) as cur:
-                cur.execute("""
-                    SELECT e.course_id, c.name, e.enrollment_date 
-                    FROM enrollments e
-                    JOIN courses c ON e.course_id = c.course_id
-                    WHERE e.student_public_id = %s
-                    ORDER BY e.enrollment_date DESC;
-                """, (user_id,))
+                SELECT_STUDENT_ENROLLMENTS.execute(cur, (user_id,))
                 rows = cur.fetchall()
 
                 enrollments = []
@@ -228,8 +233,7 @@ class EnrollmentServiceServicer(enrollment_pb2_grpc.EnrollmentServiceServicer):
                 enrollments=[]
             )
         finally:
-            if conn:
-                conn.close()
+            release_db_connection(conn)
 
     def DropFromCourse(self, request, context):
         token = request.token
@@ -263,22 +267,19 @@ class EnrollmentServiceServicer(enrollment_pb2_grpc.EnrollmentServiceServicer):
         try:
             cur = conn.cursor(cursor_factory=DictCursor)
 
-            cur.execute("SELECT 1 FROM enrollments WHERE student_public_id = %s AND course_id = %s;", 
-                        (user_id, course_id))
+            SELECT_ENROLLMENT.execute(cur, (user_id, course_id))
             if cur.fetchone() is None:
                 return enrollment_pb2.DropResponse(
                     status="error",
                     message=f"You are not enrolled in course {course_id}"
                 )
 
-            cur.execute("SELECT name FROM courses WHERE course_id = %s;", (course_id,))
+            SELECT_COURSE_NAME.execute(cur, (course_id,))
             course = cur.fetchone()
             course_name = course['name'] if course else course_id
 
-            cur.execute("DELETE FROM enrollments WHERE student_public_id = %s AND course_id = %s;", 
-                        (user_id, course_id))
-            cur.execute("UPDATE courses SET enrolled = enrolled - 1 WHERE course_id = %s AND enrolled > 0;", 
-                        (course_id,))
+            DELETE_ENROLLMENT.execute(cur, (user_id, course_id))
+            RELEASE_SEAT.execute(cur, (course_id,))
 
             conn.commit()
             print(f"✓ User {user_id} successfully dropped from {course_id}")
@@ -296,11 +297,16 @@ class EnrollmentServiceServicer(enrollment_pb2_grpc.EnrollmentServiceServicer):
                 message="An internal error occurred during drop process"
             )
         finally:
-            if conn:
-                conn.close()
+            release_db_connection(conn)
 
 def serve():
-    server = grpc.server(futures.ThreadPoolExecutor(max_workers=10))
+    db_pool.warm()
+    start_pool_stats_reporter()
+    server = grpc.server(
+        futures.ThreadPoolExecutor(max_workers=MAX_WORKERS),
+        options=GRPC_SERVER_OPTIONS,
+        maximum_concurrent_rpcs=GRPC_MAX_CONCURRENT_RPCS
+    )
     enrollment_pb2_grpc.add_EnrollmentServiceServicer_to_server(EnrollmentServiceServicer(), server)
     server.add_insecure_port('[::]:50053')
     print("=" * 70)
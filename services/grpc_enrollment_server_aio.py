@@ -0,0 +1,245 @@
+import grpc
+import sys
+sys.path.append('./generated')
+
+import enrollment_pb2
+import enrollment_pb2_grpc
+
+import asyncio
+import uuid
+import psycopg
+from common_db_aio import DB_UNAVAILABLE, get_aio_pool, open_aio_pools, close_aio_pools
+from common_grpc import GRPC_SERVER_OPTIONS, GRPC_MAX_CONCURRENT_RPCS
+from common_auth import validate_token_locally
+from grpc_enrollment_server import DB_NAME, DB_USER, DB_PASSWORD, DB_HOST, DB_PORT, ENROLL_QUERY
+
+# grpc.aio version of grpc_enrollment_server.py: same RPCs and SQL, async pool
+
+db_pool = get_aio_pool(
+    DB_NAME,
+    user=DB_USER,
+    password=DB_PASSWORD,
+    host=DB_HOST,
+    port=DB_PORT
+)
+
+class AsyncEnrollmentServiceServicer(enrollment_pb2_grpc.EnrollmentServiceServicer):
+
+    async def EnrollInCourse(self, request, context):
+        token = request.token
+        course_id = request.course_id
+
+        # Use local JWT validation instead of calling auth service
+        auth_result = validate_token_locally(token)
+
+        if not auth_result.get('valid'):
+            return enrollment_pb2.EnrollResponse(
+                status="error",
+                message=f"Authentication failed: {auth_result.get('message', 'Invalid token')}"
+            )
+
+        user_id = auth_result['user_id']
+        user_role = auth_result['role']
+
+        if user_role != 'student':
+            return enrollment_pb2.EnrollResponse(
+                status="rejected",
+                message=f"Only students can enroll. Your role is '{user_role}'"
+            )
+
+        try:
+            async with db_pool.connection() as conn:
+                # Seat reservation and enrollment row in one statement (see ENROLL_QUERY)
+                cur = await conn.execute(ENROLL_QUERY, {"student_id": uuid.UUID(user_id), "course_id": course_id})
+                course = await cur.fetchone()
+
+                if course is None:
+                    return enrollment_pb2.EnrollResponse(
+                        status="error",
+                        message=f"Course {course_id} not found"
+                    )
+
+                if not course['reserved']:
+                    await conn.rollback()
+
+                    if not course['is_open']:
+                        return enrollment_pb2.EnrollResponse(
+                            status="error",
+                            message=f"Course {course['name']} is not open for enrollment"
+                        )
+
+                    if course['already_enrolled']:
+                        return enrollment_pb2.EnrollResponse(
+                            status="error",
+                            message=f"You are already enrolled in {course['name']}"
+                        )
+
+                    return enrollment_pb2.EnrollResponse(
+                        status="error",
+                        message=f"Course {course['name']} is full"
+                    )
+
+                await conn.commit()
+            print(f"✓ User {user_id} successfully enrolled in {course_id}")
+
+            return enrollment_pb2.EnrollResponse(
+                status="success",
+                message=f"Successfully enrolled in {course['name']}!"
+            )
+
+        except psycopg.errors.UniqueViolation:
+            # Lost a race against the same student's concurrent request
+            return enrollment_pb2.EnrollResponse(
+                status="error",
+                message=f"You are already enrolled in {course_id}"
+            )
+        except DB_UNAVAILABLE:
+            return enrollment_pb2.EnrollResponse(
+                status="error",
+                message="Database is unavailable"
+            )
+        except Exception as e:
+            print(f"✗ Enrollment error: {e}")
+            return enrollment_pb2.EnrollResponse(
+                status="error",
+                message="An internal error occurred during enrollment"
+            )
+
+    async def GetStudentEnrollments(self, request, context):
+        token = request.token
+
+        # Use local JWT validation
+        auth_result = validate_token_locally(token)
+
+        if not auth_result.get('valid'):
+            return enrollment_pb2.EnrollmentsResponse(
+                status="error",
+                message="Authentication failed",
+                enrollments=[]
+            )
+
+        user_id = auth_result['user_id']
+
+        try:
+            async with db_pool.connection() as conn:
+                cur = await conn.execute("""
+                    SELECT e.course_id, c.name, e.enrollment_date
+                    FROM enrollments e
+                    JOIN courses c ON e.course_id = c.course_id
+                    WHERE e.student_public_id = %s
+                    ORDER BY e.enrollment_date DESC;
+                """, (uuid.UUID(user_id),))
+                rows = await cur.fetchall()
+        except DB_UNAVAILABLE:
+            return enrollment_pb2.EnrollmentsResponse(
+                status="error",
+                message="Database unavailable",
+                enrollments=[]
+            )
+        except Exception as e:
+            print(f"✗ Error fetching enrollments: {e}")
+            return enrollment_pb2.EnrollmentsResponse(
+                status="error",
+                message="Internal server error",
+                enrollments=[]
+            )
+
+        enrollments = []
+        for row in rows:
+            enrollments.append(enrollment_pb2.EnrollmentInfo(
+                course_id=row['course_id'],
+                course_name=row['name'],
+                enrollment_date=str(row['enrollment_date'])
+            ))
+
+        print(f"✓ Retrieved {len(enrollments)} enrollments for user {user_id}")
+        return enrollment_pb2.EnrollmentsResponse(
+            status="success",
+            message="Enrollments retrieved",
+            enrollments=enrollments
+        )
+
+    async def DropFromCourse(self, request, context):
+        token = request.token
+        course_id = request.course_id
+
+        # Use local JWT validation
+        auth_result = validate_token_locally(token)
+
+        if not auth_result.get('valid'):
+            return enrollment_pb2.DropResponse(
+                status="error",
+                message=f"Authentication failed: {auth_result.get('message', 'Invalid token')}"
+            )
+
+        user_id = auth_result['user_id']
+        user_role = auth_result['role']
+
+        if user_role != 'student':
+            return enrollment_pb2.DropResponse(
+                status="rejected",
+                message=f"Only students can drop a course. Your role is '{user_role}'"
+            )
+
+        student_id = uuid.UUID(user_id)
+        try:
+            async with db_pool.connection() as conn:
+                cur = await conn.execute(
+                    "SELECT 1 FROM enrollments WHERE student_public_id = %s AND course_id = %s;",
+                    (student_id, course_id)
+                )
+                if await cur.fetchone() is None:
+                    return enrollment_pb2.DropResponse(
+                        status="error",
+                        message=f"You are not enrolled in course {course_id}"
+                    )
+
+                cur = await conn.execute("SELECT name FROM courses WHERE course_id = %s;", (course_id,))
+                course = await cur.fetchone()
+                course_name = course['name'] if course else course_id
+
+                await conn.execute(
+                    "DELETE FROM enrollments WHERE student_public_id = %s AND course_id = %s;",
+                    (student_id, course_id)
+                )
+                await conn.execute(
+                    "UPDATE courses SET enrolled = enrolled - 1 WHERE course_id = %s AND enrolled > 0;",
+                    (course_id,)
+                )
+                await conn.commit()
+            print(f"✓ User {user_id} successfully dropped from {course_id}")
+
+            return enrollment_pb2.DropResponse(
+                status="success",
+                message=f"Successfully dropped from {course_name}."
+            )
+
+        except DB_UNAVAILABLE:
+            return enrollment_pb2.DropResponse(
+                status="error",
+                message="Database is unavailable"
+            )
+        except Exception as e:
+            print(f"✗ Drop error: {e}")
+            return enrollment_pb2.DropResponse(
+                status="error",
+                message="An internal error occurred during drop process"
+            )
+
+async def serve():
+    await open_aio_pools()
+    server = grpc.aio.server(options=GRPC_SERVER_OPTIONS, maximum_concurrent_rpcs=GRPC_MAX_CONCURRENT_RPCS)
+    enrollment_pb2_grpc.add_EnrollmentServiceServicer_to_server(AsyncEnrollmentServiceServicer(), server)
+    server.add_insecure_port('[::]:50053')
+    print("=" * 70)
+    print("gRPC Enrollment Service (asyncio) starting on port 50053...")
+    print(f"Concurrency bounded by the DB pool (max {db_pool.max_size} connections)")
+    print("=" * 70)
+    await server.start()
+    try:
+        await server.wait_for_termination()
+    finally:
+        await close_aio_pools()
+
+if __name__ == '__main__':
+    asyncio.run(serve())
@@ -13,6 +13,9 @@ from psycopg2.extras import DictCursor
 import os
 import uuid
 from datetime import datetime
+from common_db import PreparedStatement, get_pool, start_pool_stats_reporter
+from common_grpc import GRPC_SERVER_OPTIONS, GRPC_MAX_WORKERS, GRPC_MAX_CONCURRENT_RPCS, GRPC_CALL_TIMEOUT, get_stub
+from common_auth import TokenCache, token_expiry, validate_token_locally
 
 # Configuration
 POSTGRES_DB_GRADES = os.getenv('POSTGRES_DB_GRADES', 'student_portal_grades')
@@ -26,39 +29,154 @@ POSTGRES_PORT = os.getenv('POSTGRES_PORT', '5432')
 # Auth service gRPC address
 AUTH_GRPC_HOST = os.getenv('AUTH_GRPC_HOST', 'localhost:50051')
 
+# Validated tokens are cached so repeat faculty calls skip the auth service
+AUTH_TOKEN_CACHE_SIZE = int(os.getenv('AUTH_TOKEN_CACHE_SIZE', '10000'))
+AUTH_TOKEN_CACHE_TTL = float(os.getenv('AUTH_TOKEN_CACHE_TTL', '60'))
+
+# Optional fast path: verify HS256 tokens locally instead of calling the auth
+# service (JWT_SECRET_KEY must match the auth server)
+LOCAL_JWT_VERIFY = os.getenv('LOCAL_JWT_VERIFY', 'false').lower() in ('1', 'true', 'yes')
+
+# Upper bound on entries accepted by one UploadStudentGrades call
+BULK_UPLOAD_MAX_ROWS = int(os.getenv('BULK_UPLOAD_MAX_ROWS', '5000'))
+
+# GetAllStudents page size when the request leaves limit at 0, and the cap on it
+STUDENTS_PAGE_SIZE = int(os.getenv('STUDENTS_PAGE_SIZE', '50'))
+STUDENTS_PAGE_MAX = int(os.getenv('STUDENTS_PAGE_MAX', '500'))
+
+token_cache = TokenCache(max_size=AUTH_TOKEN_CACHE_SIZE, ttl=AUTH_TOKEN_CACHE_TTL)
+
+# One pooled DB connection per gRPC worker thread, per database
+MAX_WORKERS = GRPC_MAX_WORKERS
+
+def _db_pool(db_name):
+    return get_pool(
+        db_name,
+        user=POSTGRES_USER,
+        password=POSTGRES_PASSWORD,
+        host=POSTGRES_HOST,
+        port=POSTGRES_PORT,
+        max_size=MAX_WORKERS
+    )
+
 def get_db_connection(db_name):
-    try:
-        conn = psycopg2.connect(
-            dbname=db_name,
-            user=POSTGRES_USER,
-            password=POSTGRES_PASSWORD,
-            host=POSTGRES_HOST,
-            port=POSTGRES_PORT
-        )
-        return conn
-    except psycopg2.OperationalError as e:
-        print(f"Database connection failed: {e}")
-        return None
+    """Check a connection out of db_name's shared pool (None if the DB is unavailable)"""
+    return _db_pool(db_name).getconn()
+
+def release_db_connection(db_name, conn):
+    """Return a connection obtained from get_db_connection(db_name) to its pool"""
+    _db_pool(db_name).putconn(conn)
+
+# Hot queries, prepared once per pooled connection
+# Student pages walk idx_users_role_username: keyset on username in byte
+# (C collation) order, and a prefix is the range [prefix, prefix_upper_bound)
+SELECT_STUDENTS_PAGE = PreparedStatement('faculty_select_students_page', """
+    SELECT public_id, username
+    FROM users
+    WHERE role = 'student' AND username COLLATE "C" > %(after)s
+    ORDER BY username COLLATE "C"
+    LIMIT %(limit)s;
+""")
+SELECT_STUDENTS_PREFIX_PAGE = PreparedStatement('faculty_select_students_prefix_page', """
+    SELECT public_id, username
+    FROM users
+    WHERE role = 'student' AND username COLLATE "C" > %(after)s
+      AND username COLLATE "C" >= %(prefix)s AND username COLLATE "C" < %(prefix_end)s
+    ORDER BY username COLLATE "C"
+    LIMIT %(limit)s;
+""")
+# A prefix of U+10FFFF characters has no upper bound: everything >= it starts with it
+SELECT_STUDENTS_PREFIX_TAIL_PAGE = PreparedStatement('faculty_select_students_prefix_tail_page', """
+    SELECT public_id, username
+    FROM users
+    WHERE role = 'student' AND username COLLATE "C" > %(after)s
+      AND username COLLATE "C" >= %(prefix)s
+    ORDER BY username COLLATE "C"
+    LIMIT %(limit)s;
+""")
+SELECT_USERNAME = PreparedStatement('faculty_select_username', """
+    SELECT username FROM users WHERE public_id = %s;
+""")
+SELECT_ENROLLMENTS = PreparedStatement('faculty_select_enrollments', """
+    SELECT e.course_id, c.name, e.enrollment_date
+    FROM enrollments e
+    JOIN courses c ON e.course_id = c.course_id
+    WHERE e.student_public_id = %s
+    ORDER BY e.enrollment_date DESC;
+""")
+SELECT_ENROLLMENT = PreparedStatement('faculty_select_enrollment', """
+    SELECT 1 FROM enrollments
+    WHERE student_public_id = %s AND course_id = %s;
+""")
+UPSERT_GRADE = PreparedStatement('faculty_upsert_grade', """
+    INSERT INTO grades (grade_id, student_public_id, course_id,
+                        grade, semester, remarks, uploaded_by_faculty_id)
+    VALUES (%s, %s, %s, %s, %s, %s, %s)
+    ON CONFLICT (student_public_id, course_id) DO UPDATE
+    SET grade = EXCLUDED.grade, semester = EXCLUDED.semester,
+        remarks = EXCLUDED.remarks,
+        uploaded_by_faculty_id = EXCLUDED.uploaded_by_faculty_id,
+        date_posted = CURRENT_TIMESTAMP
+    RETURNING grade_id, (xmax = 0) AS inserted;
+""")
+SELECT_BULK_ENROLLMENTS = PreparedStatement('faculty_select_bulk_enrollments', """
+    SELECT e.student_public_id::text, e.course_id
+    FROM enrollments e
+    JOIN unnest(%s::uuid[], %s::varchar[]) AS i(student_public_id, course_id)
+      ON e.student_public_id = i.student_public_id AND e.course_id = i.course_id;
+""")
+UPSERT_GRADES = PreparedStatement('faculty_upsert_grades', """
+    INSERT INTO grades (grade_id, student_public_id, course_id,
+                        grade, semester, remarks, uploaded_by_faculty_id)
+    SELECT gen_grade_id, student_public_id, course_id, grade, semester, remarks, %s::uuid
+    FROM unnest(%s::uuid[], %s::uuid[], %s::varchar[], %s::varchar[], %s::varchar[], %s::text[])
+         AS i(gen_grade_id, student_public_id, course_id, grade, semester, remarks)
+    ON CONFLICT (student_public_id, course_id) DO UPDATE
+    SET grade = EXCLUDED.grade, semester = EXCLUDED.semester,
+        remarks = EXCLUDED.remarks,
+        uploaded_by_faculty_id = EXCLUDED.uploaded_by_faculty_id,
+        date_posted = CURRENT_TIMESTAMP
+    RETURNING student_public_id::text, course_id, grade_id::text, (xmax = 0) AS inserted;
+""")
 
 def validate_token_with_auth_service(token):
+    """Validate a token, answering from the cache when possible"""
+    if LOCAL_JWT_VERIFY:
+        return validate_token_locally(token)
+
+    if not token:
+        return {
+            "valid": False,
+            "message": "Token missing"
+        }
+
+    cached = token_cache.get(token)
+    if cached is not None:
+        return cached
+
+    result = call_auth_service(token)
+    if result.get('valid'):
+        token_cache.put(token, result, token_expiry(token))
+    return result
+
+def call_auth_service(token):
     """Call Auth Service via gRPC to validate token"""
     try:
-        with grpc.insecure_channel(AUTH_GRPC_HOST) as channel:
-            stub = auth_pb2_grpc.AuthServiceStub(channel)
-            response = stub.ValidateToken(auth_pb2.ValidateRequest(token=token))
-            
-            if response.status == "valid":
-                return {
-                    "valid": True,
-                    "user_id": response.user_id,
-                    "role": response.role,
-                    "username": response.username
-                }
-            else:
-                return {
-                    "valid": False,
-                    "message": response.message
-                }
+        stub = get_stub(AUTH_GRPC_HOST, auth_pb2_grpc.AuthServiceStub)
+        response = stub.ValidateToken(auth_pb2.ValidateRequest(token=token), timeout=GRPC_CALL_TIMEOUT)
+        
+        if response.status == "valid":
+            return {
+                "valid": True,
+                "user_id": response.user_id,
+                "role": response.role,
+                "username": response.username
+            }
+        else:
+            return {
+                "valid": False,
+                "message": response.message
+            }
     except grpc.RpcError as e:
         print(f"gRPC error calling auth service: {e}")
         return {
@@ -66,10 +184,105 @@ def validate_token_with_auth_service(token):
             "message": "Auth service unavailable"
         }
 
+def prefix_upper_bound(prefix):
+    """Smallest string above every string that starts with prefix, in code point order (None if unbounded)"""
+    while prefix:
+        last = ord(prefix[-1]) + 1
+        if 0xD800 <= last <= 0xDFFF:
+            last = 0xE000  # surrogates cannot be stored
+        if last <= 0x10FFFF:
+            return prefix[:-1] + chr(last)
+        prefix = prefix[:-1]
+    return None
+
+def students_page_query(request):
+    """(statement, params, page size) for a GetStudentsRequest; fetches one extra row to detect a next page"""
+    limit = min(request.limit if request.limit > 0 else STUDENTS_PAGE_SIZE, STUDENTS_PAGE_MAX)
+    params = {"after": request.after_username, "limit": limit + 1}
+    if not request.prefix:
+        return SELECT_STUDENTS_PAGE, params, limit
+    params["prefix"] = request.prefix
+    prefix_end = prefix_upper_bound(request.prefix)
+    if prefix_end is None:
+        return SELECT_STUDENTS_PREFIX_TAIL_PAGE, params, limit
+    params["prefix_end"] = prefix_end
+    return SELECT_STUDENTS_PREFIX_PAGE, params, limit
+
+def students_page_response(rows, limit):
+    """StudentsResponse for a page fetched with students_page_query"""
+    page = rows[:limit]
+    return faculty_grades_pb2.StudentsResponse(
+        status="success",
+        message="Students retrieved successfully",
+        students=[
+            faculty_grades_pb2.StudentInfo(student_id=str(row['public_id']), username=row['username'])
+            for row in page
+        ],
+        next_after_username=page[-1]['username'] if len(rows) > limit else ""
+    )
+
+def plan_bulk_upload(grades):
+    """
+    Validate bulk upload entries. Returns the per-row results (invalid rows
+    already marked) and {(student_id, course_id): row} for the rows to write;
+    the last entry for a (student, course) pair wins.
+    """
+    results = [
+        faculty_grades_pb2.GradeUploadResult(
+            row=i, student_id=entry.student_id, course_id=entry.course_id
+        )
+        for i, entry in enumerate(grades)
+    ]
+
+    pending = {}
+    for i, entry in enumerate(grades):
+        error = None
+        try:
+            student_id = str(uuid.UUID(entry.student_id))
+        except ValueError:
+            error = "Invalid student_id"
+        if error is None:
+            if not entry.course_id or len(entry.course_id) > 20:
+                error = "Invalid course_id"
+            elif not entry.grade or len(entry.grade) > 5:
+                error = "Invalid grade"
+            elif not entry.semester or len(entry.semester) > 20:
+                error = "Invalid semester"
+        if error:
+            results[i].status = "error"
+            results[i].message = error
+            continue
+
+        key = (student_id, entry.course_id)
+        if key in pending:
+            earlier = pending[key]
+            results[earlier].status = "skipped"
+            results[earlier].message = f"Superseded by row {i}"
+        pending[key] = i
+    return results, pending
+
+def bulk_upload_response(results):
+    """Summarize per-row results into a BulkUploadGradesResponse"""
+    uploaded = sum(1 for r in results if r.status == "success")
+    failed_rows = len(results) - uploaded
+    if failed_rows == 0:
+        status = "success"
+    elif uploaded:
+        status = "partial"
+    else:
+        status = "error"
+    return faculty_grades_pb2.BulkUploadGradesResponse(
+        status=status,
+        message=f"{uploaded} of {len(results)} grades uploaded",
+        uploaded=uploaded,
+        failed=failed_rows,
+        results=results
+    )
+
 class FacultyGradesServiceServicer(faculty_grades_pb2_grpc.FacultyGradesServiceServicer):
     
     def GetAllStudents(self, request, context):
-        """Get all students in the system (Faculty only)"""
+        """Get one page of students in username order, optionally by username prefix (Faculty only)"""
         token = request.token
         
         # Validate token
@@ -101,28 +314,11 @@ class FacultyGradesServiceServicer(faculty_grades_pb2_grpc.FacultyGradesServiceS
             )
         
         try:
+            statement, params, limit = students_page_query(request)
             with conn.cursor(cursor_factory=DictCursor) as cur:
-                cur.execute("""
-                    SELECT public_id, username 
-                    FROM users 
-                    WHERE role = 'student'
-                    ORDER BY username;
-                """)
+                statement.execute(cur, params)
                 rows = cur.fetchall()
-                
-                students = []
-                for row in rows:
-                    student = faculty_grades_pb2.StudentInfo(
-                        student_id=str(row['public_id']),
-                        username=row['username']
-                    )
-                    students.append(student)
-                
-                return faculty_grades_pb2.StudentsResponse(
-                    status="success",
-                    message="Students retrieved successfully",
-                    students=students
-                )
+            return students_page_response(rows, limit)
         
         except Exception as e:
             print(f"Error fetching students: {e}")
@@ -132,7 +328,7 @@ class FacultyGradesServiceServicer(faculty_grades_pb2_grpc.FacultyGradesServiceS
                 students=[]
             )
         finally:
-            conn.close()
+            release_db_connection(POSTGRES_DB_AUTH, conn)
     
     def GetStudentEnrollments(self, request, context):
         """Get all courses a student is enrolled in (Faculty only)"""
@@ -176,9 +372,7 @@ class FacultyGradesServiceServicer(faculty_grades_pb2_grpc.FacultyGradesServiceS
         
         try:
             with auth_conn.cursor(cursor_factory=DictCursor) as cur:
-                cur.execute("""
-                    SELECT username FROM users WHERE public_id = %s;
-                """, (student_id,))
+                SELECT_USERNAME.execute(cur, (student_id,))
                 user_row = cur.fetchone()
                 
                 if not user_row:
@@ -192,7 +386,7 @@ class FacultyGradesServiceServicer(faculty_grades_pb2_grpc.FacultyGradesServiceS
                 
                 student_username = user_row['username']
         finally:
-            auth_conn.close()
+            release_db_connection(POSTGRES_DB_AUTH, auth_conn)
         
         # Get enrollments from courses DB
         courses_conn = get_db_connection(POSTGRES_DB_COURSES)
@@ -207,13 +401,7 @@ class FacultyGradesServiceServicer(faculty_grades_pb2_grpc.FacultyGradesServiceS
         
         try:
             with courses_conn.cursor(cursor_factory=DictCursor) as cur:
-                cur.execute("""
-                    SELECT e.course_id, c.name, e.enrollment_date
-                    FROM enrollments e
-                    JOIN courses c ON e.course_id = c.course_id
-                    WHERE e.student_public_id = %s
-                    ORDER BY e.enrollment_date DESC;
-                """, (student_id,))
+                SELECT_ENROLLMENTS.execute(cur, (student_id,))
                 rows = cur.fetchall()
                 
                 enrollments = []
@@ -243,7 +431,7 @@ class FacultyGradesServiceServicer(faculty_grades_pb2_grpc.FacultyGradesServiceS
                 enrollments=[]
             )
         finally:
-            courses_conn.close()
+            release_db_connection(POSTGRES_DB_COURSES, courses_conn)
     
     def UploadStudentGrade(self, request, context):
         """Upload a grade for a specific student in a specific course (Faculty only)"""
@@ -286,10 +474,7 @@ class FacultyGradesServiceServicer(faculty_grades_pb2_grpc.FacultyGradesServiceS
         
         try:
             with courses_conn.cursor() as cur:
-                cur.execute("""
-                    SELECT 1 FROM enrollments 
-                    WHERE student_public_id = %s AND course_id = %s;
-                """, (student_id, course_id))
+                SELECT_ENROLLMENT.execute(cur, (student_id, course_id))
                 
                 if not cur.fetchone():
                     return faculty_grades_pb2.UploadGradeResponse(
@@ -298,7 +483,7 @@ class FacultyGradesServiceServicer(faculty_grades_pb2_grpc.FacultyGradesServiceS
                         grade_id=""
                     )
         finally:
-            courses_conn.close()
+            release_db_connection(POSTGRES_DB_COURSES, courses_conn)
         
         # Upload grade to grades database
         grades_conn = get_db_connection(POSTGRES_DB_GRADES)
@@ -313,33 +498,14 @@ class FacultyGradesServiceServicer(faculty_grades_pb2_grpc.FacultyGradesServiceS
             grade_id = str(uuid.uuid4())
             
             with grades_conn.cursor() as cur:
-                # Check if grade already exists for this student and course
-                cur.execute("""
-                    SELECT grade_id FROM grades 
-                    WHERE student_public_id = %s AND course_id = %s;
-                """, (student_id, course_id))
-                
-                existing_grade = cur.fetchone()
-                
-                if existing_grade:
-                    # Update existing grade
-                    cur.execute("""
-                        UPDATE grades 
-                        SET grade = %s, semester = %s, remarks = %s, 
-                            uploaded_by_faculty_id = %s, date_posted = CURRENT_TIMESTAMP
-                        WHERE student_public_id = %s AND course_id = %s
-                        RETURNING grade_id;
-                    """, (grade, semester, remarks, faculty_id, student_id, course_id))
-                    grade_id = str(cur.fetchone()[0])
-                    message = f"Grade updated to {grade} for course {course_id}"
-                else:
-                    # Insert new grade
-                    cur.execute("""
-                        INSERT INTO grades (grade_id, student_public_id, course_id, 
-                                          grade, semester, remarks, uploaded_by_faculty_id)
-                        VALUES (%s, %s, %s, %s, %s, %s, %s);
-                    """, (grade_id, student_id, course_id, grade, semester, remarks, faculty_id))
+                # Insert, or update the existing grade for this student and course
+                UPSERT_GRADE.execute(cur, (grade_id, student_id, course_id, grade, semester, remarks, faculty_id))
+                grade_id, inserted = cur.fetchone()
+                grade_id = str(grade_id)
+                if inserted:
                     message = f"Grade {grade} uploaded successfully for course {course_id}"
+                else:
+                    message = f"Grade updated to {grade} for course {course_id}"
             
             grades_conn.commit()
             print(f"Faculty {faculty_id} uploaded grade {grade} for student {student_id} in {course_id}")
@@ -359,10 +525,112 @@ class FacultyGradesServiceServicer(faculty_grades_pb2_grpc.FacultyGradesServiceS
                 grade_id=""
             )
         finally:
-            grades_conn.close()
+            release_db_connection(POSTGRES_DB_GRADES, grades_conn)
+
+    def UploadStudentGrades(self, request, context):
+        """Upload many grades at once: one enrollment query and one grades transaction (Faculty only)"""
+        def failed(message):
+            return faculty_grades_pb2.BulkUploadGradesResponse(
+                status="error",
+                message=message,
+                uploaded=0,
+                failed=len(request.grades)
+            )
+
+        auth_result = validate_token_with_auth_service(request.token)
+
+        if not auth_result.get('valid'):
+            return failed("Authentication failed")
+
+        faculty_id = auth_result['user_id']
+        user_role = auth_result['role']
+
+        if user_role != 'faculty':
+            return failed(f"Only faculty can upload grades. Your role is '{user_role}'")
+
+        if not request.grades:
+            return failed("No grades provided")
+
+        if len(request.grades) > BULK_UPLOAD_MAX_ROWS:
+            return failed(f"Too many grades in one upload (max {BULK_UPLOAD_MAX_ROWS})")
+
+        results, pending = plan_bulk_upload(request.grades)
+
+        if not pending:
+            return bulk_upload_response(results)
+
+        # Verify every enrollment with a single set-based query
+        courses_conn = get_db_connection(POSTGRES_DB_COURSES)
+        if courses_conn is None:
+            return failed("Database connection error")
+
+        try:
+            with courses_conn.cursor() as cur:
+                SELECT_BULK_ENROLLMENTS.execute(cur, ([k[0] for k in pending], [k[1] for k in pending]))
+                enrolled = set(cur.fetchall())
+        except Exception as e:
+            print(f"Error verifying enrollments: {e}")
+            return failed("Internal server error")
+        finally:
+            release_db_connection(POSTGRES_DB_COURSES, courses_conn)
+
+        for key in list(pending):
+            if key not in enrolled:
+                i = pending.pop(key)
+                results[i].status = "error"
+                results[i].message = "Student is not enrolled in this course"
+
+        if not pending:
+            return bulk_upload_response(results)
+
+        grades_conn = get_db_connection(POSTGRES_DB_GRADES)
+        if grades_conn is None:
+            return failed("Grades database connection error")
+
+        rows = [
+            (key[0], key[1], request.grades[i].grade, request.grades[i].semester, request.grades[i].remarks)
+            for key, i in pending.items()
+        ]
+        columns = [list(column) for column in zip(*rows)]
+
+        try:
+            with grades_conn.cursor() as cur:
+                UPSERT_GRADES.execute(cur, [faculty_id, [str(uuid.uuid4()) for _ in rows]] + columns)
+                written = {
+                    (row[0], row[1]): (row[2], "uploaded" if row[3] else "updated")
+                    for row in cur.fetchall()
+                }
+
+            grades_conn.commit()
+        except Exception as e:
+            grades_conn.rollback()
+            print(f"Error uploading grades: {e}")
+            for i in pending.values():
+                results[i].status = "error"
+                results[i].message = "Failed to upload grade"
+            return bulk_upload_response(results)
+        finally:
+            release_db_connection(POSTGRES_DB_GRADES, grades_conn)
+
+        for key, i in pending.items():
+            grade_id, action = written[key]
+            results[i].status = "success"
+            results[i].grade_id = grade_id
+            results[i].message = f"Grade {request.grades[i].grade} {action} for course {key[1]}"
+
+        response = bulk_upload_response(results)
+        print(f"Faculty {faculty_id} bulk uploaded {response.uploaded}/{len(results)} grades")
+        return response
 
 def serve():
-    server = grpc.server(futures.ThreadPoolExecutor(max_workers=10))
+    for db_name in (POSTGRES_DB_AUTH, POSTGRES_DB_COURSES, POSTGRES_DB_GRADES):
+        _db_pool(db_name).warm()
+    start_pool_stats_reporter()
+    server = grpc.server(
+        futures.ThreadPoolExecutor(max_workers=MAX_WORKERS),
+        options=GRPC_SERVER_OPTIONS,
+        maximum_concurrent_rpcs=GRPC_MAX_CONCURRENT_RPCS
+    )
     faculty_grades_pb2_grpc.add_FacultyGradesServiceServicer_to_server(
         FacultyGradesServiceServicer(), server
     )
@@ -375,7 +643,10 @@ def serve():
     print("  - GetAllStudents")
     print("  - GetStudentEnrollments")
     print("  - UploadStudentGrade")
+    print("  - UploadStudentGrades (bulk)")
     print("\nAccess Control: Faculty Only")
+    print(f"Token validation: {'local HS256' if LOCAL_JWT_VERIFY else 'auth service'} "
+          f"(cached up to {AUTH_TOKEN_CACHE_TTL:.0f}s)")
     print("=" * 60)
     print("\nServer starting on port 50055...")
     server.start()
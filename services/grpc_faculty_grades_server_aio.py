@@ -0,0 +1,398 @@
+import grpc
+import sys
+sys.path.append('./generated')
+
+import faculty_grades_pb2
+import faculty_grades_pb2_grpc
+import auth_pb2
+import auth_pb2_grpc
+
+import asyncio
+import uuid
+from common_db_aio import DB_UNAVAILABLE, get_aio_pool, open_aio_pools, close_aio_pools
+from common_grpc import GRPC_SERVER_OPTIONS, GRPC_MAX_CONCURRENT_RPCS, GRPC_CALL_TIMEOUT, get_aio_stub, close_aio_channels
+from common_auth import token_expiry, validate_token_locally
+from grpc_faculty_grades_server import (
+    POSTGRES_DB_GRADES, POSTGRES_DB_COURSES, POSTGRES_DB_AUTH,
+    POSTGRES_USER, POSTGRES_PASSWORD, POSTGRES_HOST, POSTGRES_PORT,
+    AUTH_GRPC_HOST, AUTH_TOKEN_CACHE_TTL, LOCAL_JWT_VERIFY, BULK_UPLOAD_MAX_ROWS,
+    token_cache, plan_bulk_upload, bulk_upload_response, students_page_query, students_page_response
+)
+
+# grpc.aio version of grpc_faculty_grades_server.py: same RPCs and SQL, async
+# pools, and token validation over an asyncio channel to the auth service
+
+def _db_pool(db_name):
+    return get_aio_pool(
+        db_name,
+        user=POSTGRES_USER,
+        password=POSTGRES_PASSWORD,
+        host=POSTGRES_HOST,
+        port=POSTGRES_PORT
+    )
+
+auth_db_pool = _db_pool(POSTGRES_DB_AUTH)
+courses_db_pool = _db_pool(POSTGRES_DB_COURSES)
+grades_db_pool = _db_pool(POSTGRES_DB_GRADES)
+
+async def validate_token_with_auth_service(token):
+    """Validate a token, answering from the cache when possible"""
+    if LOCAL_JWT_VERIFY:
+        return validate_token_locally(token)
+
+    if not token:
+        return {
+            "valid": False,
+            "message": "Token missing"
+        }
+
+    cached = token_cache.get(token)
+    if cached is not None:
+        return cached
+
+    result = await call_auth_service(token)
+    if result.get('valid'):
+        token_cache.put(token, result, token_expiry(token))
+    return result
+
+async def call_auth_service(token):
+    """Call Auth Service via gRPC to validate token"""
+    try:
+        stub = get_aio_stub(AUTH_GRPC_HOST, auth_pb2_grpc.AuthServiceStub)
+        response = await stub.ValidateToken(auth_pb2.ValidateRequest(token=token), timeout=GRPC_CALL_TIMEOUT)
+
+        if response.status == "valid":
+            return {
+                "valid": True,
+                "user_id": response.user_id,
+                "role": response.role,
+                "username": response.username
+            }
+        else:
+            return {
+                "valid": False,
+                "message": response.message
+            }
+    except grpc.RpcError as e:
+        print(f"gRPC error calling auth service: {e}")
+        return {
+            "valid": False,
+            "message": "Auth service unavailable"
+        }
+
+class AsyncFacultyGradesServiceServicer(faculty_grades_pb2_grpc.FacultyGradesServiceServicer):
+
+    async def GetAllStudents(self, request, context):
+        """Get one page of students in username order, optionally by username prefix (Faculty only)"""
+        auth_result = await validate_token_with_auth_service(request.token)
+
+        if not auth_result.get('valid'):
+            return faculty_grades_pb2.StudentsResponse(
+                status="error",
+                message=f"Authentication failed: {auth_result.get('message', 'Invalid token')}",
+                students=[]
+            )
+
+        user_role = auth_result['role']
+
+        # Only faculty can access this
+        if user_role != 'faculty':
+            return faculty_grades_pb2.StudentsResponse(
+                status="error",
+                message=f"Access denied. Faculty only. Your role is '{user_role}'",
+                students=[]
+            )
+
+        statement, params, limit = students_page_query(request)
+        try:
+            async with auth_db_pool.connection() as conn:
+                cur = await conn.execute(statement.sql, params)
+                rows = await cur.fetchall()
+        except DB_UNAVAILABLE:
+            return faculty_grades_pb2.StudentsResponse(
+                status="error",
+                message="Database connection error",
+                students=[]
+            )
+        except Exception as e:
+            print(f"Error fetching students: {e}")
+            return faculty_grades_pb2.StudentsResponse(
+                status="error",
+                message="Internal server error",
+                students=[]
+            )
+
+        return students_page_response(rows, limit)
+
+    async def GetStudentEnrollments(self, request, context):
+        """Get all courses a student is enrolled in (Faculty only)"""
+        student_id = request.student_id
+
+        def failed(message, username=""):
+            return faculty_grades_pb2.StudentEnrollmentsResponse(
+                status="error",
+                message=message,
+                student_id=student_id if username else "",
+                student_username=username,
+                enrollments=[]
+            )
+
+        auth_result = await validate_token_with_auth_service(request.token)
+
+        if not auth_result.get('valid'):
+            return failed("Authentication failed")
+
+        user_role = auth_result['role']
+
+        # Only faculty can access this
+        if user_role != 'faculty':
+            return failed(f"Access denied. Faculty only. Your role is '{user_role}'")
+
+        try:
+            student_uuid = uuid.UUID(student_id)
+        except ValueError:
+            return failed("Student not found")
+
+        # Get student username from auth DB
+        try:
+            async with auth_db_pool.connection() as conn:
+                cur = await conn.execute("SELECT username FROM users WHERE public_id = %s;", (student_uuid,))
+                user_row = await cur.fetchone()
+        except DB_UNAVAILABLE:
+            return failed("Database connection error")
+
+        if not user_row:
+            return failed("Student not found")
+
+        student_username = user_row['username']
+
+        # Get enrollments from courses DB
+        try:
+            async with courses_db_pool.connection() as conn:
+                cur = await conn.execute("""
+                    SELECT e.course_id, c.name, e.enrollment_date
+                    FROM enrollments e
+                    JOIN courses c ON e.course_id = c.course_id
+                    WHERE e.student_public_id = %s
+                    ORDER BY e.enrollment_date DESC;
+                """, (student_uuid,))
+                rows = await cur.fetchall()
+        except DB_UNAVAILABLE:
+            return failed("Courses database connection error", student_username)
+        except Exception as e:
+            print(f"Error fetching enrollments: {e}")
+            return failed("Internal server error", student_username)
+
+        enrollments = [
+            faculty_grades_pb2.EnrollmentInfo(
+                course_id=row['course_id'],
+                course_name=row['name'],
+                enrollment_date=str(row['enrollment_date'])
+            )
+            for row in rows
+        ]
+        return faculty_grades_pb2.StudentEnrollmentsResponse(
+            status="success",
+            message="Enrollments retrieved successfully",
+            student_id=student_id,
+            student_username=student_username,
+            enrollments=enrollments
+        )
+
+    async def UploadStudentGrade(self, request, context):
+        """Upload a grade for a specific student in a specific course (Faculty only)"""
+        student_id = request.student_id
+        course_id = request.course_id
+        grade = request.grade
+
+        def failed(message):
+            return faculty_grades_pb2.UploadGradeResponse(status="error", message=message, grade_id="")
+
+        auth_result = await validate_token_with_auth_service(request.token)
+
+        if not auth_result.get('valid'):
+            return failed("Authentication failed")
+
+        faculty_id = auth_result['user_id']
+        user_role = auth_result['role']
+
+        # Only faculty can upload grades
+        if user_role != 'faculty':
+            return failed(f"Only faculty can upload grades. Your role is '{user_role}'")
+
+        try:
+            student_uuid = uuid.UUID(student_id)
+        except ValueError:
+            return failed("Student is not enrolled in this course")
+
+        # Verify student is enrolled in the course
+        try:
+            async with courses_db_pool.connection() as conn:
+                cur = await conn.execute("""
+                    SELECT 1 FROM enrollments
+                    WHERE student_public_id = %s AND course_id = %s;
+                """, (student_uuid, course_id))
+                if await cur.fetchone() is None:
+                    return failed("Student is not enrolled in this course")
+        except DB_UNAVAILABLE:
+            return failed("Database connection error")
+
+        # Insert, or update the existing grade for this student and course
+        try:
+            async with grades_db_pool.connection() as conn:
+                cur = await conn.execute("""
+                    INSERT INTO grades (grade_id, student_public_id, course_id,
+                                        grade, semester, remarks, uploaded_by_faculty_id)
+                    VALUES (%s, %s, %s, %s, %s, %s, %s)
+                    ON CONFLICT (student_public_id, course_id) DO UPDATE
+                    SET grade = EXCLUDED.grade, semester = EXCLUDED.semester,
+                        remarks = EXCLUDED.remarks,
+                        uploaded_by_faculty_id = EXCLUDED.uploaded_by_faculty_id,
+                        date_posted = CURRENT_TIMESTAMP
+                    RETURNING grade_id, (xmax = 0) AS inserted;
+                """, (uuid.uuid4(), student_uuid, course_id, grade, request.semester, request.remarks,
+                      uuid.UUID(faculty_id)))
+                row = await cur.fetchone()
+                await conn.commit()
+        except DB_UNAVAILABLE:
+            return failed("Grades database connection error")
+        except Exception as e:
+            print(f"Error uploading grade: {e}")
+            return failed("Failed to upload grade")
+
+        if row['inserted']:
+            message = f"Grade {grade} uploaded successfully for course {course_id}"
+        else:
+            message = f"Grade updated to {grade} for course {course_id}"
+        print(f"Faculty {faculty_id} uploaded grade {grade} for student {student_id} in {course_id}")
+
+        return faculty_grades_pb2.UploadGradeResponse(
+            status="success",
+            message=message,
+            grade_id=str(row['grade_id'])
+        )
+
+    async def UploadStudentGrades(self, request, context):
+        """Upload many grades at once: one enrollment query and one grades transaction (Faculty only)"""
+        def failed(message):
+            return faculty_grades_pb2.BulkUploadGradesResponse(
+                status="error",
+                message=message,
+                uploaded=0,
+                failed=len(request.grades)
+            )
+
+        auth_result = await validate_token_with_auth_service(request.token)
+
+        if not auth_result.get('valid'):
+            return failed("Authentication failed")
+
+        faculty_id = auth_result['user_id']
+        user_role = auth_result['role']
+
+        if user_role != 'faculty':
+            return failed(f"Only faculty can upload grades. Your role is '{user_role}'")
+
+        if not request.grades:
+            return failed("No grades provided")
+
+        if len(request.grades) > BULK_UPLOAD_MAX_ROWS:
+            return failed(f"Too many grades in one upload (max {BULK_UPLOAD_MAX_ROWS})")
+
+        results, pending = plan_bulk_upload(request.grades)
+
+        if not pending:
+            return bulk_upload_response(results)
+
+        # Verify every enrollment with a single set-based query
+        try:
+            async with courses_db_pool.connection() as conn:
+                cur = await conn.execute("""
+                    SELECT e.student_public_id::text, e.course_id
+                    FROM enrollments e
+                    JOIN unnest(%s::uuid[], %s::varchar[]) AS i(student_public_id, course_id)
+                      ON e.student_public_id = i.student_public_id AND e.course_id = i.course_id;
+                """, ([k[0] for k in pending], [k[1] for k in pending]))
+                enrolled = {(row['student_public_id'], row['course_id']) for row in await cur.fetchall()}
+        except DB_UNAVAILABLE:
+            return failed("Database connection error")
+        except Exception as e:
+            print(f"Error verifying enrollments: {e}")
+            return failed("Internal server error")
+
+        for key in list(pending):
+            if key not in enrolled:
+                i = pending.pop(key)
+                results[i].status = "error"
+                results[i].message = "Student is not enrolled in this course"
+
+        if not pending:
+            return bulk_upload_response(results)
+
+        rows = [
+            (key[0], key[1], request.grades[i].grade, request.grades[i].semester, request.grades[i].remarks)
+            for key, i in pending.items()
+        ]
+        columns = [list(column) for column in zip(*rows)]
+
+        try:
+            async with grades_db_pool.connection() as conn:
+                cur = await conn.execute("""
+                    INSERT INTO grades (grade_id, student_public_id, course_id,
+                                        grade, semester, remarks, uploaded_by_faculty_id)
+                    SELECT gen_grade_id, student_public_id, course_id, grade, semester, remarks, %s
+                    FROM unnest(%s::uuid[], %s::uuid[], %s::varchar[], %s::varchar[], %s::varchar[], %s::text[])
+                         AS i(gen_grade_id, student_public_id, course_id, grade, semester, remarks)
+                    ON CONFLICT (student_public_id, course_id) DO UPDATE
+                    SET grade = EXCLUDED.grade, semester = EXCLUDED.semester,
+                        remarks = EXCLUDED.remarks,
+                        uploaded_by_faculty_id = EXCLUDED.uploaded_by_faculty_id,
+                        date_posted = CURRENT_TIMESTAMP
+                    RETURNING student_public_id::text, course_id, grade_id::text, (xmax = 0) AS inserted;
+                """, [uuid.UUID(faculty_id), [str(uuid.uuid4()) for _ in rows]] + columns)
+                written = {
+                    (row['student_public_id'], row['course_id']):
+                        (row['grade_id'], "uploaded" if row['inserted'] else "updated")
+                    for row in await cur.fetchall()
+                }
+                await conn.commit()
+        except Exception as e:
+            print(f"Error uploading grades: {e}")
+            for i in pending.values():
+                results[i].status = "error"
+                results[i].message = "Failed to upload grade"
+            return bulk_upload_response(results)
+
+        for key, i in pending.items():
+            grade_id, action = written[key]
+            results[i].status = "success"
+            results[i].grade_id = grade_id
+            results[i].message = f"Grade {request.grades[i].grade} {action} for course {key[1]}"
+
+        response = bulk_upload_response(results)
+        print(f"Faculty {faculty_id} bulk uploaded {response.uploaded}/{len(results)} grades")
+        return response
+
+async def serve():
+    await open_aio_pools()
+    server = grpc.aio.server(options=GRPC_SERVER_OPTIONS, maximum_concurrent_rpcs=GRPC_MAX_CONCURRENT_RPCS)
+    faculty_grades_pb2_grpc.add_FacultyGradesServiceServicer_to_server(
+        AsyncFacultyGradesServiceServicer(), server
+    )
+    server.add_insecure_port('[::]:50055')
+    print("=" * 60)
+    print("gRPC Faculty Grades Service (Node 5, asyncio)")
+    print("Port: 50055")
+    print("=" * 60)
+    print(f"Token validation: {'local HS256' if LOCAL_JWT_VERIFY else 'auth service'} "
+          f"(cached up to {AUTH_TOKEN_CACHE_TTL:.0f}s)")
+    print("=" * 60)
+    await server.start()
+    try:
+        await server.wait_for_termination()
+    finally:
+        await close_aio_channels()
+        await close_aio_pools()
+
+if __name__ == '__main__':
+    asyncio.run(serve())
@@ -9,147 +9,188 @@ import grades_pb2_grpc
 import psycopg2
 from psycopg2.extras import DictCursor
 import os
+from common_db import PreparedStatement, get_pool, start_pool_stats_reporter
+from common_migrations import apply_migrations
+from grades_schema import SCHEMA_NAME, MIGRATIONS
+from grades_replica import GradeStore, GradeReplicator, GradesUnavailable
+from identity_directory import IdentityDirectory
+from common_grpc import GRPC_SERVER_OPTIONS, GRPC_MAX_WORKERS, GRPC_MAX_CONCURRENT_RPCS
+from common_auth import validate_token_locally
 import uuid
-from datetime import datetime, timezone
-import jwt
 
 # Configuration
 POSTGRES_DB = os.getenv('POSTGRES_DB', 'student_portal_grades')
+POSTGRES_DB_COURSES = os.getenv('POSTGRES_DB_COURSES', 'student_portal_courses')
+POSTGRES_DB_AUTH = os.getenv('POSTGRES_DB_AUTH', 'student_portal_auth')
 POSTGRES_USER = os.getenv('POSTGRES_USER', 'postgres')
 POSTGRES_PASSWORD = os.getenv('POSTGRES_PASSWORD', '1234')
 POSTGRES_HOST = os.getenv('POSTGRES_HOST', 'localhost')
 POSTGRES_PORT = os.getenv('POSTGRES_PORT', '5432')
 
-# JWT Configuration (must match auth server)
-JWT_SECRET_KEY = os.getenv('JWT_SECRET_KEY', 'super_secret_auth_key_12345')
-JWT_ALGORITHM = "HS256"
+# Read replica of the grades database (empty GRADES_REPLICA_DB: primary only)
+GRADES_REPLICA_DB = os.getenv('GRADES_REPLICA_DB', '')
+GRADES_REPLICA_USER = os.getenv('GRADES_REPLICA_USER', POSTGRES_USER)
+GRADES_REPLICA_PASSWORD = os.getenv('GRADES_REPLICA_PASSWORD', POSTGRES_PASSWORD)
+GRADES_REPLICA_HOST = os.getenv('GRADES_REPLICA_HOST', POSTGRES_HOST)
+GRADES_REPLICA_PORT = os.getenv('GRADES_REPLICA_PORT', POSTGRES_PORT)
+GRADES_REPLICA_MAX_STALENESS = float(os.getenv('GRADES_REPLICA_MAX_STALENESS', '300'))  # seconds
+GRADES_PRIMARY_READ_TIMEOUT_MS = int(os.getenv('GRADES_PRIMARY_READ_TIMEOUT_MS', '1000'))  # slower = failed over
+GRADES_PRIMARY_RETRY_INTERVAL = float(os.getenv('GRADES_PRIMARY_RETRY_INTERVAL', '5'))  # seconds on the replica
+GRADES_REPLICATION_INTERVAL = float(os.getenv('GRADES_REPLICATION_INTERVAL', '1'))  # seconds between passes
+GRADES_EXPORT_BATCH_SIZE = int(os.getenv('GRADES_EXPORT_BATCH_SIZE', '1000'))  # rows per StreamCourseGrades message
+
+# Student names for course rosters, cached per public_id
+IDENTITY_CACHE_SIZE = int(os.getenv('IDENTITY_CACHE_SIZE', '50000'))
+IDENTITY_CACHE_TTL = float(os.getenv('IDENTITY_CACHE_TTL', '600'))
+
+# One pooled DB connection per gRPC worker thread
+MAX_WORKERS = GRPC_MAX_WORKERS
+
+db_pool = get_pool(
+    POSTGRES_DB,
+    user=POSTGRES_USER,
+    password=POSTGRES_PASSWORD,
+    host=POSTGRES_HOST,
+    port=POSTGRES_PORT,
+    max_size=MAX_WORKERS
+)
+
+replica_db_pool = get_pool(
+    GRADES_REPLICA_DB,
+    user=GRADES_REPLICA_USER,
+    password=GRADES_REPLICA_PASSWORD,
+    host=GRADES_REPLICA_HOST,
+    port=GRADES_REPLICA_PORT,
+    max_size=MAX_WORKERS
+) if GRADES_REPLICA_DB else None
+
+# Grade reads go through the store; writes always use the primary pool
+grade_store = GradeStore(
+    db_pool,
+    replica_db_pool,
+    max_staleness=GRADES_REPLICA_MAX_STALENESS,
+    retry_interval=GRADES_PRIMARY_RETRY_INTERVAL,
+    primary_timeout_ms=GRADES_PRIMARY_READ_TIMEOUT_MS
+)
+
+# Enrollments live in the courses database
+courses_db_pool = get_pool(
+    POSTGRES_DB_COURSES,
+    user=POSTGRES_USER,
+    password=POSTGRES_PASSWORD,
+    host=POSTGRES_HOST,
+    port=POSTGRES_PORT,
+    max_size=MAX_WORKERS
+)
+
+# Usernames live in the auth database
+auth_db_pool = get_pool(
+    POSTGRES_DB_AUTH,
+    user=POSTGRES_USER,
+    password=POSTGRES_PASSWORD,
+    host=POSTGRES_HOST,
+    port=POSTGRES_PORT,
+    max_size=MAX_WORKERS
+)
+
+identity_directory = IdentityDirectory(max_size=IDENTITY_CACHE_SIZE, ttl=IDENTITY_CACHE_TTL)
 
 def get_db_connection():
-    try:
-        conn = psycopg2.connect(
-            dbname=POSTGRES_DB,
-            user=POSTGRES_USER,
-            password=POSTGRES_PASSWORD,
-            host=POSTGRES_HOST,
-            port=POSTGRES_PORT
-        )
-        return conn
-    except psycopg2.OperationalError as e:
-        print(f"Database connection failed: {e}")
-        return None
+    """Check a connection out of the shared pool (None if the DB is unavailable)"""
+    return db_pool.getconn()
 
-def validate_token_locally(token):
-    """Validate JWT token locally without calling auth service"""
-    if not token:
-        return {
-            "valid": False,
-            "message": "Token missing"
-        }
-    
-    try:
-        # Decode and verify the JWT token
-        payload = jwt.decode(token, JWT_SECRET_KEY, algorithms=[JWT_ALGORITHM])
-        
-        # Check if token has expired (jwt.decode already does this, but being explicit)
-        exp_timestamp = payload.get('exp')
-        if exp_timestamp:
-            exp_datetime = datetime.fromtimestamp(exp_timestamp, tz=timezone.utc)
-            if datetime.now(timezone.utc) > exp_datetime:
-                return {
-                    "valid": False,
-                    "message": "Token expired"
-                }
-        
-        return {
-            "valid": True,
-            "user_id": payload.get('public_id'),
-            "role": payload.get('role'),
-            "username": payload.get('username')
-        }
-    
-    except jwt.ExpiredSignatureError:
-        print(f"✗ Token validation failed: Token expired")
-        return {
-            "valid": False,
-            "message": "Token expired"
-        }
-    except jwt.InvalidTokenError as e:
-        print(f"✗ Token validation failed: Invalid token - {e}")
-        return {
-            "valid": False,
-            "message": "Invalid token"
-        }
-    except Exception as e:
-        print(f"✗ Token validation error: {e}")
-        return {
-            "valid": False,
-            "message": "Token validation error"
-        }
+def release_db_connection(conn):
+    """Return a connection obtained from get_db_connection() to the pool"""
+    db_pool.putconn(conn)
+
+# Hot queries, prepared once per pooled connection
+SELECT_ENROLLMENTS = PreparedStatement('grades_select_enrollments', """
+    SELECT e.course_id, c.name, e.enrollment_date
+    FROM enrollments e
+    JOIN courses c ON e.course_id = c.course_id
+    WHERE e.student_public_id = %s
+    ORDER BY e.enrollment_date DESC;
+""")
+SELECT_LATEST_GRADES = PreparedStatement('grades_select_latest_grades', """
+    SELECT DISTINCT ON (course_id)
+        course_id, grade, semester, date_posted, remarks
+    FROM grades
+    WHERE student_public_id = %s AND course_id = ANY(%s)
+    ORDER BY course_id, date_posted DESC;
+""")
+SELECT_STUDENT_GRADES = PreparedStatement('grades_select_student_grades', """
+    SELECT
+        g.grade_id,
+        g.course_id,
+        g.course_id as course_name,
+        g.grade,
+        g.semester,
+        g.date_posted,
+        g.remarks
+    FROM grades g
+    WHERE g.student_public_id = %s
+    ORDER BY g.date_posted DESC;
+""")
+UPSERT_GRADE = PreparedStatement('grades_upsert_grade', """
+    INSERT INTO grades (grade_id, student_public_id, course_id,
+                      grade, semester, remarks, uploaded_by_faculty_id)
+    VALUES (%s, %s, %s, %s, %s, %s, %s)
+    ON CONFLICT (student_public_id, course_id) DO UPDATE
+    SET grade = EXCLUDED.grade, semester = EXCLUDED.semester,
+        remarks = EXCLUDED.remarks,
+        uploaded_by_faculty_id = EXCLUDED.uploaded_by_faculty_id,
+        date_posted = CURRENT_TIMESTAMP
+    RETURNING grade_id;
+""")
+SELECT_COURSE_GRADES = PreparedStatement('grades_select_course_grades', """
+    SELECT
+        student_public_id,
+        grade,
+        date_posted
+    FROM grades
+    WHERE course_id = %s
+    ORDER BY date_posted DESC;
+""")
+
+def read_message(message, replica_lag):
+    """Response message, noting reads the replica served"""
+    if replica_lag is None:
+        return message
+    return f"{message} (from replica, up to {replica_lag:.0f}s old)"
+
+def start_replicator():
+    """Start copying grades to the replica in the background (None without a replica)"""
+    if not GRADES_REPLICA_DB:
+        return None
+    replicator = GradeReplicator(
+        dict(dbname=POSTGRES_DB, user=POSTGRES_USER, password=POSTGRES_PASSWORD,
+             host=POSTGRES_HOST, port=POSTGRES_PORT),
+        dict(dbname=GRADES_REPLICA_DB, user=GRADES_REPLICA_USER, password=GRADES_REPLICA_PASSWORD,
+             host=GRADES_REPLICA_HOST, port=GRADES_REPLICA_PORT),
+        interval=GRADES_REPLICATION_INTERVAL,
+        statement_timeout_ms=GRADES_PRIMARY_READ_TIMEOUT_MS
+    )
+    replicator.start()
+    print(f"✓ Replicating grades to {GRADES_REPLICA_DB} every {GRADES_REPLICATION_INTERVAL:g}s")
+    return replicator
 
 def init_db():
-    """Initialize grades database"""
-    conn = get_db_connection()
-    if conn is None:
-        print("Cannot initialize DB without a connection.")
-        return
+    """Apply pending grades schema migrations (seed data: manage_db.py seed)"""
+    for name, pool in ((POSTGRES_DB, db_pool), (GRADES_REPLICA_DB, replica_db_pool)):
+        if pool is None:
+            continue
+        conn = pool.getconn()
+        if conn is None:
+            print(f"Cannot initialize {name} without a connection.")
+            continue
 
-    try:
-        with conn.cursor() as cur:
-            # Create grades table
-            cur.execute("""
-                CREATE TABLE IF NOT EXISTS grades (
-                    grade_id UUID PRIMARY KEY,
-                    student_public_id UUID NOT NULL,
-                    course_id VARCHAR(20) NOT NULL,
-                    grade VARCHAR(5) NOT NULL,
-                    semester VARCHAR(20) NOT NULL,
-                    date_posted TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    remarks TEXT,
-                    uploaded_by_faculty_id UUID NOT NULL
-                );
-            """)
-            
-            # Create index for faster lookups
-            cur.execute("""
-                CREATE INDEX IF NOT EXISTS idx_student_grades 
-                ON grades(student_public_id);
-            """)
-            
-            cur.execute("""
-                CREATE INDEX IF NOT EXISTS idx_course_grades 
-                ON grades(course_id);
-            """)
-            
-            # Insert sample grades if table is empty
-            cur.execute("SELECT COUNT(*) FROM grades;")
-            if cur.fetchone()[0] == 0:
-                # You'll need actual student UUIDs from your auth database
-                # For now, using placeholder UUIDs
-                sample_grades = [
-                    (str(uuid.uuid4()), '00000000-0000-0000-0000-000000000001', 
-                     'CS101', 'A', 'Fall 2023', 'Excellent work', 
-                     '00000000-0000-0000-0000-000000000002'),
-                    (str(uuid.uuid4()), '00000000-0000-0000-0000-000000000001', 
-                     'MATH203', 'B+', 'Fall 2023', 'Good performance', 
-                     '00000000-0000-0000-0000-000000000002'),
-                    (str(uuid.uuid4()), '00000000-0000-0000-0000-000000000001', 
-                     'ENG100', 'A-', 'Spring 2024', 'Strong essays', 
-                     '00000000-0000-0000-0000-000000000002'),
-                ]
-                cur.executemany("""
-                    INSERT INTO grades (grade_id, student_public_id, course_id, 
-                                      grade, semester, remarks, uploaded_by_faculty_id) 
-                    VALUES (%s, %s, %s, %s, %s, %s, %s);
-                """, sample_grades)
-                print("Sample grades inserted.")
-        
-        conn.commit()
-        print("Grades database initialized successfully.")
-    except Exception as e:
-        print(f"Error initializing database: {e}")
-        conn.rollback()
-    finally:
-        conn.close()
+        try:
+            apply_migrations(conn, SCHEMA_NAME, MIGRATIONS)
+            print(f"Grades database {name} schema is up to date.")
+        except Exception as e:
+            print(f"Error initializing database {name}: {e}")
+        finally:
+            pool.putconn(conn)
 
 class GradesServiceServicer(grades_pb2_grpc.GradesServiceServicer):
     
@@ -181,19 +222,10 @@ class GradesServiceServicer(grades_pb2_grpc.GradesServiceServicer):
                 student_name=""
             )
         
-        # Need to connect to BOTH databases: courses and grades
-        # First, get enrollments from courses database
-        courses_conn = psycopg2.connect(
-            dbname='student_portal_courses',
-            user=POSTGRES_USER,
-            password=POSTGRES_PASSWORD,
-            host=POSTGRES_HOST,
-            port=POSTGRES_PORT
-        )
-        
-        grades_conn = get_db_connection()
+        # Enrollments come from the courses database, grades from the grade store
+        courses_conn = courses_db_pool.getconn()
         
-        if not courses_conn or not grades_conn:
+        if not courses_conn:
             return grades_pb2.EnrolledCoursesWithGradesResponse(
                 status="error",
                 message="Database connection error",
@@ -206,64 +238,66 @@ class GradesServiceServicer(grades_pb2_grpc.GradesServiceServicer):
             
             # Get enrolled courses
             with courses_conn.cursor(cursor_factory=DictCursor) as cur:
-                cur.execute("""
-                    SELECT e.course_id, c.name, e.enrollment_date
-                    FROM enrollments e
-                    JOIN courses c ON e.course_id = c.course_id
-                    WHERE e.student_public_id = %s
-                    ORDER BY e.enrollment_date DESC;
-                """, (user_id,))
+                SELECT_ENROLLMENTS.execute(cur, (user_id,))
                 enrollments = cur.fetchall()
             
-            # For each enrollment, check if grade exists
-            with grades_conn.cursor(cursor_factory=DictCursor) as cur:
-                for enrollment in enrollments:
-                    course_id = enrollment['course_id']
-                    
-                    # Check if grade exists for this course and student
-                    cur.execute("""
-                        SELECT grade, semester, date_posted, remarks
-                        FROM grades
-                        WHERE student_public_id = %s AND course_id = %s;
-                    """, (user_id, course_id))
-                    
-                    grade_row = cur.fetchone()
-                    
-                    if grade_row:
-                        # Grade has been released
-                        course_grade = grades_pb2.CourseGradeInfo(
-                            course_id=course_id,
-                            course_name=enrollment['name'],
-                            enrollment_date=str(enrollment['enrollment_date']),
-                            grade_released=True,
-                            grade=grade_row['grade'],
-                            semester=grade_row['semester'],
-                            date_posted=str(grade_row['date_posted']),
-                            remarks=grade_row['remarks'] or ""
-                        )
-                    else:
-                        # Grade not yet released
-                        course_grade = grades_pb2.CourseGradeInfo(
-                            course_id=course_id,
-                            course_name=enrollment['name'],
-                            enrollment_date=str(enrollment['enrollment_date']),
-                            grade_released=False,
-                            grade="",
-                            semester="",
-                            date_posted="",
-                            remarks=""
-                        )
-                    
-                    course_grades_list.append(course_grade)
+            # Fetch every grade for those courses in one query, keyed by course_id
+            # (latest posting wins if a course was graded more than once)
+            grades_by_course = {}
+            replica_lag = None
+            if enrollments:
+                def latest_grades(cur):
+                    SELECT_LATEST_GRADES.execute(cur, (user_id, [e['course_id'] for e in enrollments]))
+                    return {row['course_id']: row for row in cur.fetchall()}
+                grades_by_course, replica_lag = grade_store.read(latest_grades)
+            
+            for enrollment in enrollments:
+                course_id = enrollment['course_id']
+                grade_row = grades_by_course.get(course_id)
+                
+                if grade_row:
+                    # Grade has been released
+                    course_grade = grades_pb2.CourseGradeInfo(
+                        course_id=course_id,
+                        course_name=enrollment['name'],
+                        enrollment_date=str(enrollment['enrollment_date']),
+                        grade_released=True,
+                        grade=grade_row['grade'],
+                        semester=grade_row['semester'],
+                        date_posted=str(grade_row['date_posted']),
+                        remarks=grade_row['remarks'] or ""
+                    )
+                else:
+                    # Grade not yet released
+                    course_grade = grades_pb2.CourseGradeInfo(
+                        course_id=course_id,
+                        course_name=enrollment['name'],
+                        enrollment_date=str(enrollment['enrollment_date']),
+                        grade_released=False,
+                        grade="",
+                        semester="",
+                        date_posted="",
+                        remarks=""
+                    )
+                
+                course_grades_list.append(course_grade)
             
             print(f"✓ Retrieved enrolled courses with grades for user {user_id}")
             return grades_pb2.EnrolledCoursesWithGradesResponse(
                 status="success",
-                message="Enrolled courses with grades retrieved",
+                message=read_message("Enrolled courses with grades retrieved", replica_lag),
                 courses=course_grades_list,
                 student_name=username
             )
         
+        except GradesUnavailable as e:
+            print(f"✗ Error fetching enrolled courses with grades: {e}")
+            return grades_pb2.EnrolledCoursesWithGradesResponse(
+                status="error",
+                message=str(e),
+                courses=[],
+                student_name=""
+            )
         except Exception as e:
             print(f"✗ Error fetching enrolled courses with grades: {e}")
             return grades_pb2.EnrolledCoursesWithGradesResponse(
@@ -273,10 +307,7 @@ class GradesServiceServicer(grades_pb2_grpc.GradesServiceServicer):
                 student_name=""
             )
         finally:
-            if courses_conn:
-                courses_conn.close()
-            if grades_conn:
-                grades_conn.close()
+            courses_db_pool.putconn(courses_conn)
     
     def GetStudentGrades(self, request, context):
         """Get all grades for a student"""
@@ -306,57 +337,45 @@ class GradesServiceServicer(grades_pb2_grpc.GradesServiceServicer):
                 student_name=""
             )
         
-        conn = get_db_connection()
-        if conn is None:
+        def student_grades(cur):
+            # Get grades with course names from course database
+            # Note: This assumes courses table exists. You might need to join
+            # across databases or store course names in grades table
+            SELECT_STUDENT_GRADES.execute(cur, (user_id,))
+            return cur.fetchall()
+        
+        try:
+            rows, replica_lag = grade_store.read(student_grades)
+            
+            grades = []
+            for row in rows:
+                grade_info = grades_pb2.GradeInfo(
+                    grade_id=str(row['grade_id']),
+                    course_id=row['course_id'],
+                    course_name=row['course_name'],
+                    grade=row['grade'],
+                    semester=row['semester'],
+                    date_posted=str(row['date_posted']),
+                    remarks=row['remarks'] or ""
+                )
+                grades.append(grade_info)
+            
+            print(f"✓ Retrieved {len(grades)} grades for user {user_id}")
+            return grades_pb2.GradesResponse(
+                status="success",
+                message=read_message("Grades retrieved successfully", replica_lag),
+                grades=grades,
+                student_name=username
+            )
+        
+        except GradesUnavailable as e:
+            print(f"✗ Error fetching grades: {e}")
             return grades_pb2.GradesResponse(
                 status="error",
-                message="Database connection error",
+                message=str(e),
                 grades=[],
                 student_name=""
             )
-        
-        try:
-            with conn.cursor(cursor_factory=DictCursor) as cur:
-                # Get grades with course names from course database
-                # Note: This assumes courses table exists. You might need to join
-                # across databases or store course names in grades table
-                cur.execute("""
-                    SELECT 
-                        g.grade_id,
-                        g.course_id,
-                        g.course_id as course_name,
-                        g.grade,
-                        g.semester,
-                        g.date_posted,
-                        g.remarks
-                    FROM grades g
-                    WHERE g.student_public_id = %s
-                    ORDER BY g.date_posted DESC;
-                """, (user_id,))
-                
-                rows = cur.fetchall()
-                
-                grades = []
-                for row in rows:
-                    grade_info = grades_pb2.GradeInfo(
-                        grade_id=str(row['grade_id']),
-                        course_id=row['course_id'],
-                        course_name=row['course_name'],
-                        grade=row['grade'],
-                        semester=row['semester'],
-                        date_posted=str(row['date_posted']),
-                        remarks=row['remarks'] or ""
-                    )
-                    grades.append(grade_info)
-                
-                print(f"✓ Retrieved {len(grades)} grades for user {user_id}")
-                return grades_pb2.GradesResponse(
-                    status="success",
-                    message="Grades retrieved successfully",
-                    grades=grades,
-                    student_name=username
-                )
-        
         except Exception as e:
             print(f"✗ Error fetching grades: {e}")
             return grades_pb2.GradesResponse(
@@ -365,8 +384,6 @@ class GradesServiceServicer(grades_pb2_grpc.GradesServiceServicer):
                 grades=[],
                 student_name=""
             )
-        finally:
-            conn.close()
     
     def UploadGrade(self, request, context):
         """Faculty uploads a grade for a student"""
@@ -410,11 +427,8 @@ class GradesServiceServicer(grades_pb2_grpc.GradesServiceServicer):
             grade_id = str(uuid.uuid4())
             
             with conn.cursor() as cur:
-                cur.execute("""
-                    INSERT INTO grades (grade_id, student_public_id, course_id, 
-                                      grade, semester, remarks, uploaded_by_faculty_id)
-                    VALUES (%s, %s, %s, %s, %s, %s, %s);
-                """, (grade_id, student_id, course_id, grade, semester, remarks, faculty_id))
+                UPSERT_GRADE.execute(cur, (grade_id, student_id, course_id, grade, semester, remarks, faculty_id))
+                grade_id = str(cur.fetchone()[0])
             
             conn.commit()
             print(f"✓ Grade uploaded: {grade} for student {student_id} in {course_id}")
@@ -434,7 +448,7 @@ class GradesServiceServicer(grades_pb2_grpc.GradesServiceServicer):
                 grade_id=""
             )
         finally:
-            conn.close()
+            release_db_connection(conn)
     
     def GetCourseGrades(self, request, context):
         """Faculty views all grades for a specific course"""
@@ -465,49 +479,42 @@ class GradesServiceServicer(grades_pb2_grpc.GradesServiceServicer):
                 student_grades=[]
             )
         
-        conn = get_db_connection()
-        if conn is None:
+        def course_grades(cur):
+            SELECT_COURSE_GRADES.execute(cur, (course_id,))
+            return cur.fetchall()
+        
+        try:
+            rows, replica_lag = grade_store.read(course_grades)
+            names = identity_directory.resolve(auth_db_pool, [str(row['student_public_id']) for row in rows])
+            
+            student_grades = []
+            for row in rows:
+                student_grade = grades_pb2.StudentGradeInfo(
+                    student_id=str(row['student_public_id']),
+                    student_name=names.get(str(row['student_public_id'])) or "",
+                    grade=row['grade'],
+                    date_posted=str(row['date_posted'])
+                )
+                student_grades.append(student_grade)
+            
+            print(f"✓ Retrieved {len(student_grades)} grades for course {course_id}")
+            return grades_pb2.CourseGradesResponse(
+                status="success",
+                message=read_message("Course grades retrieved", replica_lag),
+                course_id=course_id,
+                course_name=course_id,  # Would fetch actual name
+                student_grades=student_grades
+            )
+        
+        except GradesUnavailable as e:
+            print(f"✗ Error fetching course grades: {e}")
             return grades_pb2.CourseGradesResponse(
                 status="error",
-                message="Database connection error",
+                message=str(e),
                 course_id="",
                 course_name="",
                 student_grades=[]
             )
-        
-        try:
-            with conn.cursor(cursor_factory=DictCursor) as cur:
-                cur.execute("""
-                    SELECT 
-                        student_public_id,
-                        grade,
-                        date_posted
-                    FROM grades
-                    WHERE course_id = %s
-                    ORDER BY date_posted DESC;
-                """, (course_id,))
-                
-                rows = cur.fetchall()
-                
-                student_grades = []
-                for row in rows:
-                    student_grade = grades_pb2.StudentGradeInfo(
-                        student_id=str(row['student_public_id']),
-                        student_name="Student",  # Would need to fetch from auth DB
-                        grade=row['grade'],
-                        date_posted=str(row['date_posted'])
-                    )
-                    student_grades.append(student_grade)
-                
-                print(f"✓ Retrieved {len(student_grades)} grades for course {course_id}")
-                return grades_pb2.CourseGradesResponse(
-                    status="success",
-                    message="Course grades retrieved",
-                    course_id=course_id,
-                    course_name=course_id,  # Would fetch actual name
-                    student_grades=student_grades
-                )
-        
         except Exception as e:
             print(f"✗ Error fetching course grades: {e}")
             return grades_pb2.CourseGradesResponse(
@@ -517,12 +524,87 @@ class GradesServiceServicer(grades_pb2_grpc.GradesServiceServicer):
                 course_name="",
                 student_grades=[]
             )
+
+    def StreamCourseGrades(self, request, context):
+        """Faculty export of a course's grades, paged through a server-side cursor"""
+        token = request.token
+        course_id = request.course_id
+        
+        # Use local JWT validation
+        auth_result = validate_token_locally(token)
+        
+        if not auth_result.get('valid'):
+            yield grades_pb2.CourseGradesBatch(status="error", message="Authentication failed")
+            return
+        
+        user_role = auth_result['role']
+        
+        # Only faculty can export course grades
+        if user_role != 'faculty':
+            yield grades_pb2.CourseGradesBatch(
+                status="error",
+                message=f"Only faculty can view course grades. Your role is '{user_role}'"
+            )
+            return
+        
+        conn = get_db_connection()
+        if conn is None:
+            yield grades_pb2.CourseGradesBatch(status="error", message="Database connection error")
+            return
+        
+        sent = 0
+        batches = 0
+        try:
+            # A named cursor keeps the result set in Postgres; each FETCH brings one batch
+            with conn.cursor(name=f"course_grades_export_{uuid.uuid4().hex}", cursor_factory=DictCursor) as cur:
+                cur.execute(SELECT_COURSE_GRADES.sql, (course_id,))
+                while True:
+                    rows = cur.fetchmany(GRADES_EXPORT_BATCH_SIZE)
+                    if not rows and batches:
+                        break
+                    names = identity_directory.resolve(auth_db_pool, [str(row['student_public_id']) for row in rows])
+                    # The first batch always goes out, even when empty. Yield blocks while
+                    # the client is behind (flow control), so memory stays at one batch.
+                    yield grades_pb2.CourseGradesBatch(
+                        status="success",
+                        message="Course grades batch",
+                        student_grades=[
+                            grades_pb2.StudentGradeInfo(
+                                student_id=str(row['student_public_id']),
+                                student_name=names.get(str(row['student_public_id'])) or "",
+                                grade=row['grade'],
+                                date_posted=str(row['date_posted'])
+                            )
+                            for row in rows
+                        ]
+                    )
+                    sent += len(rows)
+                    batches += 1
+                    if len(rows) < GRADES_EXPORT_BATCH_SIZE or not context.is_active():
+                        break
+            conn.commit()
+            print(f"✓ Streamed {sent} grades for course {course_id} in {batches} batch(es)")
+        
+        except Exception as e:
+            print(f"✗ Error streaming course grades: {e}")
+            yield grades_pb2.CourseGradesBatch(status="error", message="Internal server error")
         finally:
-            conn.close()
+            release_db_connection(conn)
 
 def serve():
     init_db()
-    server = grpc.server(futures.ThreadPoolExecutor(max_workers=10))
+    db_pool.warm()
+    courses_db_pool.warm()
+    auth_db_pool.warm()
+    if replica_db_pool is not None:
+        replica_db_pool.warm()
+    start_replicator()
+    start_pool_stats_reporter()
+    server = grpc.server(
+        futures.ThreadPoolExecutor(max_workers=MAX_WORKERS),
+        options=GRPC_SERVER_OPTIONS,
+        maximum_concurrent_rpcs=GRPC_MAX_CONCURRENT_RPCS
+    )
     grades_pb2_grpc.add_GradesServiceServicer_to_server(GradesServiceServicer(), server)
     server.add_insecure_port('[::]:50054')
     print("=" * 70)
@@ -0,0 +1,489 @@
+import grpc
+import sys
+sys.path.append('./generated')
+
+import grades_pb2
+import grades_pb2_grpc
+
+import asyncio
+import uuid
+from common_db_aio import DB_UNAVAILABLE, get_aio_pool, open_aio_pools, close_aio_pools
+from common_grpc import GRPC_SERVER_OPTIONS, GRPC_MAX_CONCURRENT_RPCS
+from common_auth import validate_token_locally
+from grpc_grades_server import (
+    POSTGRES_DB, POSTGRES_DB_COURSES, POSTGRES_DB_AUTH, POSTGRES_USER, POSTGRES_PASSWORD, POSTGRES_HOST,
+    POSTGRES_PORT, GRADES_EXPORT_BATCH_SIZE, identity_directory, init_db
+)
+
+# grpc.aio version of grpc_grades_server.py: same RPCs and SQL, async pools
+
+db_pool = get_aio_pool(
+    POSTGRES_DB,
+    user=POSTGRES_USER,
+    password=POSTGRES_PASSWORD,
+    host=POSTGRES_HOST,
+    port=POSTGRES_PORT
+)
+
+# Enrollments live in the courses database
+courses_db_pool = get_aio_pool(
+    POSTGRES_DB_COURSES,
+    user=POSTGRES_USER,
+    password=POSTGRES_PASSWORD,
+    host=POSTGRES_HOST,
+    port=POSTGRES_PORT
+)
+
+# Usernames live in the auth database
+auth_db_pool = get_aio_pool(
+    POSTGRES_DB_AUTH,
+    user=POSTGRES_USER,
+    password=POSTGRES_PASSWORD,
+    host=POSTGRES_HOST,
+    port=POSTGRES_PORT
+)
+
+async def resolve_names(public_ids):
+    """{public_id: username} through the shared identity directory cache (see identity_directory)"""
+    names, missing = identity_directory.cached(public_ids)
+    if not missing:
+        return names
+    try:
+        async with auth_db_pool.connection() as conn:
+            cur = await conn.execute(
+                "SELECT public_id::text, username FROM users WHERE public_id = ANY(%s::uuid[]);",
+                (missing,)
+            )
+            usernames = {row['public_id']: row['username'] for row in await cur.fetchall()}
+    except Exception as e:
+        print(f"✗ Error resolving student names: {e}")
+        return names
+    identity_directory.remember(missing, usernames)
+    names.update((public_id, usernames.get(public_id)) for public_id in missing)
+    return names
+
+class AsyncGradesServiceServicer(grades_pb2_grpc.GradesServiceServicer):
+
+    async def GetEnrolledCoursesWithGrades(self, request, context):
+        """Get all enrolled courses with their grades (or 'Not Released' status)"""
+        token = request.token
+
+        # Use local JWT validation instead of calling auth service
+        auth_result = validate_token_locally(token)
+
+        if not auth_result.get('valid'):
+            return grades_pb2.EnrolledCoursesWithGradesResponse(
+                status="error",
+                message=f"Authentication failed: {auth_result.get('message', 'Invalid token')}",
+                courses=[],
+                student_name=""
+            )
+
+        user_id = auth_result['user_id']
+        username = auth_result['username']
+        user_role = auth_result['role']
+
+        # Students can only view their own grades
+        if user_role != 'student':
+            return grades_pb2.EnrolledCoursesWithGradesResponse(
+                status="error",
+                message=f"Only students can view grades. Your role is '{user_role}'",
+                courses=[],
+                student_name=""
+            )
+
+        student_id = uuid.UUID(user_id)
+        try:
+            # Get enrolled courses
+            async with courses_db_pool.connection() as conn:
+                cur = await conn.execute("""
+                    SELECT e.course_id, c.name, e.enrollment_date
+                    FROM enrollments e
+                    JOIN courses c ON e.course_id = c.course_id
+                    WHERE e.student_public_id = %s
+                    ORDER BY e.enrollment_date DESC;
+                """, (student_id,))
+                enrollments = await cur.fetchall()
+
+            # Fetch every grade for those courses in one query, keyed by course_id
+            grades_by_course = {}
+            if enrollments:
+                async with db_pool.connection() as conn:
+                    cur = await conn.execute("""
+                        SELECT DISTINCT ON (course_id)
+                            course_id, grade, semester, date_posted, remarks
+                        FROM grades
+                        WHERE student_public_id = %s AND course_id = ANY(%s)
+                        ORDER BY course_id, date_posted DESC;
+                    """, (student_id, [e['course_id'] for e in enrollments]))
+                    grades_by_course = {row['course_id']: row for row in await cur.fetchall()}
+        except DB_UNAVAILABLE:
+            return grades_pb2.EnrolledCoursesWithGradesResponse(
+                status="error",
+                message="Database connection error",
+                courses=[],
+                student_name=""
+            )
+        except Exception as e:
+            print(f"✗ Error fetching enrolled courses with grades: {e}")
+            return grades_pb2.EnrolledCoursesWithGradesResponse(
+                status="error",
+                message=f"Internal server error: {str(e)}",
+                courses=[],
+                student_name=""
+            )
+
+        course_grades_list = []
+        for enrollment in enrollments:
+            course_id = enrollment['course_id']
+            grade_row = grades_by_course.get(course_id)
+
+            if grade_row:
+                # Grade has been released
+                course_grade = grades_pb2.CourseGradeInfo(
+                    course_id=course_id,
+                    course_name=enrollment['name'],
+                    enrollment_date=str(enrollment['enrollment_date']),
+                    grade_released=True,
+                    grade=grade_row['grade'],
+                    semester=grade_row['semester'],
+                    date_posted=str(grade_row['date_posted']),
+                    remarks=grade_row['remarks'] or ""
+                )
+            else:
+                # Grade not yet released
+                course_grade = grades_pb2.CourseGradeInfo(
+                    course_id=course_id,
+                    course_name=enrollment['name'],
+                    enrollment_date=str(enrollment['enrollment_date']),
+                    grade_released=False,
+                    grade="",
+                    semester="",
+                    date_posted="",
+                    remarks=""
+                )
+
+            course_grades_list.append(course_grade)
+
+        print(f"✓ Retrieved enrolled courses with grades for user {user_id}")
+        return grades_pb2.EnrolledCoursesWithGradesResponse(
+            status="success",
+            message="Enrolled courses with grades retrieved",
+            courses=course_grades_list,
+            student_name=username
+        )
+
+    async def GetStudentGrades(self, request, context):
+        """Get all grades for a student"""
+        token = request.token
+
+        # Use local JWT validation
+        auth_result = validate_token_locally(token)
+
+        if not auth_result.get('valid'):
+            return grades_pb2.GradesResponse(
+                status="error",
+                message=f"Authentication failed: {auth_result.get('message', 'Invalid token')}",
+                grades=[],
+                student_name=""
+            )
+
+        user_id = auth_result['user_id']
+        username = auth_result['username']
+        user_role = auth_result['role']
+
+        # Students can only view their own grades
+        if user_role != 'student':
+            return grades_pb2.GradesResponse(
+                status="error",
+                message=f"Only students can view grades. Your role is '{user_role}'",
+                grades=[],
+                student_name=""
+            )
+
+        try:
+            async with db_pool.connection() as conn:
+                cur = await conn.execute("""
+                    SELECT
+                        g.grade_id,
+                        g.course_id,
+                        g.course_id as course_name,
+                        g.grade,
+                        g.semester,
+                        g.date_posted,
+                        g.remarks
+                    FROM grades g
+                    WHERE g.student_public_id = %s
+                    ORDER BY g.date_posted DESC;
+                """, (uuid.UUID(user_id),))
+                rows = await cur.fetchall()
+        except DB_UNAVAILABLE:
+            return grades_pb2.GradesResponse(
+                status="error",
+                message="Database connection error",
+                grades=[],
+                student_name=""
+            )
+        except Exception as e:
+            print(f"✗ Error fetching grades: {e}")
+            return grades_pb2.GradesResponse(
+                status="error",
+                message="Internal server error",
+                grades=[],
+                student_name=""
+            )
+
+        grades = []
+        for row in rows:
+            grades.append(grades_pb2.GradeInfo(
+                grade_id=str(row['grade_id']),
+                course_id=row['course_id'],
+                course_name=row['course_name'],
+                grade=row['grade'],
+                semester=row['semester'],
+                date_posted=str(row['date_posted']),
+                remarks=row['remarks'] or ""
+            ))
+
+        print(f"✓ Retrieved {len(grades)} grades for user {user_id}")
+        return grades_pb2.GradesResponse(
+            status="success",
+            message="Grades retrieved successfully",
+            grades=grades,
+            student_name=username
+        )
+
+    async def UploadGrade(self, request, context):
+        """Faculty uploads a grade for a student"""
+        token = request.token
+        student_id = request.student_id
+        course_id = request.course_id
+        grade = request.grade
+        semester = request.semester
+        remarks = request.remarks
+
+        # Use local JWT validation
+        auth_result = validate_token_locally(token)
+
+        if not auth_result.get('valid'):
+            return grades_pb2.UploadGradeResponse(
+                status="error",
+                message="Authentication failed",
+                grade_id=""
+            )
+
+        faculty_id = auth_result['user_id']
+        user_role = auth_result['role']
+
+        # Only faculty can upload grades
+        if user_role != 'faculty':
+            return grades_pb2.UploadGradeResponse(
+                status="error",
+                message=f"Only faculty can upload grades. Your role is '{user_role}'",
+                grade_id=""
+            )
+
+        try:
+            async with db_pool.connection() as conn:
+                cur = await conn.execute("""
+                    INSERT INTO grades (grade_id, student_public_id, course_id,
+                                      grade, semester, remarks, uploaded_by_faculty_id)
+                    VALUES (%s, %s, %s, %s, %s, %s, %s)
+                    ON CONFLICT (student_public_id, course_id) DO UPDATE
+                    SET grade = EXCLUDED.grade, semester = EXCLUDED.semester,
+                        remarks = EXCLUDED.remarks,
+                        uploaded_by_faculty_id = EXCLUDED.uploaded_by_faculty_id,
+                        date_posted = CURRENT_TIMESTAMP
+                    RETURNING grade_id;
+                """, (uuid.uuid4(), uuid.UUID(student_id), course_id, grade, semester, remarks,
+                      uuid.UUID(faculty_id)))
+                grade_id = str((await cur.fetchone())['grade_id'])
+                await conn.commit()
+            print(f"✓ Grade uploaded: {grade} for student {student_id} in {course_id}")
+
+            return grades_pb2.UploadGradeResponse(
+                status="success",
+                message=f"Grade {grade} uploaded successfully for {course_id}",
+                grade_id=grade_id
+            )
+
+        except DB_UNAVAILABLE:
+            return grades_pb2.UploadGradeResponse(
+                status="error",
+                message="Database connection error",
+                grade_id=""
+            )
+        except Exception as e:
+            print(f"✗ Error uploading grade: {e}")
+            return grades_pb2.UploadGradeResponse(
+                status="error",
+                message="Failed to upload grade",
+                grade_id=""
+            )
+
+    async def GetCourseGrades(self, request, context):
+        """Faculty views all grades for a specific course"""
+        token = request.token
+        course_id = request.course_id
+
+        # Use local JWT validation
+        auth_result = validate_token_locally(token)
+
+        if not auth_result.get('valid'):
+            return grades_pb2.CourseGradesResponse(
+                status="error",
+                message="Authentication failed",
+                course_id="",
+                course_name="",
+                student_grades=[]
+            )
+
+        user_role = auth_result['role']
+
+        # Only faculty can view course grades
+        if user_role != 'faculty':
+            return grades_pb2.CourseGradesResponse(
+                status="error",
+                message=f"Only faculty can view course grades. Your role is '{user_role}'",
+                course_id="",
+                course_name="",
+                student_grades=[]
+            )
+
+        try:
+            async with db_pool.connection() as conn:
+                cur = await conn.execute("""
+                    SELECT
+                        student_public_id,
+                        grade,
+                        date_posted
+                    FROM grades
+                    WHERE course_id = %s
+                    ORDER BY date_posted DESC;
+                """, (course_id,))
+                rows = await cur.fetchall()
+        except DB_UNAVAILABLE:
+            return grades_pb2.CourseGradesResponse(
+                status="error",
+                message="Database connection error",
+                course_id="",
+                course_name="",
+                student_grades=[]
+            )
+        except Exception as e:
+            print(f"✗ Error fetching course grades: {e}")
+            return grades_pb2.CourseGradesResponse(
+                status="error",
+                message="Internal server error",
+                course_id="",
+                course_name="",
+                student_grades=[]
+            )
+
+        names = await resolve_names([str(row['student_public_id']) for row in rows])
+        student_grades = []
+        for row in rows:
+            student_grades.append(grades_pb2.StudentGradeInfo(
+                student_id=str(row['student_public_id']),
+                student_name=names.get(str(row['student_public_id'])) or "",
+                grade=row['grade'],
+                date_posted=str(row['date_posted'])
+            ))
+
+        print(f"✓ Retrieved {len(student_grades)} grades for course {course_id}")
+        return grades_pb2.CourseGradesResponse(
+            status="success",
+            message="Course grades retrieved",
+            course_id=course_id,
+            course_name=course_id,  # Would fetch actual name
+            student_grades=student_grades
+        )
+
+    async def StreamCourseGrades(self, request, context):
+        """Faculty export of a course's grades, paged through a server-side cursor"""
+        token = request.token
+        course_id = request.course_id
+
+        # Use local JWT validation
+        auth_result = validate_token_locally(token)
+
+        if not auth_result.get('valid'):
+            yield grades_pb2.CourseGradesBatch(status="error", message="Authentication failed")
+            return
+
+        user_role = auth_result['role']
+
+        # Only faculty can export course grades
+        if user_role != 'faculty':
+            yield grades_pb2.CourseGradesBatch(
+                status="error",
+                message=f"Only faculty can view course grades. Your role is '{user_role}'"
+            )
+            return
+
+        sent = 0
+        batches = 0
+        try:
+            async with db_pool.connection() as conn:
+                # A named cursor keeps the result set in Postgres; each FETCH brings one batch
+                async with conn.cursor(name=f"course_grades_export_{uuid.uuid4().hex}") as cur:
+                    await cur.execute("""
+                        SELECT
+                            student_public_id,
+                            grade,
+                            date_posted
+                        FROM grades
+                        WHERE course_id = %s
+                        ORDER BY date_posted DESC;
+                    """, (course_id,))
+                    while True:
+                        rows = await cur.fetchmany(GRADES_EXPORT_BATCH_SIZE)
+                        if not rows and batches:
+                            break
+                        names = await resolve_names([str(row['student_public_id']) for row in rows])
+                        # The first batch always goes out, even when empty
+                        yield grades_pb2.CourseGradesBatch(
+                            status="success",
+                            message="Course grades batch",
+                            student_grades=[
+                                grades_pb2.StudentGradeInfo(
+                                    student_id=str(row['student_public_id']),
+                                    student_name=names.get(str(row['student_public_id'])) or "",
+                                    grade=row['grade'],
+                                    date_posted=str(row['date_posted'])
+                                )
+                                for row in rows
+                            ]
+                        )
+                        sent += len(rows)
+                        batches += 1
+                        if len(rows) < GRADES_EXPORT_BATCH_SIZE:
+                            break
+        except DB_UNAVAILABLE:
+            yield grades_pb2.CourseGradesBatch(status="error", message="Database connection error")
+            return
+        except Exception as e:
+            print(f"✗ Error streaming course grades: {e}")
+            yield grades_pb2.CourseGradesBatch(status="error", message="Internal server error")
+            return
+
+        print(f"✓ Streamed {sent} grades for course {course_id} in {batches} batch(es)")
+
+async def serve():
+    init_db()
+    await open_aio_pools()
+    server = grpc.aio.server(options=GRPC_SERVER_OPTIONS, maximum_concurrent_rpcs=GRPC_MAX_CONCURRENT_RPCS)
+    grades_pb2_grpc.add_GradesServiceServicer_to_server(AsyncGradesServiceServicer(), server)
+    server.add_insecure_port('[::]:50054')
+    print("=" * 70)
+    print("gRPC Grades Service (asyncio) starting on port 50054...")
+    print("Using local JWT validation (independent of auth service)")
+    print("=" * 70)
+    await server.start()
+    try:
+        await server.wait_for_termination()
+    finally:
+        await close_aio_pools()
+
+if __name__ == '__main__':
+    asyncio.run(serve())
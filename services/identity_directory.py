@@ -0,0 +1,105 @@
+import threading
+import time
+from collections import OrderedDict
+
+import psycopg2
+
+from common_db import PreparedStatement
+
+# public_id -> username lookups for services that store only public ids
+# (grades, enrollments) but show names. Names come from the auth database in
+# one query per response for whatever the cache is missing, and stay in a
+# bounded LRU cache; ids without a user are cached too, so a roster costs at
+# most one extra query however many of its students are unknown.
+
+SELECT_USERNAMES = PreparedStatement('identity_select_usernames', """
+    SELECT public_id::text, username FROM users WHERE public_id = ANY(%s::uuid[]);
+""")
+
+
+class IdentityDirectory:
+    """
+    Bounded LRU cache of public_id -> username (None for unknown ids).
+    Entries live for at most `ttl` seconds, so renamed or deleted users
+    show up eventually.
+    """
+
+    def __init__(self, max_size=50000, ttl=600.0):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries = OrderedDict()  # public_id -> (expires_at, username)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.queries = 0
+
+    def cached(self, public_ids):
+        """({public_id: username} from the cache, [public_ids to look up])"""
+        now = time.monotonic()
+        names = {}
+        missing = []
+        with self._lock:
+            for public_id in dict.fromkeys(public_ids):
+                entry = self._entries.get(public_id)
+                if entry is None or now >= entry[0]:
+                    missing.append(public_id)
+                    continue
+                self._entries.move_to_end(public_id)
+                names[public_id] = entry[1]
+            self.hits += len(names)
+            self.misses += len(missing)
+        return names, missing
+
+    def remember(self, public_ids, usernames):
+        """Cache the result of looking up public_ids; usernames maps the ones that exist"""
+        expires_at = time.monotonic() + self.ttl
+        with self._lock:
+            self.queries += 1
+            for public_id in public_ids:
+                self._entries[public_id] = (expires_at, usernames.get(public_id))
+                self._entries.move_to_end(public_id)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def resolve(self, pool, public_ids):
+        """
+        {public_id: username} for the given ids, querying the auth database
+        (through pool) once for the ones not cached. Unknown ids map to None;
+        if the auth database is unavailable, uncached ids are left out.
+        """
+        names, missing = self.cached(public_ids)
+        if not missing:
+            return names
+        conn = pool.getconn()
+        if conn is None:
+            return names
+        try:
+            with conn.cursor() as cur:
+                SELECT_USERNAMES.execute(cur, (missing,))
+                usernames = dict(cur.fetchall())
+            conn.commit()
+        except psycopg2.Error as e:
+            print(f"✗ Error resolving student names: {e}")
+            return names
+        finally:
+            pool.putconn(conn)
+        self.remember(missing, usernames)
+        names.update((public_id, usernames.get(public_id)) for public_id in missing)
+        return names
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            size = len(self._entries)
+        total = self.hits + self.misses
+        return {
+            "size": size,
+            "max_size": self.max_size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "queries": self.queries,
+            "hit_rate": self.hits / total if total else 0.0
+        }
@@ -0,0 +1,85 @@
+import argparse
+import sys
+
+import psycopg2
+
+import auth_schema
+import courses_schema
+import grades_schema
+from common_migrations import apply_migrations, current_version
+
+# Schema and fixture management for the three databases. Services apply
+# pending migrations on startup by themselves; this runs them ahead of a
+# deploy, shows where each database stands, and loads the sample data:
+#     python manage_db.py migrate
+#     python manage_db.py status
+#     python manage_db.py seed
+
+
+def databases():
+    """(name, connection settings, schema module) for each database, configured like the servers"""
+    import grpc_auth_server
+    import grpc_course_server
+    import grpc_grades_server
+
+    return [
+        (server.POSTGRES_DB, dict(dbname=server.POSTGRES_DB, user=server.POSTGRES_USER,
+                                  password=server.POSTGRES_PASSWORD, host=server.POSTGRES_HOST,
+                                  port=server.POSTGRES_PORT), schema)
+        for server, schema in ((grpc_auth_server, auth_schema),
+                               (grpc_course_server, courses_schema),
+                               (grpc_grades_server, grades_schema))
+    ]
+
+
+def migrate(conn, dbname, schema):
+    applied = apply_migrations(conn, schema.SCHEMA_NAME, schema.MIGRATIONS)
+    print(f"✓ {dbname}: {applied} migration(s) applied, at version {len(schema.MIGRATIONS)}")
+
+
+def status(conn, dbname, schema):
+    with conn.cursor() as cur:
+        version = current_version(cur, schema.SCHEMA_NAME)
+    pending = len(schema.MIGRATIONS) - version
+    marker = '✓' if pending == 0 else '✗'
+    print(f"{marker} {dbname}: version {version} of {len(schema.MIGRATIONS)} ({max(pending, 0)} pending)")
+
+
+def seed(conn, dbname, schema):
+    if not hasattr(schema, 'seed'):
+        print(f"✓ {dbname}: no fixtures")
+        return
+    with conn.cursor() as cur:
+        added = schema.seed(cur)
+    conn.commit()
+    print(f"✓ {dbname}: {added} fixture row(s) added")
+
+
+COMMANDS = {'migrate': migrate, 'status': status, 'seed': seed}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Schema migrations and fixtures for the student portal databases")
+    parser.add_argument('command', choices=sorted(COMMANDS))
+    args = parser.parse_args()
+
+    failed = False
+    for dbname, connect_args, schema in databases():
+        try:
+            conn = psycopg2.connect(**connect_args)
+        except psycopg2.OperationalError as e:
+            print(f"✗ {dbname}: cannot connect: {e}")
+            failed = True
+            continue
+        try:
+            COMMANDS[args.command](conn, dbname, schema)
+        except psycopg2.Error as e:
+            print(f"✗ {dbname}: {e}")
+            failed = True
+        finally:
+            conn.close()
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,4 +1,4 @@
-from flask import Flask, jsonify, request
+from flask import Flask, jsonify, request, Response, stream_with_context
 from flask_cors import CORS
 import grpc
 import sys
@@ -15,6 +15,18 @@ import grades_pb2_grpc
 import faculty_grades_pb2
 import faculty_grades_pb2_grpc
 
+from common_grpc import GRPC_CALL_TIMEOUT, GRPC_EXPORT_TIMEOUT, get_stub, close_channels
+from common_ratelimit import forwarded_client_address
+import atexit
+import csv
+import io
+import itertools
+import json
+import queue
+import re
+import threading
+import time
+
 app = Flask(__name__)
 CORS(app)
 
@@ -25,60 +37,83 @@ ENROLLMENT_GRPC = 'localhost:50053'
 GRADES_GRPC = 'localhost:50054'
 FACULTY_GRADES_GRPC = 'localhost:50055'
 
+# One long-lived channel and stub per backend, shared by all requests
+auth_stub = get_stub(AUTH_GRPC, auth_pb2_grpc.AuthServiceStub)
+course_stub = get_stub(COURSE_GRPC, course_pb2_grpc.CourseServiceStub)
+enrollment_stub = get_stub(ENROLLMENT_GRPC, enrollment_pb2_grpc.EnrollmentServiceStub)
+grades_stub = get_stub(GRADES_GRPC, grades_pb2_grpc.GradesServiceStub)
+faculty_grades_stub = get_stub(FACULTY_GRADES_GRPC, faculty_grades_pb2_grpc.FacultyGradesServiceStub)
+atexit.register(close_channels)
+
+@app.after_request
+def add_etag(response):
+    """Tag JSON GET responses so clients and the view proxy can revalidate with If-None-Match"""
+    if (request.method == 'GET' and response.status_code == 200
+            and response.mimetype == 'application/json' and not response.is_streamed):
+        response.add_etag()
+        # Responses depend on the caller's token: revalidate every time, never share
+        response.headers.setdefault('Cache-Control', 'private, no-cache')
+        response.make_conditional(request)
+    return response
+
 # ============= AUTH ENDPOINTS =============
 
 @app.route('/api/v1/auth/register', methods=['POST'])
 def register():
     data = request.json
     try:
-        with grpc.insecure_channel(AUTH_GRPC) as channel:
-            stub = auth_pb2_grpc.AuthServiceStub(channel)
-            response = stub.Register(auth_pb2.RegisterRequest(
-                username=data.get('username', ''),
-                password=data.get('password', ''),
-                role=data.get('role', 'student')
-            ))
-            
-            if response.status == "success":
-                return jsonify({
-                    "status": response.status,
-                    "message": response.message,
-                    "token": response.token,
-                    "user_id": response.user_id,
-                    "role": response.role
-                }), 201
-            else:
-                return jsonify({
-                    "status": response.status,
-                    "message": response.message
-                }), 400 if response.status == "error" else 500
+        response = auth_stub.Register(auth_pb2.RegisterRequest(
+            username=data.get('username', ''),
+            password=data.get('password', ''),
+            role=data.get('role', 'student')
+        ), timeout=GRPC_CALL_TIMEOUT)
+        
+        if response.status == "success":
+            return jsonify({
+                "status": response.status,
+                "message": response.message,
+                "token": response.token,
+                "user_id": response.user_id,
+                "role": response.role
+            }), 201
+        else:
+            return jsonify({
+                "status": response.status,
+                "message": response.message
+            }), 400 if response.status == "error" else 500
     except grpc.RpcError as e:
         return jsonify({"status": "error", "message": "Auth service unavailable"}), 503
 
 @app.route('/api/v1/auth/login', methods=['POST'])
 def login():
     data = request.json
+    # The auth service rate-limits logins per client address, so pass the browser's along
+    client = forwarded_client_address(request.remote_addr, request.headers.get('X-Forwarded-For'))
     try:
-        with grpc.insecure_channel(AUTH_GRPC) as channel:
-            stub = auth_pb2_grpc.AuthServiceStub(channel)
-            response = stub.Login(auth_pb2.LoginRequest(
-                username=data.get('username', ''),
-                password=data.get('password', '')
-            ))
-            
-            if response.status == "success":
-                return jsonify({
-                    "status": response.status,
-                    "message": response.message,
-                    "token": response.token,
-                    "user_id": response.user_id,
-                    "role": response.role
-                }), 200
-            else:
-                return jsonify({
-                    "status": response.status,
-                    "message": response.message
-                }), 401
+        response, call = auth_stub.Login.with_call(auth_pb2.LoginRequest(
+            username=data.get('username', ''),
+            password=data.get('password', '')
+        ), timeout=GRPC_CALL_TIMEOUT, metadata=(('x-client-address', client),))
+        
+        if response.status == "throttled":
+            retry_after = dict(call.trailing_metadata() or ()).get('retry-after', '60')
+            return jsonify({
+                "status": response.status,
+                "message": response.message
+            }), 429, {'Retry-After': retry_after}
+        if response.status == "success":
+            return jsonify({
+                "status": response.status,
+                "message": response.message,
+                "token": response.token,
+                "user_id": response.user_id,
+                "role": response.role
+            }), 200
+        else:
+            return jsonify({
+                "status": response.status,
+                "message": response.message
+            }), 401
     except grpc.RpcError as e:
         return jsonify({"status": "error", "message": "Auth service unavailable"}), 503
 
@@ -88,22 +123,20 @@ def validate():
     token = data.get('token', '')
     
     try:
-        with grpc.insecure_channel(AUTH_GRPC) as channel:
-            stub = auth_pb2_grpc.AuthServiceStub(channel)
-            response = stub.ValidateToken(auth_pb2.ValidateRequest(token=token))
-            
-            if response.status == "valid":
-                return jsonify({
-                    "status": response.status,
-                    "user_id": response.user_id,
-                    "role": response.role,
-                    "username": response.username
-                }), 200
-            else:
-                return jsonify({
-                    "status": response.status,
-                    "message": response.message
-                }), 401
+        response = auth_stub.ValidateToken(auth_pb2.ValidateRequest(token=token), timeout=GRPC_CALL_TIMEOUT)
+        
+        if response.status == "valid":
+            return jsonify({
+                "status": response.status,
+                "user_id": response.user_id,
+                "role": response.role,
+                "username": response.username
+            }), 200
+        else:
+            return jsonify({
+                "status": response.status,
+                "message": response.message
+            }), 401
     except grpc.RpcError as e:
         return jsonify({"status": "error", "message": "Auth service unavailable"}), 503
 
@@ -112,45 +145,145 @@ def validate():
 @app.route('/api/v1/courses', methods=['GET'])
 def get_courses():
     try:
-        with grpc.insecure_channel(COURSE_GRPC) as channel:
-            stub = course_pb2_grpc.CourseServiceStub(channel)
-            response = stub.GetCourses(course_pb2.GetCoursesRequest())
-            
-            if response.status == "success":
-                courses = {}
-                for course in response.courses:
-                    courses[course.course_id] = {
-                        "name": course.name,
-                        "capacity": course.capacity,
-                        "enrolled": course.enrolled,
-                        "open": course.is_open
-                    }
-                return jsonify(courses), 200
-            else:
-                return jsonify({"status": response.status, "message": response.message}), 500
+        response = course_stub.GetCourses(course_pb2.GetCoursesRequest(), timeout=GRPC_CALL_TIMEOUT)
+        
+        if response.status == "success":
+            courses = {}
+            for course in response.courses:
+                courses[course.course_id] = {
+                    "name": course.name,
+                    "capacity": course.capacity,
+                    "enrolled": course.enrolled,
+                    "open": course.is_open
+                }
+            return jsonify(courses), 200
+        else:
+            return jsonify({"status": response.status, "message": response.message}), 500
     except grpc.RpcError as e:
         return jsonify({"status": "error", "message": "Course service unavailable"}), 503
 
+class SeatFeed:
+    """
+    Fans one WatchSeatAvailability stream out to every SSE client of this
+    gateway, so thousands of watchers cost the course service one stream.
+    """
+
+    def __init__(self, queue_size=100, heartbeat=15):
+        self.queue_size = queue_size
+        self.heartbeat = heartbeat
+        self._clients = set()
+        self._seats = {}  # course_id -> latest seat dict
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def subscribe(self):
+        q = queue.Queue(maxsize=self.queue_size)
+        with self._lock:
+            self._clients.add(q)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name='seat-feed', daemon=True)
+                self._thread.start()
+        return q
+
+    def unsubscribe(self, q):
+        with self._lock:
+            self._clients.discard(q)
+
+    def snapshot(self):
+        with self._lock:
+            return list(self._seats.values())
+
+    def _broadcast(self, seat):
+        with self._lock:
+            if seat["removed"]:
+                self._seats.pop(seat["course_id"], None)
+            else:
+                self._seats[seat["course_id"]] = seat
+            clients = list(self._clients)
+        for q in clients:
+            try:
+                q.put_nowait(seat)
+            except queue.Full:
+                # Slow client: replace its backlog with a resync (None), answered with a full snapshot
+                with q.mutex:
+                    q.queue.clear()
+                q.put_nowait(None)
+
+    def _run(self):
+        backoff = 1
+        while True:
+            try:
+                # Long-lived stream: no deadline, keepalive detects dead connections
+                for update in course_stub.WatchSeatAvailability(course_pb2.WatchSeatsRequest()):
+                    backoff = 1
+                    self._broadcast({
+                        "course_id": update.course_id,
+                        "capacity": update.capacity,
+                        "enrolled": update.enrolled,
+                        "open": update.is_open,
+                        "removed": update.removed
+                    })
+            except grpc.RpcError as e:
+                print(f"Seat feed disconnected from course service: {e.code()}")
+            time.sleep(backoff)
+            backoff = min(backoff * 2, 30)
+
+seat_feed = SeatFeed()
+
+@app.route('/api/v1/courses/stream', methods=['GET'])
+def stream_seat_availability():
+    """Server-Sent Events feed of seat counts (?course_ids=CS101,MATH203 to filter)"""
+    watched = set(filter(None, request.args.get('course_ids', '').split(',')))
+    updates = seat_feed.subscribe()
+
+    def event(name, data):
+        return f"event: {name}\ndata: {json.dumps(data)}\n\n"
+
+    def snapshot():
+        return [seat for seat in seat_feed.snapshot() if not watched or seat["course_id"] in watched]
+
+    def generate():
+        try:
+            for seat in snapshot():
+                yield event('seats', seat)
+            while True:
+                try:
+                    seat = updates.get(timeout=seat_feed.heartbeat)
+                except queue.Empty:
+                    yield ": keepalive\n\n"
+                    continue
+                if seat is None:
+                    # Updates were dropped: every watched course, so the client can drop the rest
+                    yield event('snapshot', snapshot())
+                elif not watched or seat["course_id"] in watched:
+                    yield event('seats', seat)
+        finally:
+            seat_feed.unsubscribe(updates)
+
+    return Response(
+        stream_with_context(generate()),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+
 @app.route('/api/v1/courses/<course_id>', methods=['GET'])
 def get_course_details(course_id):
     try:
-        with grpc.insecure_channel(COURSE_GRPC) as channel:
-            stub = course_pb2_grpc.CourseServiceStub(channel)
-            response = stub.GetCourseDetails(course_pb2.CourseRequest(course_id=course_id))
-            
-            if response.status == "success" and response.course:
-                return jsonify({
-                    "status": "success",
-                    "course": {
-                        "course_id": response.course.course_id,
-                        "name": response.course.name,
-                        "capacity": response.course.capacity,
-                        "enrolled": response.course.enrolled,
-                        "open": response.course.is_open
-                    }
-                }), 200
-            else:
-                return jsonify({"status": response.status, "message": response.message}), 404
+        response = course_stub.GetCourseDetails(course_pb2.CourseRequest(course_id=course_id), timeout=GRPC_CALL_TIMEOUT)
+        
+        if response.status == "success" and response.course:
+            return jsonify({
+                "status": "success",
+                "course": {
+                    "course_id": response.course.course_id,
+                    "name": response.course.name,
+                    "capacity": response.course.capacity,
+                    "enrolled": response.course.enrolled,
+                    "open": response.course.is_open
+                }
+            }), 200
+        else:
+            return jsonify({"status": response.status, "message": response.message}), 404
     except grpc.RpcError as e:
         return jsonify({"status": "error", "message": "Course service unavailable"}), 503
 
@@ -166,19 +299,17 @@ def enroll_in_course(course_id):
         return jsonify({"status": "error", "message": "Token missing"}), 401
     
     try:
-        with grpc.insecure_channel(ENROLLMENT_GRPC) as channel:
-            stub = enrollment_pb2_grpc.EnrollmentServiceStub(channel)
-            response = stub.EnrollInCourse(enrollment_pb2.EnrollRequest(
-                token=token,
-                course_id=course_id
-            ))
-            
-            if response.status == "success":
-                return jsonify({"status": response.status, "message": response.message}), 200
-            elif response.status == "rejected":
-                return jsonify({"status": response.status, "message": response.message}), 403
-            else:
-                return jsonify({"status": response.status, "message": response.message}), 400
+        response = enrollment_stub.EnrollInCourse(enrollment_pb2.EnrollRequest(
+            token=token,
+            course_id=course_id
+        ), timeout=GRPC_CALL_TIMEOUT)
+        
+        if response.status == "success":
+            return jsonify({"status": response.status, "message": response.message}), 200
+        elif response.status == "rejected":
+            return jsonify({"status": response.status, "message": response.message}), 403
+        else:
+            return jsonify({"status": response.status, "message": response.message}), 400
     except grpc.RpcError as e:
         return jsonify({"status": "error", "message": "Enrollment service unavailable"}), 503
 
@@ -193,24 +324,22 @@ def get_student_enrollments():
         return jsonify({"status": "error", "message": "Token missing"}), 401
     
     try:
-        with grpc.insecure_channel(ENROLLMENT_GRPC) as channel:
-            stub = enrollment_pb2_grpc.EnrollmentServiceStub(channel)
-            response = stub.GetStudentEnrollments(enrollment_pb2.StudentRequest(token=token))
-            
-            if response.status == "success":
-                enrollments = []
-                for enroll in response.enrollments:
-                    enrollments.append({
-                        "course_id": enroll.course_id,
-                        "course_name": enroll.course_name,
-                        "enrollment_date": enroll.enrollment_date
-                    })
-                return jsonify({
-                    "status": "success",
-                    "enrollments": enrollments
-                }), 200
-            else:
-                return jsonify({"status": response.status, "message": response.message}), 400
+        response = enrollment_stub.GetStudentEnrollments(enrollment_pb2.StudentRequest(token=token), timeout=GRPC_CALL_TIMEOUT)
+        
+        if response.status == "success":
+            enrollments = []
+            for enroll in response.enrollments:
+                enrollments.append({
+                    "course_id": enroll.course_id,
+                    "course_name": enroll.course_name,
+                    "enrollment_date": enroll.enrollment_date
+                })
+            return jsonify({
+                "status": "success",
+                "enrollments": enrollments
+            }), 200
+        else:
+            return jsonify({"status": response.status, "message": response.message}), 400
     except grpc.RpcError as e:
         return jsonify({"status": "error", "message": "Enrollment service unavailable"}), 503
 
@@ -225,19 +354,17 @@ def drop_course(course_id):
         return jsonify({"status": "error", "message": "Token missing"}), 401
     
     try:
-        with grpc.insecure_channel(ENROLLMENT_GRPC) as channel:
-            stub = enrollment_pb2_grpc.EnrollmentServiceStub(channel)
-            response = stub.DropFromCourse(enrollment_pb2.DropRequest(
-                token=token,
-                course_id=course_id
-            ))
-            
-            if response.status == "success":
-                return jsonify({"status": response.status, "message": response.message}), 200
-            elif response.status == "rejected":
-                return jsonify({"status": response.status, "message": response.message}), 403
-            else:
-                return jsonify({"status": response.status, "message": response.message}), 400
+        response = enrollment_stub.DropFromCourse(enrollment_pb2.DropRequest(
+            token=token,
+            course_id=course_id
+        ), timeout=GRPC_CALL_TIMEOUT)
+        
+        if response.status == "success":
+            return jsonify({"status": response.status, "message": response.message}), 200
+        elif response.status == "rejected":
+            return jsonify({"status": response.status, "message": response.message}), 403
+        else:
+            return jsonify({"status": response.status, "message": response.message}), 400
     except grpc.RpcError as e:
         return jsonify({"status": "error", "message": "Enrollment service unavailable"}), 503
 
@@ -254,32 +381,31 @@ def get_enrolled_courses_with_grades():
         return jsonify({"status": "error", "message": "Token missing"}), 401
     
     try:
-        with grpc.insecure_channel(GRADES_GRPC) as channel:
-            stub = grades_pb2_grpc.GradesServiceStub(channel)
-            response = stub.GetEnrolledCoursesWithGrades(
-                grades_pb2.EnrolledCoursesWithGradesRequest(token=token)
-            )
-            
-            if response.status == "success":
-                courses = []
-                for course in response.courses:
-                    courses.append({
-                        "course_id": course.course_id,
-                        "course_name": course.course_name,
-                        "enrollment_date": course.enrollment_date,
-                        "grade_released": course.grade_released,
-                        "grade": course.grade if course.grade_released else "Not Released",
-                        "semester": course.semester,
-                        "date_posted": course.date_posted,
-                        "remarks": course.remarks
-                    })
-                return jsonify({
-                    "status": "success",
-                    "student_name": response.student_name,
-                    "courses": courses
-                }), 200
-            else:
-                return jsonify({"status": response.status, "message": response.message}), 400
+        response = grades_stub.GetEnrolledCoursesWithGrades(
+            grades_pb2.EnrolledCoursesWithGradesRequest(token=token),
+            timeout=GRPC_CALL_TIMEOUT
+        )
+        
+        if response.status == "success":
+            courses = []
+            for course in response.courses:
+                courses.append({
+                    "course_id": course.course_id,
+                    "course_name": course.course_name,
+                    "enrollment_date": course.enrollment_date,
+                    "grade_released": course.grade_released,
+                    "grade": course.grade if course.grade_released else "Not Released",
+                    "semester": course.semester,
+                    "date_posted": course.date_posted,
+                    "remarks": course.remarks
+                })
+            return jsonify({
+                "status": "success",
+                "student_name": response.student_name,
+                "courses": courses
+            }), 200
+        else:
+            return jsonify({"status": response.status, "message": response.message}), 400
     except grpc.RpcError as e:
         return jsonify({"status": "error", "message": "Grades service unavailable"}), 503
 
@@ -294,29 +420,27 @@ def get_my_grades():
         return jsonify({"status": "error", "message": "Token missing"}), 401
     
     try:
-        with grpc.insecure_channel(GRADES_GRPC) as channel:
-            stub = grades_pb2_grpc.GradesServiceStub(channel)
-            response = stub.GetStudentGrades(grades_pb2.GradesRequest(token=token))
-            
-            if response.status == "success":
-                grades = []
-                for grade in response.grades:
-                    grades.append({
-                        "grade_id": grade.grade_id,
-                        "course_id": grade.course_id,
-                        "course_name": grade.course_name,
-                        "grade": grade.grade,
-                        "semester": grade.semester,
-                        "date_posted": grade.date_posted,
-                        "remarks": grade.remarks
-                    })
-                return jsonify({
-                    "status": "success",
-                    "student_name": response.student_name,
-                    "grades": grades
-                }), 200
-            else:
-                return jsonify({"status": response.status, "message": response.message}), 400
+        response = grades_stub.GetStudentGrades(grades_pb2.GradesRequest(token=token), timeout=GRPC_CALL_TIMEOUT)
+        
+        if response.status == "success":
+            grades = []
+            for grade in response.grades:
+                grades.append({
+                    "grade_id": grade.grade_id,
+                    "course_id": grade.course_id,
+                    "course_name": grade.course_name,
+                    "grade": grade.grade,
+                    "semester": grade.semester,
+                    "date_posted": grade.date_posted,
+                    "remarks": grade.remarks
+                })
+            return jsonify({
+                "status": "success",
+                "student_name": response.student_name,
+                "grades": grades
+            }), 200
+        else:
+            return jsonify({"status": response.status, "message": response.message}), 400
     except grpc.RpcError as e:
         return jsonify({"status": "error", "message": "Grades service unavailable"}), 503
 
@@ -333,25 +457,23 @@ def upload_grade():
     data = request.json
     
     try:
-        with grpc.insecure_channel(GRADES_GRPC) as channel:
-            stub = grades_pb2_grpc.GradesServiceStub(channel)
-            response = stub.UploadGrade(grades_pb2.UploadGradeRequest(
-                token=token,
-                student_id=data.get('student_id', ''),
-                course_id=data.get('course_id', ''),
-                grade=data.get('grade', ''),
-                semester=data.get('semester', ''),
-                remarks=data.get('remarks', '')
-            ))
-            
-            if response.status == "success":
-                return jsonify({
-                    "status": response.status,
-                    "message": response.message,
-                    "grade_id": response.grade_id
-                }), 201
-            else:
-                return jsonify({"status": response.status, "message": response.message}), 400
+        response = grades_stub.UploadGrade(grades_pb2.UploadGradeRequest(
+            token=token,
+            student_id=data.get('student_id', ''),
+            course_id=data.get('course_id', ''),
+            grade=data.get('grade', ''),
+            semester=data.get('semester', ''),
+            remarks=data.get('remarks', '')
+        ), timeout=GRPC_CALL_TIMEOUT)
+        
+        if response.status == "success":
+            return jsonify({
+                "status": response.status,
+                "message": response.message,
+                "grade_id": response.grade_id
+            }), 201
+        else:
+            return jsonify({"status": response.status, "message": response.message}), 400
     except grpc.RpcError as e:
         return jsonify({"status": "error", "message": "Grades service unavailable"}), 503
 
@@ -366,38 +488,109 @@ def get_course_grades(course_id):
         return jsonify({"status": "error", "message": "Token missing"}), 401
     
     try:
-        with grpc.insecure_channel(GRADES_GRPC) as channel:
-            stub = grades_pb2_grpc.GradesServiceStub(channel)
-            response = stub.GetCourseGrades(grades_pb2.CourseGradesRequest(
-                token=token,
-                course_id=course_id
-            ))
-            
-            if response.status == "success":
-                student_grades = []
-                for sg in response.student_grades:
-                    student_grades.append({
-                        "student_id": sg.student_id,
-                        "student_name": sg.student_name,
-                        "grade": sg.grade,
-                        "date_posted": sg.date_posted
-                    })
-                return jsonify({
-                    "status": "success",
-                    "course_id": response.course_id,
-                    "course_name": response.course_name,
-                    "student_grades": student_grades
-                }), 200
-            else:
-                return jsonify({"status": response.status, "message": response.message}), 400
+        response = grades_stub.GetCourseGrades(grades_pb2.CourseGradesRequest(
+            token=token,
+            course_id=course_id
+        ), timeout=GRPC_CALL_TIMEOUT)
+        
+        if response.status == "success":
+            student_grades = []
+            for sg in response.student_grades:
+                student_grades.append({
+                    "student_id": sg.student_id,
+                    "student_name": sg.student_name,
+                    "grade": sg.grade,
+                    "date_posted": sg.date_posted
+                })
+            return jsonify({
+                "status": "success",
+                "course_id": response.course_id,
+                "course_name": response.course_name,
+                "student_grades": student_grades
+            }), 200
+        else:
+            return jsonify({"status": response.status, "message": response.message}), 400
     except grpc.RpcError as e:
         return jsonify({"status": "error", "message": "Grades service unavailable"}), 503
 
+EXPORT_MIMETYPES = {'ndjson': 'application/x-ndjson', 'csv': 'text/csv'}
+STUDENT_GRADE_FIELDS = ('student_id', 'student_name', 'grade', 'date_posted')
+
+def export_chunk(batch, export_format):
+    """One StreamCourseGrades batch as NDJSON lines or CSV rows"""
+    student_grades = [{field: getattr(sg, field) for field in STUDENT_GRADE_FIELDS} for sg in batch.student_grades]
+    if export_format == 'ndjson':
+        return ''.join(json.dumps(sg) + '\n' for sg in student_grades)
+    buffer = io.StringIO()
+    csv.DictWriter(buffer, STUDENT_GRADE_FIELDS).writerows(student_grades)
+    return buffer.getvalue()
+
+@app.route('/api/v1/grades/course/<course_id>/export', methods=['GET'])
+def export_course_grades(course_id):
+    """Faculty downloads all grades for a course, streamed as NDJSON (default) or CSV (?format=csv)"""
+    token = request.headers.get('Authorization')
+    if token and token.startswith('Bearer '):
+        token = token[7:]
+    
+    if not token:
+        return jsonify({"status": "error", "message": "Token missing"}), 401
+    
+    export_format = request.args.get('format', 'ndjson')
+    if export_format not in EXPORT_MIMETYPES:
+        return jsonify({"status": "error", "message": "format must be ndjson or csv"}), 400
+    
+    try:
+        batches = grades_stub.StreamCourseGrades(grades_pb2.CourseGradesRequest(
+            token=token,
+            course_id=course_id
+        ), timeout=GRPC_EXPORT_TIMEOUT)
+        first = next(batches)
+    except (grpc.RpcError, StopIteration) as e:
+        # StopIteration: the stream ended without even the status batch
+        return jsonify({"status": "error", "message": "Grades service unavailable"}), 503
+    
+    if first.status != "success":
+        batches.cancel()
+        return jsonify({"status": first.status, "message": first.message}), 400
+    
+    def generate():
+        # One batch in memory at a time, on the way in and on the way out
+        error = None
+        try:
+            if export_format == 'csv':
+                yield ','.join(STUDENT_GRADE_FIELDS) + '\r\n'
+            for batch in itertools.chain([first], batches):
+                if batch.status != "success":
+                    error = batch.message
+                    break
+                yield export_chunk(batch, export_format)
+        except grpc.RpcError as e:
+            error = "Grades service unavailable"
+        finally:
+            batches.cancel()
+        if error is None:
+            return
+        # Already sent a 200: NDJSON ends with an error line, a CSV download is cut off
+        if export_format == 'ndjson':
+            yield json.dumps({"status": "error", "message": error}) + '\n'
+        else:
+            raise RuntimeError(f"Course grades export for {course_id} failed: {error}")
+    
+    headers = {'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    if export_format == 'csv':
+        filename = re.sub(r'[^\w.-]', '_', course_id)
+        headers['Content-Disposition'] = f'attachment; filename="{filename}_grades.csv"'
+    return Response(
+        stream_with_context(generate()),
+        mimetype=EXPORT_MIMETYPES[export_format],
+        headers=headers
+    )
+
 # ============= FACULTY GRADES ENDPOINTS (NEW - Node 5: Port 50055) =============
 
 @app.route('/api/v1/faculty/students', methods=['GET'])
 def get_all_students():
-    """Faculty gets list of all students in the system"""
+    """Faculty gets a page of students in username order (?after_username=&limit=&prefix=)"""
     token = request.headers.get('Authorization')
     if token and token.startswith('Bearer '):
         token = token[7:]
@@ -406,24 +599,37 @@ def get_all_students():
         return jsonify({"status": "error", "message": "Token missing"}), 401
     
     try:
-        with grpc.insecure_channel(FACULTY_GRADES_GRPC) as channel:
-            stub = faculty_grades_pb2_grpc.FacultyGradesServiceStub(channel)
-            response = stub.GetAllStudents(faculty_grades_pb2.GetStudentsRequest(token=token))
-            
-            if response.status == "success":
-                students = []
-                for student in response.students:
-                    students.append({
-                        "student_id": student.student_id,
-                        "username": student.username
-                    })
-                return jsonify({
-                    "status": "success",
-                    "message": response.message,
-                    "students": students
-                }), 200
-            else:
-                return jsonify({"status": response.status, "message": response.message}), 400
+        # int32 on the wire; the service caps it at STUDENTS_PAGE_MAX anyway
+        limit = min(max(int(request.args.get('limit', 0)), 0), 2**31 - 1)
+    except ValueError:
+        return jsonify({"status": "error", "message": "limit must be an integer"}), 400
+    
+    try:
+        response = faculty_grades_stub.GetAllStudents(
+            faculty_grades_pb2.GetStudentsRequest(
+                token=token,
+                after_username=request.args.get('after_username', ''),
+                limit=limit,
+                prefix=request.args.get('prefix', '')
+            ),
+            timeout=GRPC_CALL_TIMEOUT
+        )
+        
+        if response.status == "success":
+            students = []
+            for student in response.students:
+                students.append({
+                    "student_id": student.student_id,
+                    "username": student.username
+                })
+            return jsonify({
+                "status": "success",
+                "message": response.message,
+                "students": students,
+                "next_after_username": response.next_after_username
+            }), 200
+        else:
+            return jsonify({"status": response.status, "message": response.message}), 400
     except grpc.RpcError as e:
         return jsonify({"status": "error", "message": "Faculty Grades service unavailable"}), 503
 
@@ -438,29 +644,28 @@ def get_student_enrollments_by_faculty(student_id):
         return jsonify({"status": "error", "message": "Token missing"}), 401
     
     try:
-        with grpc.insecure_channel(FACULTY_GRADES_GRPC) as channel:
-            stub = faculty_grades_pb2_grpc.FacultyGradesServiceStub(channel)
-            response = stub.GetStudentEnrollments(
-                faculty_grades_pb2.GetEnrollmentsRequest(token=token, student_id=student_id)
-            )
-            
-            if response.status == "success":
-                enrollments = []
-                for enrollment in response.enrollments:
-                    enrollments.append({
-                        "course_id": enrollment.course_id,
-                        "course_name": enrollment.course_name,
-                        "enrollment_date": enrollment.enrollment_date
-                    })
-                return jsonify({
-                    "status": "success",
-                    "message": response.message,
-                    "student_id": response.student_id,
-                    "student_username": response.student_username,
-                    "enrollments": enrollments
-                }), 200
-            else:
-                return jsonify({"status": response.status, "message": response.message}), 400
+        response = faculty_grades_stub.GetStudentEnrollments(
+            faculty_grades_pb2.GetEnrollmentsRequest(token=token, student_id=student_id),
+            timeout=GRPC_CALL_TIMEOUT
+        )
+        
+        if response.status == "success":
+            enrollments = []
+            for enrollment in response.enrollments:
+                enrollments.append({
+                    "course_id": enrollment.course_id,
+                    "course_name": enrollment.course_name,
+                    "enrollment_date": enrollment.enrollment_date
+                })
+            return jsonify({
+                "status": "success",
+                "message": response.message,
+                "student_id": response.student_id,
+                "student_username": response.student_username,
+                "enrollments": enrollments
+            }), 200
+        else:
+            return jsonify({"status": response.status, "message": response.message}), 400
     except grpc.RpcError as e:
         return jsonify({"status": "error", "message": "Faculty Grades service unavailable"}), 503
 
@@ -477,25 +682,94 @@ def faculty_upload_student_grade():
     data = request.json
     
     try:
-        with grpc.insecure_channel(FACULTY_GRADES_GRPC) as channel:
-            stub = faculty_grades_pb2_grpc.FacultyGradesServiceStub(channel)
-            response = stub.UploadStudentGrade(faculty_grades_pb2.UploadGradeRequest(
-                token=token,
-                student_id=data.get('student_id', ''),
-                course_id=data.get('course_id', ''),
-                grade=data.get('grade', ''),
-                semester=data.get('semester', 'Fall 2024'),
-                remarks=data.get('remarks', '')
-            ))
-            
-            if response.status == "success":
-                return jsonify({
-                    "status": response.status,
-                    "message": response.message,
-                    "grade_id": response.grade_id
-                }), 201
-            else:
-                return jsonify({"status": response.status, "message": response.message}), 400
+        response = faculty_grades_stub.UploadStudentGrade(faculty_grades_pb2.UploadGradeRequest(
+            token=token,
+            student_id=data.get('student_id', ''),
+            course_id=data.get('course_id', ''),
+            grade=data.get('grade', ''),
+            semester=data.get('semester', 'Fall 2024'),
+            remarks=data.get('remarks', '')
+        ), timeout=GRPC_CALL_TIMEOUT)
+        
+        if response.status == "success":
+            return jsonify({
+                "status": response.status,
+                "message": response.message,
+                "grade_id": response.grade_id
+            }), 201
+        else:
+            return jsonify({"status": response.status, "message": response.message}), 400
+    except grpc.RpcError as e:
+        return jsonify({"status": "error", "message": "Faculty Grades service unavailable (Port 50055)"}), 503
+
+BULK_GRADE_FIELDS = ('student_id', 'course_id', 'grade', 'semester', 'remarks')
+
+def parse_bulk_grades():
+    """Read bulk grade rows from a JSON body, a CSV body or an uploaded CSV file"""
+    default_semester = request.args.get('semester', 'Fall 2024')
+
+    if request.files:
+        upload = next(iter(request.files.values()))
+        rows = list(csv.DictReader(io.StringIO(upload.read().decode('utf-8-sig'))))
+    elif request.mimetype in ('text/csv', 'application/csv'):
+        rows = list(csv.DictReader(io.StringIO(request.get_data(as_text=True))))
+    else:
+        data = request.get_json(silent=True)
+        if isinstance(data, dict):
+            default_semester = data.get('semester', default_semester)
+            data = data.get('grades')
+        if not isinstance(data, list):
+            raise ValueError("Expected a JSON list of grades or {\"grades\": [...]}")
+        rows = data
+
+    grades = []
+    for row in rows:
+        if not isinstance(row, dict):
+            raise ValueError("Each grade must be an object")
+        entry = {field: str(row.get(field) or '').strip() for field in BULK_GRADE_FIELDS}
+        entry['semester'] = entry['semester'] or default_semester
+        grades.append(faculty_grades_pb2.GradeEntry(**entry))
+    return grades
+
+@app.route('/api/v1/faculty/grades/bulk', methods=['POST'])
+def faculty_bulk_upload_grades():
+    """Faculty uploads many grades at once (JSON list or CSV with a header row)"""
+    token = request.headers.get('Authorization')
+    if token and token.startswith('Bearer '):
+        token = token[7:]
+    
+    if not token:
+        return jsonify({"status": "error", "message": "Token missing"}), 401
+    
+    try:
+        grades = parse_bulk_grades()
+    except (ValueError, csv.Error, UnicodeDecodeError) as e:
+        return jsonify({"status": "error", "message": f"Invalid upload: {e}"}), 400
+    
+    try:
+        response = faculty_grades_stub.UploadStudentGrades(faculty_grades_pb2.BulkUploadGradesRequest(
+            token=token,
+            grades=grades
+        ), timeout=GRPC_CALL_TIMEOUT * 6)
+        
+        results = []
+        for result in response.results:
+            results.append({
+                "row": result.row,
+                "student_id": result.student_id,
+                "course_id": result.course_id,
+                "status": result.status,
+                "message": result.message,
+                "grade_id": result.grade_id
+            })
+        status_code = {"success": 201, "partial": 207}.get(response.status, 400)
+        return jsonify({
+            "status": response.status,
+            "message": response.message,
+            "uploaded": response.uploaded,
+            "failed": response.failed,
+            "results": results
+        }), status_code
     except grpc.RpcError as e:
         return jsonify({"status": "error", "message": "Faculty Grades service unavailable (Port 50055)"}), 503
 
@@ -528,8 +802,11 @@ if __name__ == '__main__':
     print(f"  - Faculty Grades Service: {FACULTY_GRADES_GRPC} (NEW)")
     print("=" * 70)
     print("\nNew Faculty Endpoints:")
+    print("  GET  /api/v1/courses/stream (Server-Sent Events)")
+    print("  GET  /api/v1/grades/course/<id>/export (NDJSON or ?format=csv, streamed)")
     print("  GET  /api/v1/faculty/students")
     print("  GET  /api/v1/faculty/students/<id>/enrollments")
     print("  POST /api/v1/faculty/grades/upload")
+    print("  POST /api/v1/faculty/grades/bulk (JSON or CSV)")
     print("=" * 70)
     app.run(host='0.0.0.0', port=5001, debug=True)
\ No newline at end of file